@@ -335,6 +335,11 @@ void Can_RxIsrHandler(void)
         Can_TpRx(rxData, rxLen);
         return;
     }
+    // FlowControl(0x3X): 테스터가 멀티프레임 응답 수신 시 보내는 FC.
+    // Can_TpSend는 FC를 기다리지 않고 1 ms 간격으로 CF를 보내므로 버린다.
+    // (SF 경로로 넘기면 BS 바이트가 SID로 해석되어 0x7F 응답/DTC 삭제 등이 발생)
+    if ((rxData[0] >> 4) == 3)
+        return;
     unsigned char SID = rxData[1];
     unsigned short DID = ((unsigned short)rxData[2] << 8) | rxData[3];
     unsigned char posSid = SID + 0x40;
@@ -0,0 +1,184 @@
+"""
+SHA-256 of OTA artifacts with a persistent, stat-keyed cache.
+
+An artifact is only re-hashed when its (path, size, mtime_ns, inode) changed
+since the cached digest was taken; the cache lives next to the artifacts as
+`.checksums.json`. Images of MMAP_THRESHOLD bytes or more are hashed straight
+from a memory map (one update call, no Python-level read loop), and
+`build_manifest` hashes every artifact in a directory in a process pool.
+
+Usage:
+    python artifact_hash.py                 # print the manifest of build/
+    python artifact_hash.py --write         # also write build/manifest.json if it changed
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+BASE_DIR = os.path.dirname(__file__)
+BUILD_DIR = os.path.join(BASE_DIR, "build")
+CACHE_FILE_NAME = ".checksums.json"
+MANIFEST_FILE_NAME = "manifest.json"
+
+# Files this size or larger are hashed through mmap instead of read().
+MMAP_THRESHOLD = 1 << 20
+# Payload descriptors and docs that live in build/ but are not shipped artifacts.
+NON_ARTIFACT_SUFFIXES = (".json", ".md")
+
+StatKey = Tuple[int, int, int]  # (size, mtime_ns, inode)
+
+
+def _stat_key(st: os.stat_result) -> StatKey:
+    return (st.st_size, st.st_mtime_ns, st.st_ino)
+
+
+def hash_file(file_path: str) -> str:
+    """SHA-256 of a file; large files are hashed from a read-only memory map."""
+    with open(file_path, "rb") as fp:
+        size = os.fstat(fp.fileno()).st_size
+        if size < MMAP_THRESHOLD:
+            return hashlib.sha256(fp.read()).hexdigest()
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return hashlib.sha256(mapped).hexdigest()
+
+
+class ChecksumCache:
+    """
+    Digest cache keyed by absolute path and validated against (size, mtime_ns, inode).
+    A rebuilt or replaced artifact changes at least one of them and misses the cache.
+    """
+
+    def __init__(self, cache_path: str) -> None:
+        self.cache_path = cache_path
+        self.entries: Dict[str, Dict[str, object]] = {}
+        self._dirty = False
+        try:
+            with open(cache_path, "r", encoding="utf-8") as fp:
+                loaded = json.load(fp)
+            if isinstance(loaded, dict):
+                self.entries = loaded
+        except (OSError, json.JSONDecodeError):
+            pass  # missing or corrupt cache: start empty
+
+    @classmethod
+    def for_dir(cls, directory: str) -> "ChecksumCache":
+        return cls(os.path.join(directory, CACHE_FILE_NAME))
+
+    def lookup(self, file_path: str, st: os.stat_result) -> str | None:
+        entry = self.entries.get(os.path.abspath(file_path))
+        if entry and tuple(entry.get("key", ())) == _stat_key(st):
+            return entry.get("sha256")
+        return None
+
+    def store(self, file_path: str, st: os.stat_result, checksum: str) -> None:
+        self.entries[os.path.abspath(file_path)] = {"key": list(_stat_key(st)), "sha256": checksum}
+        self._dirty = True
+
+    def checksum(self, file_path: str) -> str:
+        """Cached digest of `file_path`, hashing it only on a miss."""
+        st = os.stat(file_path)
+        cached = self.lookup(file_path, st)
+        if cached is not None:
+            return cached
+        checksum = hash_file(file_path)
+        self.store(file_path, st, checksum)
+        return checksum
+
+    def save(self) -> None:
+        """Write the cache back (atomically) if anything was added."""
+        if not self._dirty:
+            return
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fp:
+            json.dump(self.entries, fp, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.cache_path)
+        self._dirty = False
+
+
+def list_artifacts(directory: str) -> List[str]:
+    """Regular, non-hidden files in `directory` other than payload JSON and docs."""
+    names = []
+    for entry in os.scandir(directory):
+        if not entry.is_file() or entry.name.startswith("."):
+            continue
+        if entry.name.endswith(NON_ARTIFACT_SUFFIXES):
+            continue
+        names.append(entry.name)
+    return sorted(names)
+
+
+def build_manifest(
+    directory: str = BUILD_DIR,
+    cache: ChecksumCache | None = None,
+    workers: int | None = None,
+) -> Dict[str, str]:
+    """
+    {artifact name: sha256} for every artifact in `directory`.
+    Cache hits are resolved in-process; misses are hashed in a process pool.
+    """
+    cache = cache or ChecksumCache.for_dir(directory)
+    manifest: Dict[str, str] = {}
+    misses: List[Tuple[str, str, os.stat_result]] = []
+    for name in list_artifacts(directory):
+        path = os.path.join(directory, name)
+        st = os.stat(path)
+        cached = cache.lookup(path, st)
+        if cached is not None:
+            manifest[name] = cached
+        else:
+            misses.append((name, path, st))
+
+    if len(misses) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            digests = list(pool.map(hash_file, [path for _, path, _ in misses]))
+    else:
+        digests = [hash_file(path) for _, path, _ in misses]
+    for (name, path, st), checksum in zip(misses, digests):
+        cache.store(path, st, checksum)
+        manifest[name] = checksum
+
+    cache.save()
+    return dict(sorted(manifest.items()))
+
+
+def write_json_if_changed(json_path: str, document: object) -> bool:
+    """Rewrite `json_path` only when its content differs. Returns True if written."""
+    try:
+        with open(json_path, "r", encoding="utf-8") as fp:
+            if json.load(fp) == document:
+                return False
+    except (OSError, json.JSONDecodeError):
+        pass
+    with open(json_path, "w", encoding="utf-8") as fp:
+        json.dump(document, fp, ensure_ascii=False, indent=2)
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Hash every OTA artifact in a build directory.")
+    parser.add_argument("directory", nargs="?", default=BUILD_DIR, help="Artifact directory (default: build/).")
+    parser.add_argument("--workers", type=int, help="Hashing processes (default: CPU count).")
+    parser.add_argument(
+        "--write",
+        action="store_true",
+        help=f"Write {MANIFEST_FILE_NAME} into the directory when the manifest changed.",
+    )
+    args = parser.parse_args()
+
+    manifest = build_manifest(args.directory, workers=args.workers)
+    for name, checksum in manifest.items():
+        print(f"[Checksum] {name} -> {checksum}")
+    if args.write:
+        manifest_path = os.path.join(args.directory, MANIFEST_FILE_NAME)
+        if write_json_if_changed(manifest_path, manifest):
+            print(f"[JSON] Wrote {MANIFEST_FILE_NAME} ({len(manifest)} artifacts).")
+        else:
+            print(f"[JSON] {MANIFEST_FILE_NAME} unchanged.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Crash-safe campaign state: one SQLite row per (campaign version, VIN).
+
+The database runs in WAL mode with synchronous=NORMAL, so a committed batch
+survives the publisher process dying; readers (e.g. a status query from another
+shell) never block the writer. Rows are keyed by (version, vin) and indexed by
+(version, status), which is what resume and per-status reporting look up.
+
+Writes are batched: the campaign collects changed vehicles and upserts them in
+one transaction, so a fleet-wide fan-out costs a handful of commits rather than
+one fsync per notify or ack.
+"""
+import json
+import sqlite3
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+# Dirty vehicles collected before the campaign writes a batch mid fan-out.
+DEFAULT_BATCH_SIZE = 500
+# Longest time an ack waits in memory before it is committed.
+DEFAULT_FLUSH_SEC = 1.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS campaign_vehicle (
+    version       TEXT    NOT NULL,
+    vin           TEXT    NOT NULL,
+    status        TEXT    NOT NULL,
+    publish_count INTEGER NOT NULL DEFAULT 0,
+    last_notify   REAL,
+    decision      TEXT,
+    acked_at      REAL,
+    PRIMARY KEY (version, vin)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS campaign_vehicle_status ON campaign_vehicle (version, status);
+"""
+
+_UPSERT = """
+INSERT INTO campaign_vehicle (version, vin, status, publish_count, last_notify, decision, acked_at)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (version, vin) DO UPDATE SET
+    status = excluded.status,
+    publish_count = excluded.publish_count,
+    last_notify = excluded.last_notify,
+    decision = excluded.decision,
+    acked_at = excluded.acked_at
+"""
+
+# (vin, status, publish_count, last_notify, decision, acked_at)
+VehicleRow = Tuple[str, str, int, float | None, Any, float | None]
+
+
+class CampaignStore:
+    """
+    SQLite-backed table of per-vehicle campaign state.
+
+    The connection is bound to the thread that opened it; the campaign only
+    touches the store from its run loop and never from paho callbacks.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_SEC,
+    ) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # Autocommit mode; batches open their own transaction explicitly.
+        self.conn = sqlite3.connect(path, isolation_level=None, timeout=10.0)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+
+    def __enter__(self) -> "CampaignStore":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def register(self, version: str, vins: Iterable[str], status: str) -> int:
+        """Add rows for VINs not yet in this campaign; existing rows are kept. Returns rows added."""
+        with self._transaction():
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO campaign_vehicle (version, vin, status) VALUES (?, ?, ?)",
+                ((version, vin, status) for vin in vins),
+            )
+            return self.conn.total_changes - before
+
+    def load(self, version: str) -> Dict[str, VehicleRow]:
+        """All stored rows of one campaign, keyed by VIN, with the decision decoded."""
+        rows = self.conn.execute(
+            "SELECT vin, status, publish_count, last_notify, decision, acked_at "
+            "FROM campaign_vehicle WHERE version = ?",
+            (version,),
+        )
+        return {
+            vin: (vin, status, count, last_notify, _decode(decision), acked_at)
+            for vin, status, count, last_notify, decision, acked_at in rows
+        }
+
+    def save(self, version: str, rows: List[VehicleRow]) -> None:
+        """Upsert a batch of vehicle rows in a single transaction."""
+        if not rows:
+            return
+        with self._transaction():
+            self.conn.executemany(
+                _UPSERT,
+                (
+                    (version, vin, status, count, last_notify, _encode(decision), acked_at)
+                    for vin, status, count, last_notify, decision, acked_at in rows
+                ),
+            )
+
+    def status_counts(self, version: str) -> Dict[str, int]:
+        """Vehicles per status for one campaign (served from the status index)."""
+        rows = self.conn.execute(
+            "SELECT status, COUNT(*) FROM campaign_vehicle WHERE version = ? GROUP BY status",
+            (version,),
+        )
+        return dict(rows)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """BEGIN IMMEDIATE ... COMMIT, rolled back if the block raises."""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+
+def _encode(decision: Any) -> str | None:
+    if decision is None:
+        return None
+    return json.dumps(decision, ensure_ascii=False)
+
+
+def _decode(text: str | None) -> Any:
+    if text is None:
+        return None
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return text
@@ -9,11 +9,15 @@ BROKER_PORT = 1883
 # Vehicle-specific notify topic template
 TOPIC_TEMPLATE = "vc/{vin}/ota/vehicle_control/notify"
 ACK_TOPIC_TEMPLATE = "vc/{vin}/ota/vehicle_control/ack"
+# Fleet-wide ack subscription and the fixed parts around the VIN level
+ACK_WILDCARD_TOPIC = ACK_TOPIC_TEMPLATE.format(vin="+")
+ACK_TOPIC_PREFIX, ACK_TOPIC_SUFFIX = ACK_TOPIC_TEMPLATE.split("{vin}")
 
 # Environment variable names
 VIN_ENV_VAR = "VC_VIN"
 RE_PROMPT_ENV_VAR = "VC_OTA_REPROMPT_SEC"
 META_ENV_VAR = "VC_OTA_META"
+STATE_DB_ENV_VAR = "VC_OTA_STATE_DB"
 
 # Defaults for notify payload
 DEFAULT_RE_PROMPT_SEC = 30
@@ -30,6 +34,16 @@ def get_ack_topic(vin: str) -> str:
     return ACK_TOPIC_TEMPLATE.format(vin=vin)
 
 
+def vin_from_ack_topic(topic: str) -> str | None:
+    """Return the VIN level of an ack topic, or None if the topic is not an ack topic."""
+    if not (topic.startswith(ACK_TOPIC_PREFIX) and topic.endswith(ACK_TOPIC_SUFFIX)):
+        return None
+    vin = topic[len(ACK_TOPIC_PREFIX):len(topic) - len(ACK_TOPIC_SUFFIX)]
+    if not vin or "/" in vin:
+        return None
+    return vin
+
+
 def resolve_vin(explicit_vin: str | None = None) -> str:
     """
     Determine the VIN to target. Prefer explicit CLI input and fall back to env.
@@ -87,5 +101,10 @@ def resolve_meta(explicit_meta: Dict[str, Any] | None = None) -> Dict[str, Any]:
     return merged
 
 
+def resolve_state_db(explicit_path: str | None = None) -> str | None:
+    """Campaign state database path from CLI or env; None keeps state in memory only."""
+    return explicit_path or os.environ.get(STATE_DB_ENV_VAR) or None
+
+
 # Local OTA asset directory
 BASE_DIR = os.path.dirname(__file__)
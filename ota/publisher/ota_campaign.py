@@ -0,0 +1,580 @@
+"""
+Fleet OTA campaign: notify many vehicles over one persistent MQTT connection.
+
+`publish_ota_message` drives a single VIN with its own client. A campaign instead
+serialises the notify payload once, fans it out to every VIN through one client
+with a bounded number of unacknowledged (QoS 1) publishes in flight, and tracks
+approvals for all vehicles concurrently from the network thread.
+
+Acks for the whole fleet come in through one wildcard subscription
+(vc/+/ota/vehicle_control/ack). The VIN is sliced out of the topic and the
+payload is classified once into approved / declined / unknown; the campaign
+keeps a per-status counter next to the per-VIN table so every ack is an O(1)
+update. Vehicles still without approval when their notifies run out (or the
+campaign times out) are recorded as timeouts.
+
+Re-notifies are driven by a min-heap of (due time, VIN) timers: each notify
+schedules that vehicle's next prompt, approved vehicles are skipped when their
+timer pops, and the run loop sleeps until the earliest timer (or until the last
+approval arrives), so thousands of pending vehicles cost one wait, not one
+thread or sleep each.
+
+With a state database (--state-db / VC_OTA_STATE_DB, see campaign_store.py) every
+vehicle's publish count, last notify, status and decision is committed in batches
+as the campaign runs. Restarting the same campaign version resumes from it:
+approved vehicles are never notified again, and vehicles notified shortly before
+the crash keep their remaining re-prompt delay instead of being notified at once.
+
+Usage:
+    python ota_campaign.py build/control_update.json --vin-file vins.txt --re-prompt-sec 30
+    python ota_campaign.py build/control_update.json --vin-file vins.txt --state-db campaign.db
+"""
+import argparse
+import heapq
+import json
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+import paho.mqtt.client as mqtt
+
+from campaign_store import CampaignStore, VehicleRow
+from config import (
+    BROKER_HOST,
+    ACK_WILDCARD_TOPIC,
+    BROKER_PORT,
+    VIN_ENV_VAR,
+    get_notify_topic,
+    resolve_meta,
+    resolve_re_prompt_sec,
+    resolve_state_db,
+    resolve_vin,
+    vin_from_ack_topic,
+)
+from ota_publisher import (
+    DECISION_APPROVED,
+    DECISION_DECLINED,
+    DECISION_TIMEOUT,
+    DECISION_UNKNOWN,
+    _decode_payload,
+    _load_json,
+    build_notify_payload,
+    classify_decision,
+    parse_meta_argument,
+)
+
+# Max QoS 1 publishes waiting for PUBACK at any time.
+DEFAULT_MAX_INFLIGHT = 100
+# Seconds to wait for the broker's CONNACK before giving up.
+CONNECT_TIMEOUT_SEC = 10.0
+# Campaign status of a vehicle: no answer yet, then the classified ack decision
+STATUS_PENDING = "pending"
+STATUSES = (STATUS_PENDING, DECISION_APPROVED, DECISION_DECLINED, DECISION_UNKNOWN, DECISION_TIMEOUT)
+
+
+def load_vins(vins: Iterable[str] | None = None, vin_file: str | None = None) -> List[str]:
+    """
+    Collect VINs from the CLI list and/or a file (one VIN per line, '#' comments).
+    Duplicates are dropped while keeping the first-seen order.
+    """
+    collected: List[str] = list(vins or [])
+    if vin_file:
+        with open(vin_file, "r", encoding="utf-8") as fp:
+            for line in fp:
+                vin = line.split("#", 1)[0].strip()
+                if vin:
+                    collected.append(vin)
+    return list(dict.fromkeys(collected))
+
+
+@dataclass
+class VehicleState:
+    vin: str
+    publish_count: int = 0
+    last_notify: float = 0.0
+    status: str = STATUS_PENDING
+    decision: Any = None  # last ack payload as received
+    acked_at: Optional[float] = None
+
+    @property
+    def approved(self) -> bool:
+        return self.status == DECISION_APPROVED
+
+    def row(self) -> VehicleRow:
+        return (self.vin, self.status, self.publish_count, self.last_notify or None, self.decision, self.acked_at)
+
+
+class OtaCampaign:
+    """
+    Publish one update to a list of VINs and collect their approvals.
+
+    The notify message is QoS 1; at most `max_inflight` of them wait for a PUBACK
+    at once, so a large fleet neither floods the broker nor serialises on each
+    round trip. Acks arrive on the paho network thread and only touch the
+    per-VIN state dict; changed VINs are queued for `store` (if given), which is
+    written from the run loop only.
+    """
+
+    def __init__(
+        self,
+        update_payload: Dict[str, Any],
+        vins: Iterable[str],
+        *,
+        version: str | None = None,
+        re_prompt_sec: int | None = None,
+        meta: Dict[str, Any] | None = None,
+        max_inflight: int = DEFAULT_MAX_INFLIGHT,
+        host: str = BROKER_HOST,
+        port: int = BROKER_PORT,
+        store: CampaignStore | None = None,
+    ) -> None:
+        self.prompt_interval = resolve_re_prompt_sec(re_prompt_sec)
+        notify_payload = build_notify_payload(
+            update_payload,
+            version=version,
+            re_prompt_sec=self.prompt_interval,
+            meta=resolve_meta(meta),
+        )
+        self.version = notify_payload["version"]
+        self.serialized = json.dumps(notify_payload, ensure_ascii=False)
+        self.vehicles: Dict[str, VehicleState] = {vin: VehicleState(vin) for vin in vins}
+        self.max_inflight = max_inflight
+        self.host = host
+        self.port = port
+        self.store = store
+        if store is not None:
+            self._restore(store)
+
+        self.status_counts: Dict[str, int] = dict.fromkeys(STATUSES, 0)
+        for state in self.vehicles.values():
+            self.status_counts[state.status] += 1
+        self._lock = threading.Lock()
+        self._inflight = threading.BoundedSemaphore(max_inflight)
+        self._inflight_count = 0
+        self._unapproved = len(self.vehicles) - self.status_counts[DECISION_APPROVED]
+        self._dirty: set[str] = set()  # VINs changed since the last store flush
+        self._timers: List[tuple[float, str]] = []  # (monotonic due time, VIN) min-heap, run thread only
+        self._all_approved = threading.Event()
+        if not self._unapproved:
+            self._all_approved.set()
+        self._connected = threading.Event()
+        self._listen_acks = False
+
+        self.client = mqtt.Client(protocol=mqtt.MQTTv311)
+        self.client.max_inflight_messages_set(max_inflight)
+        self.client.on_connect = self._on_connect
+        self.client.on_disconnect = self._on_disconnect
+        self.client.on_publish = self._on_publish
+        self.client.on_message = self._on_message
+
+    # ---------------- state store (run thread) ----------------
+    def _restore(self, store: CampaignStore) -> None:
+        """Load this version's saved rows and register VINs the store has not seen yet."""
+        saved = store.load(self.version)
+        for vin, status, count, last_notify, decision, acked_at in saved.values():
+            state = self.vehicles.get(vin)
+            if state is None:
+                continue
+            # A timeout only describes the previous run; give the vehicle a fresh wait
+            # (run() puts it back to timeout if its max_repeat notifies are used up).
+            state.status = STATUS_PENDING if status == DECISION_TIMEOUT else status
+            state.publish_count = count
+            state.last_notify = last_notify or 0.0
+            state.decision = decision
+            state.acked_at = acked_at
+        added = store.register(self.version, (vin for vin in self.vehicles if vin not in saved), STATUS_PENDING)
+        resumed = len(self.vehicles) - added
+        if resumed:
+            print(f"[OTA] 저장된 캠페인 상태에서 {resumed}대 재개 {store.status_counts(self.version)} ({store.path})")
+
+    def _flush_store(self, force: bool = True) -> None:
+        """Write the changed vehicles in one transaction (all of them, or once a batch has built up)."""
+        if self.store is None:
+            return
+        with self._lock:
+            if not self._dirty or (not force and len(self._dirty) < self.store.batch_size):
+                return
+            rows = [self.vehicles[vin].row() for vin in self._dirty]
+            self._dirty.clear()
+        self.store.save(self.version, rows)
+
+    # ---------------- MQTT callbacks (network thread) ----------------
+    def _on_connect(self, _client: mqtt.Client, _userdata, _flags, rc: int) -> None:
+        if rc != 0:
+            print(f"[MQTT] 브로커 연결 거부: {mqtt.connack_string(rc)}")
+            return
+        # Clean session: the ack subscription is gone after every reconnect.
+        if self._listen_acks:
+            self._subscribe_acks()
+        if self._connected.is_set():
+            print("[MQTT] 브로커 재연결, ack 구독 복구")
+        self._connected.set()
+
+    def _on_disconnect(self, _client: mqtt.Client, _userdata, rc: int) -> None:
+        if rc != mqtt.MQTT_ERR_SUCCESS:
+            print(f"[MQTT] 브로커 연결 끊김 ({mqtt.error_string(rc)}), 자동 재연결 대기")
+
+    def _on_publish(self, _client: mqtt.Client, _userdata, _mid: int) -> None:
+        # Only notify messages are published on this client, so every PUBACK frees a slot.
+        with self._lock:
+            self._inflight_count -= 1
+        self._inflight.release()
+
+    def _on_message(self, _client: mqtt.Client, _userdata, msg: mqtt.MQTTMessage) -> None:
+        state = self.vehicles.get(vin_from_ack_topic(msg.topic))
+        if state is None:
+            return  # not an ack, or a vehicle outside this campaign
+        payload = _decode_payload(msg.payload)
+        status = classify_decision(payload)
+        with self._lock:
+            if state.approved:
+                return
+            self._set_status(state, status)
+            state.decision = payload
+            state.acked_at = time.time()
+            self._dirty.add(state.vin)
+            if status != DECISION_APPROVED:
+                print(f"[MQTT] {state.vin} 승인 대기 중 ({status}), 응답 수신: {payload}")
+                return
+            self._unapproved -= 1
+            remaining = self._unapproved
+        vin = state.vin
+        print(f"[MQTT] {vin} 승인 응답 수신 (남은 차량 {remaining})")
+        if not remaining:
+            self._all_approved.set()
+
+    def _set_status(self, state: VehicleState, status: str) -> None:
+        """Move a vehicle to another status column (caller holds self._lock)."""
+        self.status_counts[state.status] -= 1
+        self.status_counts[status] += 1
+        state.status = status
+
+    # ---------------- publishing ----------------
+    def _acquire_slot(self, deadline: Optional[float]) -> bool:
+        """
+        Wait for a free in-flight slot, flushing the store while the window is full
+        (e.g. the broker is down). Returns False once `deadline` has passed.
+        """
+        while True:
+            wait = self.store.flush_interval if self.store is not None else None
+            if deadline is not None:
+                left = max(deadline - time.monotonic(), 0.0)
+                wait = left if wait is None else min(wait, left)
+            if self._inflight.acquire(timeout=wait):
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            self._flush_store()
+
+    def _publish(self, state: VehicleState, deadline: Optional[float] = None) -> bool:
+        """
+        Publish the notify for one VIN, blocking while the in-flight window is full.
+        Returns False without publishing if no slot frees up before `deadline`.
+        """
+        if not self._acquire_slot(deadline):
+            return False
+        with self._lock:
+            self._inflight_count += 1
+        # paho calls on_publish while holding its own outgoing-message lock,
+        # so publish() must not be called with self._lock held.
+        info = self.client.publish(get_notify_topic(state.vin), payload=self.serialized, qos=1, retain=False)
+        # MQTT_ERR_NO_CONN still queues a QoS 1 message: paho sends it after the
+        # automatic reconnect and on_publish frees its slot then.
+        if info.rc not in (mqtt.MQTT_ERR_SUCCESS, mqtt.MQTT_ERR_NO_CONN):
+            # Not queued (e.g. MQTT_ERR_QUEUE_SIZE), so no PUBACK will ever release the slot.
+            self._on_publish(self.client, None, info.mid)
+            raise RuntimeError(f"Publish to {state.vin} failed: {mqtt.error_string(info.rc)}")
+        with self._lock:
+            state.publish_count += 1
+            state.last_notify = time.time()
+            self._dirty.add(state.vin)
+        return True
+
+    def _fan_out(self, vins: List[str], schedule: bool, deadline: Optional[float] = None) -> int:
+        """
+        Notify `vins` in order and return how many were published. Vehicles not
+        reached before `deadline` (in-flight window still full) are marked as timeouts.
+        """
+        for i, vin in enumerate(vins):
+            if not self._publish(self.vehicles[vin], deadline):
+                print(f"[MQTT] PUBACK 대기 중 제한 시간 도달, 미발행 차량 {len(vins) - i}대 시간 초과 처리")
+                self._mark_timeouts(vins[i:])
+                return i
+            if schedule:
+                heapq.heappush(self._timers, (time.monotonic() + self.prompt_interval, vin))
+            self._flush_store(force=False)
+        return len(vins)
+
+    def _first_round(self, schedule: bool, max_repeat: Optional[int]) -> List[str]:
+        """
+        VINs to notify right away. Resumed vehicles notified less than
+        `prompt_interval` ago only get a timer for the rest of their interval;
+        resumed vehicles that already used up `max_repeat` notifies stay timed out.
+        """
+        now, mono = time.time(), time.monotonic()
+        immediate: List[str] = []
+        exhausted: List[str] = []
+        for vin, state in self.vehicles.items():
+            if state.approved:
+                continue
+            if max_repeat is not None and state.publish_count >= max_repeat:
+                exhausted.append(vin)
+                continue
+            remaining = state.last_notify + self.prompt_interval - now
+            if schedule and state.publish_count and remaining > 0:
+                heapq.heappush(self._timers, (mono + remaining, vin))
+            else:
+                immediate.append(vin)
+        self._mark_timeouts(exhausted)
+        return immediate
+
+    def _fire_due_timers(self, max_repeat: Optional[int], deadline: Optional[float] = None) -> tuple[int, int]:
+        """Pop every due timer; re-notify the unapproved vehicles. Returns (re-notified, exhausted)."""
+        now = time.monotonic()
+        due: List[str] = []
+        exhausted = 0
+        while self._timers and self._timers[0][0] <= now:
+            _, vin = heapq.heappop(self._timers)
+            state = self.vehicles[vin]
+            if state.approved:
+                continue
+            if max_repeat is not None and state.publish_count >= max_repeat:
+                self._mark_timeouts((vin,))
+                exhausted += 1
+                continue
+            due.append(vin)
+        return self._fan_out(due, schedule=True, deadline=deadline), exhausted
+
+    def _subscribe_acks(self) -> None:
+        self.client.subscribe(ACK_WILDCARD_TOPIC, qos=1)
+
+    def _mark_timeouts(self, vins: Iterable[str]) -> None:
+        """Record vehicles that never answered as timeouts (a decline stays a decline)."""
+        with self._lock:
+            for vin in vins:
+                state = self.vehicles[vin]
+                if state.status in (STATUS_PENDING, DECISION_UNKNOWN):
+                    self._set_status(state, DECISION_TIMEOUT)
+                    self._dirty.add(vin)
+
+    def unapproved(self) -> List[str]:
+        with self._lock:
+            return [vin for vin, state in self.vehicles.items() if not state.approved]
+
+    def run(
+        self,
+        *,
+        repeat_until_ack: bool = True,
+        max_repeat: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Notify every VIN, then re-notify each unapproved vehicle `prompt_interval`
+        seconds after its previous notify, at most `max_repeat` notifies per vehicle.
+        Stops when every vehicle has approved or used up its notifies, or after
+        `timeout` seconds. Returns a summary dict.
+        """
+        t0 = time.monotonic()
+        deadline = t0 + timeout if timeout is not None else None
+        self._listen_acks = repeat_until_ack
+        self.client.connect(self.host, self.port, keepalive=30)
+        self.client.loop_start()
+        try:
+            # Fan out only after on_connect has (re)subscribed, so no early ack is missed.
+            if not self._connected.wait(CONNECT_TIMEOUT_SEC):
+                raise RuntimeError(f"No CONNACK from {self.host}:{self.port} within {CONNECT_TIMEOUT_SEC}s")
+            first_round = self._first_round(schedule=repeat_until_ack, max_repeat=max_repeat)
+            published = self._fan_out(first_round, schedule=repeat_until_ack, deadline=deadline)
+            self._flush_store()
+            fan_out_sec = time.monotonic() - t0
+            print(
+                f"[MQTT] {published}대 알림 발행 ({fan_out_sec:.2f}s) -> "
+                f"{self.host}:{self.port}"
+            )
+
+            exhausted = 0
+            while self._timers and not self._all_approved.is_set():
+                self._flush_store()
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    print("[MQTT] 캠페인 제한 시간에 도달하여 종료합니다.")
+                    self._mark_timeouts(vin for _, vin in self._timers)
+                    break
+                wake = self._timers[0][0] if deadline is None else min(self._timers[0][0], deadline)
+                if self.store is not None:
+                    wake = min(wake, now + self.store.flush_interval)
+                if wake > now:
+                    if self._all_approved.wait(timeout=wake - now):
+                        break
+                    continue
+                renotified, newly_exhausted = self._fire_due_timers(max_repeat, deadline)
+                exhausted += newly_exhausted
+                if renotified:
+                    print(f"[MQTT] 승인 미수신 {renotified}대 재발행, {self.prompt_interval}초 후 재확인")
+            if exhausted:
+                print(f"[MQTT] 최대 재알림 횟수에 도달한 차량 {exhausted}대")
+
+            self._wait_inflight(deadline)
+        finally:
+            # Disconnect first so the network thread leaves its select() right away.
+            self.client.disconnect()
+            self.client.loop_stop()
+            self._flush_store()
+        return self.summary(time.monotonic() - t0)
+
+    def _wait_inflight(self, campaign_deadline: Optional[float] = None, timeout: float = 10.0) -> None:
+        """Let the last publishes collect their PUBACKs before disconnecting (never past the campaign deadline)."""
+        deadline = time.monotonic() + timeout
+        if campaign_deadline is not None:
+            deadline = min(deadline, campaign_deadline)
+        while time.monotonic() < deadline:
+            with self._lock:
+                if not self._inflight_count:
+                    return
+            time.sleep(0.01)
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        with self._lock:
+            states = list(self.vehicles.values())
+            counts = dict(self.status_counts)
+        return {
+            "version": self.version,
+            "vehicles": len(states),
+            "status": counts,
+            "unapproved": [s.vin for s in states if not s.approved],
+            "publishes": sum(s.publish_count for s in states),
+            "elapsed_sec": round(elapsed, 3),
+        }
+
+
+def run_campaign(
+    update_payload: Dict[str, Any],
+    vins: Iterable[str],
+    *,
+    version: str | None = None,
+    re_prompt_sec: int | None = None,
+    meta: Dict[str, Any] | None = None,
+    repeat_until_ack: bool = True,
+    max_repeat: Optional[int] = None,
+    max_inflight: int = DEFAULT_MAX_INFLIGHT,
+    timeout: Optional[float] = None,
+    state_db: str | None = None,
+) -> Dict[str, Any]:
+    """
+    Campaign counterpart of `publish_ota_message` for a list of VINs.
+    With `state_db` (or VC_OTA_STATE_DB) the campaign is persisted and resumable.
+    """
+    state_db = resolve_state_db(state_db)
+    store = CampaignStore(state_db) if state_db else None
+    try:
+        campaign = OtaCampaign(
+            update_payload,
+            vins,
+            version=version,
+            re_prompt_sec=re_prompt_sec,
+            meta=meta,
+            max_inflight=max_inflight,
+            store=store,
+        )
+        summary = campaign.run(repeat_until_ack=repeat_until_ack, max_repeat=max_repeat, timeout=timeout)
+    finally:
+        if store is not None:
+            store.close()
+    counts = summary["status"]
+    print(
+        f"[OTA] 캠페인 {summary['version']}: {counts[DECISION_APPROVED]}/{summary['vehicles']}대 승인, "
+        f"거절 {counts[DECISION_DECLINED]}, 시간 초과 {counts[DECISION_TIMEOUT]}, "
+        f"발행 {summary['publishes']}회, {summary['elapsed_sec']}s"
+    )
+    return summary
+
+
+def add_campaign_arguments(parser: argparse.ArgumentParser) -> None:
+    """Fleet options shared by ota_campaign.py and send_ota.py."""
+    parser.add_argument(
+        "--vin-file",
+        help="File with one target VIN per line ('#' starts a comment).",
+    )
+    parser.add_argument(
+        "--max-inflight",
+        type=int,
+        default=DEFAULT_MAX_INFLIGHT,
+        help=f"Notify publishes awaiting PUBACK at once (default {DEFAULT_MAX_INFLIGHT}).",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        help="캠페인 전체 제한 시간(초). 기본값은 제한 없음입니다.",
+    )
+    parser.add_argument(
+        "--state-db",
+        help="SQLite file for crash-safe campaign state; rerun with the same file to resume "
+        "(defaults to VC_OTA_STATE_DB, otherwise state is kept in memory only).",
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Publish an OTA notify payload to a fleet of VINs.")
+    parser.add_argument("json_path", help="Path to the update payload JSON file.")
+    parser.add_argument(
+        "--vin",
+        dest="vins",
+        action="append",
+        help=f"Target VIN (repeatable). Falls back to {VIN_ENV_VAR} when no VIN is given.",
+    )
+    add_campaign_arguments(parser)
+    parser.add_argument(
+        "--version",
+        help="Override the version field sent in the notify payload (defaults to update version).",
+    )
+    parser.add_argument(
+        "--re-prompt-sec",
+        type=int,
+        help="Seconds between re-notifies of vehicles that have not approved yet.",
+    )
+    parser.add_argument(
+        "--meta",
+        help="Inline JSON object or path to JSON file merged into the meta field.",
+    )
+    parser.add_argument(
+        "--no-repeat",
+        action="store_true",
+        help="알림을 차량마다 한 번만 발행하고 종료합니다.",
+    )
+    parser.add_argument(
+        "--max-repeat",
+        type=int,
+        help="차량별 알림 최대 발행 횟수(승인 대기 시). 기본값은 무제한입니다.",
+    )
+    args = parser.parse_args()
+
+    update_payload = _load_json(args.json_path)
+    try:
+        meta = parse_meta_argument(args.meta)
+    except (ValueError, json.JSONDecodeError) as exc:
+        parser.error(f"Invalid --meta value: {exc}")
+
+    try:
+        vins = load_vins(args.vins, args.vin_file) or [resolve_vin()]
+    except (OSError, RuntimeError) as exc:
+        parser.error(str(exc))
+
+    summary = run_campaign(
+        update_payload,
+        vins,
+        version=args.version,
+        re_prompt_sec=args.re_prompt_sec,
+        meta=meta,
+        repeat_until_ack=not args.no_repeat,
+        max_repeat=args.max_repeat,
+        max_inflight=args.max_inflight,
+        timeout=args.timeout,
+        state_db=args.state_db,
+    )
+    sys.exit(0 if not summary["unapproved"] or args.no_repeat else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -41,25 +41,39 @@ def build_notify_payload(
 
 
 APPROVED_VALUES = {"approved", "approve", "accepted", "accept", "ok", "yes", "true"}
+DECLINED_VALUES = {"declined", "decline", "rejected", "reject", "denied", "deny", "no", "false", "cancel", "cancelled"}
 
+# Decision classes recorded per vehicle ("timeout" is set by the publisher, never parsed)
+DECISION_APPROVED = "approved"
+DECISION_DECLINED = "declined"
+DECISION_TIMEOUT = "timeout"
+DECISION_UNKNOWN = "unknown"
 
-def _extract_decision(message: Any) -> Optional[str]:
+_DECISION_CLASSES = {value: DECISION_APPROVED for value in APPROVED_VALUES}
+_DECISION_CLASSES.update({value: DECISION_DECLINED for value in DECLINED_VALUES})
+_DECISION_KEYS = ("decision", "status", "result", "state", "response")
+
+
+def classify_decision(message: Any) -> str:
     """
-    Try to extract a textual decision from an ack message payload.
-    Returns the lower-cased string if it maps to a known decision.
+    Map an ack payload to DECISION_APPROVED, DECISION_DECLINED or DECISION_UNKNOWN.
+    Payloads that carry a "decision" key take a single lookup; other dicts fall back
+    to the remaining candidate keys in order.
     """
     if isinstance(message, dict):
-        for key in ("decision", "status", "result", "state", "response"):
-            value = message.get(key)
-            if isinstance(value, bool):
-                return "true" if value else "false"
-            if isinstance(value, str):
-                return value.strip().lower()
-    elif isinstance(message, bool):
-        return "true" if message else "false"
-    elif isinstance(message, str):
-        return message.strip().lower()
-    return None
+        value = message.get("decision")
+        if not isinstance(value, (str, bool)):
+            value = next(
+                (message[key] for key in _DECISION_KEYS[1:] if isinstance(message.get(key), (str, bool))),
+                None,
+            )
+    else:
+        value = message
+    if isinstance(value, bool):
+        return DECISION_APPROVED if value else DECISION_DECLINED
+    if isinstance(value, str):
+        return _DECISION_CLASSES.get(value.strip().lower(), DECISION_UNKNOWN)
+    return DECISION_UNKNOWN
 
 
 def _decode_payload(raw: bytes) -> Any:
@@ -100,14 +114,19 @@ def publish_ota_message(
     serialized = json.dumps(notify_payload, ensure_ascii=False)
 
     client = mqtt.Client(protocol=mqtt.MQTTv311)
-    client.connect(BROKER_HOST, BROKER_PORT, keepalive=30)
-
     ack_event = threading.Event()
 
+    def handle_connect(_client: mqtt.Client, _userdata, _flags, rc: int):
+        if rc != 0:
+            print(f"[MQTT] 브로커 연결 거부: {mqtt.connack_string(rc)}")
+            return
+        # Clean session: subscribe on every (re)connect, not just the first one.
+        if repeat_until_ack:
+            client.subscribe(ack_topic, qos=1)
+
     def handle_ack(_client: mqtt.Client, _userdata, msg: mqtt.MQTTMessage):
         payload = _decode_payload(msg.payload)
-        decision = _extract_decision(payload)
-        if decision in APPROVED_VALUES:
+        if classify_decision(payload) == DECISION_APPROVED:
             print(f"[MQTT] 승인 응답 수신: {payload}")
             ack_event.set()
         else:
@@ -115,24 +134,27 @@ def publish_ota_message(
 
     if repeat_until_ack:
         client.message_callback_add(ack_topic, handle_ack)
-        client.subscribe(ack_topic, qos=1)
+    client.on_connect = handle_connect
+    client.connect(BROKER_HOST, BROKER_PORT, keepalive=30)
 
     client.loop_start()
     try:
         publish_count = 0
         while True:
             info = client.publish(topic, payload=serialized, qos=1, retain=False)
-            info.wait_for_publish()
             publish_count += 1
-            print(
-                f"[MQTT] {publish_count}회 발행 완료 -> {BROKER_HOST}:{BROKER_PORT} {topic}"
-            )
+            if info.rc == mqtt.MQTT_ERR_NO_CONN:
+                # Still queued as QoS 1: paho sends it once the automatic reconnect succeeds.
+                print(f"[MQTT] {publish_count}회 발행 대기 (브로커 연결 끊김, 재연결 후 전송)")
+            else:
+                info.wait_for_publish()
+                print(
+                    f"[MQTT] {publish_count}회 발행 완료 -> {BROKER_HOST}:{BROKER_PORT} {topic}"
+                )
 
             if not repeat_until_ack:
                 break
 
-            client.subscribe(ack_topic, qos=1)
-
             if ack_event.wait(timeout=prompt_interval):
                 break
 
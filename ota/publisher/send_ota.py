@@ -1,10 +1,11 @@
 import argparse
-import hashlib
 import json
 import os
 import sys
 
-from config import VIN_ENV_VAR, resolve_vin
+from artifact_hash import MANIFEST_FILE_NAME, ChecksumCache, build_manifest, write_json_if_changed
+from config import VIN_ENV_VAR, resolve_state_db, resolve_vin
+from ota_campaign import DEFAULT_MAX_INFLIGHT, add_campaign_arguments, load_vins, run_campaign
 from ota_publisher import parse_meta_argument, publish_ota_message
 
 BASE_DIR = os.path.dirname(__file__)
@@ -12,18 +13,17 @@ BUILD_DIR = os.path.join(BASE_DIR, "build")
 
 
 def calc_checksum(file_path: str) -> str:
-    """Calculate the SHA-256 checksum for a local file."""
-    hasher = hashlib.sha256()
-    with open(file_path, "rb") as fp:
-        for chunk in iter(lambda: fp.read(8192), b""):
-            hasher.update(chunk)
-    return hasher.hexdigest()
+    """SHA-256 checksum of a local file, reused from the build cache while the file is unchanged."""
+    cache = ChecksumCache.for_dir(os.path.dirname(os.path.abspath(file_path)))
+    checksum = cache.checksum(file_path)
+    cache.save()
+    return checksum
 
 
 def update_checksum_in_json(json_path: str) -> dict[str, object]:
     """
-    Update the 'checksum' field in the update payload and persist it back to disk.
-    Returns the in-memory update payload dictionary.
+    Update the 'checksum' field in the update payload and persist it back to disk
+    when it changed. Returns the in-memory update payload dictionary.
     """
     with open(json_path, "r", encoding="utf-8") as fp:
         update_payload = json.load(fp)
@@ -34,8 +34,11 @@ def update_checksum_in_json(json_path: str) -> dict[str, object]:
     checksum = calc_checksum(local_source)
     print(f"[Checksum] {source_name} -> {checksum}")
 
-    update_payload["checksum"] = checksum
+    if update_payload.get("checksum") == checksum:
+        print(f"[JSON] Checksum unchanged in {os.path.basename(json_path)}.")
+        return update_payload
 
+    update_payload["checksum"] = checksum
     with open(json_path, "w", encoding="utf-8") as fp:
         json.dump(update_payload, fp, ensure_ascii=False, indent=2)
 
@@ -43,12 +46,27 @@ def update_checksum_in_json(json_path: str) -> dict[str, object]:
     return update_payload
 
 
+def refresh_manifest(build_dir: str = BUILD_DIR) -> dict[str, str]:
+    """Hash every artifact in build/ in parallel and rewrite manifest.json if it changed."""
+    manifest = build_manifest(build_dir)
+    manifest_path = os.path.join(build_dir, MANIFEST_FILE_NAME)
+    if write_json_if_changed(manifest_path, manifest):
+        print(f"[JSON] Updated {MANIFEST_FILE_NAME} ({len(manifest)} artifacts).")
+    return manifest
+
+
 def build_arg_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Compute checksum and publish OTA notify payload."
     )
     parser.add_argument("json_path", help="Path to the update payload JSON file.")
-    parser.add_argument("--vin", help=f"Target VIN. Falls back to {VIN_ENV_VAR}.")
+    parser.add_argument(
+        "--vin",
+        dest="vins",
+        action="append",
+        help=f"Target VIN (repeatable for a campaign). Falls back to {VIN_ENV_VAR}.",
+    )
+    add_campaign_arguments(parser)
     parser.add_argument(
         "--version",
         help="Override the notify message version (defaults to update['version']).",
@@ -72,6 +90,11 @@ def build_arg_parser() -> argparse.ArgumentParser:
         type=int,
         help="승인 대기 중 재발행 최대 횟수(기본값 무제한).",
     )
+    parser.add_argument(
+        "--manifest",
+        action="store_true",
+        help=f"Hash every artifact in build/ and refresh build/{MANIFEST_FILE_NAME} before publishing.",
+    )
     return parser
 
 
@@ -83,11 +106,13 @@ def main(argv: list[str] | None = None) -> int:
         parser.error(f"Update payload file not found: {args.json_path}")
 
     print(f"[OTA] Preparing payload from {args.json_path}")
+    if args.manifest:
+        refresh_manifest()
     update_payload = update_checksum_in_json(args.json_path)
 
     try:
-        vin = resolve_vin(args.vin)
-    except RuntimeError as exc:
+        vins = load_vins(args.vins, args.vin_file) or [resolve_vin()]
+    except (OSError, RuntimeError) as exc:
         parser.error(str(exc))
 
     try:
@@ -95,6 +120,25 @@ def main(argv: list[str] | None = None) -> int:
     except (ValueError, json.JSONDecodeError) as exc:
         parser.error(f"Invalid --meta value: {exc}")
 
+    # The single-VIN publish_ota_message path has no deadline or in-flight window,
+    # so --timeout / --max-inflight also select the campaign path.
+    campaign_options = args.timeout is not None or args.max_inflight != DEFAULT_MAX_INFLIGHT
+    if len(vins) > 1 or args.vin_file or resolve_state_db(args.state_db) or campaign_options:
+        summary = run_campaign(
+            update_payload,
+            vins,
+            version=args.version,
+            re_prompt_sec=args.re_prompt_sec,
+            meta=meta,
+            repeat_until_ack=not args.no_repeat,
+            max_repeat=args.max_repeat,
+            max_inflight=args.max_inflight,
+            timeout=args.timeout,
+            state_db=args.state_db,
+        )
+        return 0 if not summary["unapproved"] or args.no_repeat else 1
+
+    vin = vins[0]
     publish_ota_message(
         update_payload,
         vin=vin,
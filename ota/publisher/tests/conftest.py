@@ -0,0 +1,10 @@
+"""
+Shared setup for the publisher tests.
+
+The publisher modules import each other as top-level modules (``from config import ...``),
+so the publisher directory is put on sys.path the same way running a script from it would.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,68 @@
+"""Ack topic parsing and decision classification."""
+import pytest
+
+from config import get_ack_topic, get_notify_topic, vin_from_ack_topic
+from ota_publisher import (
+    DECISION_APPROVED,
+    DECISION_DECLINED,
+    DECISION_UNKNOWN,
+    _decode_payload,
+    classify_decision,
+)
+
+
+@pytest.mark.parametrize(
+    "message, expected",
+    [
+        ({"decision": "APPROVED"}, DECISION_APPROVED),
+        ({"decision": " Reject "}, DECISION_DECLINED),
+        ({"status": "reject"}, DECISION_DECLINED),
+        ({"result": True}, DECISION_APPROVED),
+        ({"decision": None, "response": "ok"}, DECISION_APPROVED),
+        ({"decision": 1, "state": "cancelled"}, DECISION_DECLINED),
+        ({"x": 1}, DECISION_UNKNOWN),
+        ({"decision": "maybe"}, DECISION_UNKNOWN),
+        (True, DECISION_APPROVED),
+        (False, DECISION_DECLINED),
+        ("yes", DECISION_APPROVED),
+        ("deny", DECISION_DECLINED),
+        ("", DECISION_UNKNOWN),
+        (None, DECISION_UNKNOWN),
+        (42, DECISION_UNKNOWN),
+    ],
+)
+def test_classify_decision(message, expected):
+    assert classify_decision(message) == expected
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        (b'{"decision": "approved"}', DECISION_APPROVED),
+        (b"true", DECISION_APPROVED),
+        (b"  declined \n", DECISION_DECLINED),
+        (b"{not json", DECISION_UNKNOWN),
+        (b"", DECISION_UNKNOWN),
+    ],
+)
+def test_raw_payloads_classify_after_decoding(raw, expected):
+    assert classify_decision(_decode_payload(raw)) == expected
+
+
+def test_vin_from_ack_topic_round_trip():
+    assert vin_from_ack_topic(get_ack_topic("KMH123")) == "KMH123"
+    assert vin_from_ack_topic("vc/ABC/ota/vehicle_control/ack") == "ABC"
+
+
+@pytest.mark.parametrize(
+    "topic",
+    [
+        get_notify_topic("ABC"),
+        "vc//ota/vehicle_control/ack",
+        "vc/A/B/ota/vehicle_control/ack",
+        "vc/ABC/ota/vehicle_control/ack/extra",
+        "",
+    ],
+)
+def test_vin_from_ack_topic_rejects_other_topics(topic):
+    assert vin_from_ack_topic(topic) is None
@@ -0,0 +1,116 @@
+"""Stat-keyed checksum cache and artifact manifest."""
+import hashlib
+import json
+import os
+
+import pytest
+
+import artifact_hash
+from artifact_hash import (
+    CACHE_FILE_NAME,
+    MMAP_THRESHOLD,
+    ChecksumCache,
+    build_manifest,
+    hash_file,
+    write_json_if_changed,
+)
+
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+@pytest.fixture
+def count_hashes(monkeypatch):
+    """Wrap hash_file so tests can see which paths were actually read."""
+    hashed = []
+
+    def counting_hash(path):
+        hashed.append(os.path.basename(path))
+        return hash_file(path)
+
+    monkeypatch.setattr(artifact_hash, "hash_file", counting_hash)
+    return hashed
+
+
+@pytest.mark.parametrize("size", [0, 1000, MMAP_THRESHOLD, MMAP_THRESHOLD + 12345])
+def test_hash_file_matches_hashlib(tmp_path, size):
+    data = os.urandom(size)
+    path = tmp_path / "fw.bin"
+    path.write_bytes(data)
+    assert hash_file(str(path)) == sha256(data)
+
+
+def test_cache_hit_skips_rehash(tmp_path, count_hashes):
+    path = tmp_path / "fw.bin"
+    path.write_bytes(b"firmware")
+    cache = ChecksumCache.for_dir(str(tmp_path))
+
+    assert cache.checksum(str(path)) == sha256(b"firmware")
+    assert cache.checksum(str(path)) == sha256(b"firmware")
+    assert count_hashes == ["fw.bin"]
+
+
+def test_cache_persists_across_instances(tmp_path, count_hashes):
+    path = tmp_path / "fw.bin"
+    path.write_bytes(b"firmware")
+    cache = ChecksumCache.for_dir(str(tmp_path))
+    cache.checksum(str(path))
+    cache.save()
+
+    reloaded = ChecksumCache.for_dir(str(tmp_path))
+    assert reloaded.checksum(str(path)) == sha256(b"firmware")
+    assert count_hashes == ["fw.bin"]
+
+
+def test_changed_size_or_mtime_invalidates_entry(tmp_path, count_hashes):
+    path = tmp_path / "fw.bin"
+    path.write_bytes(b"version-1")
+    cache = ChecksumCache.for_dir(str(tmp_path))
+    cache.checksum(str(path))
+
+    path.write_bytes(b"version-2-longer")  # size changes
+    assert cache.checksum(str(path)) == sha256(b"version-2-longer")
+
+    st = os.stat(path)
+    path.write_bytes(b"version-3-longer")  # same size, content differs
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert cache.checksum(str(path)) == sha256(b"version-3-longer")
+    assert count_hashes == ["fw.bin"] * 3
+
+
+def test_corrupt_cache_file_starts_empty(tmp_path):
+    (tmp_path / CACHE_FILE_NAME).write_text("{not json", encoding="utf-8")
+    assert ChecksumCache.for_dir(str(tmp_path)).entries == {}
+
+
+def test_build_manifest_skips_descriptors_and_uses_cache(tmp_path, count_hashes):
+    (tmp_path / "app.bin").write_bytes(b"app")
+    (tmp_path / "boot.bin").write_bytes(b"boot")
+    (tmp_path / "update.json").write_text("{}", encoding="utf-8")
+    (tmp_path / "README.md").write_text("notes", encoding="utf-8")
+
+    manifest = build_manifest(str(tmp_path), workers=1)
+    assert manifest == {"app.bin": sha256(b"app"), "boot.bin": sha256(b"boot")}
+    assert (tmp_path / CACHE_FILE_NAME).exists()
+
+    assert build_manifest(str(tmp_path), workers=1) == manifest
+    assert sorted(count_hashes) == ["app.bin", "boot.bin"]
+
+
+def test_build_manifest_hashes_misses_in_process_pool(tmp_path):
+    blobs = {f"part{i}.bin": os.urandom(2048) for i in range(3)}
+    for name, data in blobs.items():
+        (tmp_path / name).write_bytes(data)
+    assert build_manifest(str(tmp_path), workers=2) == {name: sha256(data) for name, data in blobs.items()}
+
+
+def test_write_json_if_changed(tmp_path):
+    path = str(tmp_path / "manifest.json")
+    assert write_json_if_changed(path, {"a.bin": "00"}) is True
+    mtime = os.stat(path).st_mtime_ns
+    assert write_json_if_changed(path, {"a.bin": "00"}) is False
+    assert os.stat(path).st_mtime_ns == mtime
+    assert write_json_if_changed(path, {"a.bin": "11"}) is True
+    with open(path, encoding="utf-8") as fp:
+        assert json.load(fp) == {"a.bin": "11"}
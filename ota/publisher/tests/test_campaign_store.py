@@ -0,0 +1,81 @@
+"""Campaign state store and resuming a campaign from it."""
+import time
+
+import pytest
+
+from campaign_store import CampaignStore
+from ota_campaign import STATUS_PENDING, OtaCampaign
+from ota_publisher import DECISION_APPROVED, DECISION_DECLINED, DECISION_TIMEOUT
+
+VERSION = "1.2.3"
+UPDATE = {"version": VERSION, "url": "http://example.invalid/fw.bin"}
+
+
+@pytest.fixture
+def store(tmp_path):
+    with CampaignStore(str(tmp_path / "campaign.db")) as s:
+        yield s
+
+
+def test_store_uses_wal_journal(store):
+    assert store.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_save_load_round_trip(store):
+    store.register(VERSION, ["A", "B"], STATUS_PENDING)
+    store.save(VERSION, [("A", DECISION_APPROVED, 2, 100.0, {"decision": "ok"}, 101.5)])
+
+    rows = store.load(VERSION)
+    assert rows["A"] == ("A", DECISION_APPROVED, 2, 100.0, {"decision": "ok"}, 101.5)
+    assert rows["B"] == ("B", STATUS_PENDING, 0, None, None, None)
+    assert store.status_counts(VERSION) == {DECISION_APPROVED: 1, STATUS_PENDING: 1}
+    assert store.load("other-version") == {}
+
+
+def test_register_keeps_existing_rows(store):
+    assert store.register(VERSION, ["A", "B"], STATUS_PENDING) == 2
+    store.save(VERSION, [("A", DECISION_DECLINED, 1, 5.0, "no", 6.0)])
+    assert store.register(VERSION, ["A", "B", "C"], STATUS_PENDING) == 1
+    assert store.load(VERSION)["A"][1] == DECISION_DECLINED
+
+
+def test_rows_survive_reopening(tmp_path):
+    path = str(tmp_path / "campaign.db")
+    with CampaignStore(path) as first:
+        first.register(VERSION, ["A"], STATUS_PENDING)
+        first.save(VERSION, [("A", DECISION_APPROVED, 1, 1.0, True, 2.0)])
+    with CampaignStore(path) as second:
+        assert second.load(VERSION)["A"][1:3] == (DECISION_APPROVED, 1)
+
+
+def test_resume_skips_approved_and_exhausted_vehicles(store):
+    now = time.time()
+    store.register(VERSION, ["OK", "GAVE_UP", "RECENT", "STALE"], STATUS_PENDING)
+    store.save(VERSION, [
+        ("OK", DECISION_APPROVED, 1, now - 100, {"decision": "approved"}, now - 90),
+        ("GAVE_UP", DECISION_TIMEOUT, 3, now - 100, None, None),
+        ("RECENT", STATUS_PENDING, 1, now - 5, None, None),
+        ("STALE", DECISION_TIMEOUT, 1, now - 100, None, None),
+    ])
+
+    campaign = OtaCampaign(UPDATE, ["OK", "GAVE_UP", "RECENT", "STALE", "NEW"],
+                           re_prompt_sec=30, store=store)
+    assert campaign.vehicles["STALE"].status == STATUS_PENDING  # old timeout gets a fresh wait
+    assert campaign.status_counts[DECISION_APPROVED] == 1
+    assert store.load(VERSION)["NEW"][1] == STATUS_PENDING
+
+    immediate = campaign._first_round(schedule=True, max_repeat=3)
+    assert sorted(immediate) == ["NEW", "STALE"]
+    assert [vin for _, vin in campaign._timers] == ["RECENT"]
+    assert campaign.vehicles["GAVE_UP"].status == DECISION_TIMEOUT
+
+    campaign._flush_store()
+    assert store.load(VERSION)["GAVE_UP"][1] == DECISION_TIMEOUT
+
+
+def test_resume_with_higher_max_repeat_renotifies(store):
+    store.register(VERSION, ["GAVE_UP"], STATUS_PENDING)
+    store.save(VERSION, [("GAVE_UP", DECISION_TIMEOUT, 2, time.time() - 100, None, None)])
+
+    campaign = OtaCampaign(UPDATE, ["GAVE_UP"], re_prompt_sec=30, store=store)
+    assert campaign._first_round(schedule=True, max_repeat=3) == ["GAVE_UP"]
@@ -0,0 +1,31 @@
+"""OtaCampaign fan-out bounded by the campaign deadline (no broker needed)."""
+import time
+
+from campaign_store import CampaignStore
+from ota_campaign import OtaCampaign
+from ota_publisher import DECISION_TIMEOUT
+
+UPDATE = {"version": "2.0.0"}
+
+
+def test_full_inflight_window_stops_fan_out_at_deadline(tmp_path):
+    with CampaignStore(str(tmp_path / "campaign.db"), flush_interval=0.05) as store:
+        campaign = OtaCampaign(UPDATE, ["A", "B", "C"], max_inflight=1, store=store)
+        campaign._inflight.acquire()  # one notify still waiting for its PUBACK (broker down)
+
+        t0 = time.monotonic()
+        published = campaign._fan_out(["A", "B", "C"], schedule=True, deadline=t0 + 0.3)
+        elapsed = time.monotonic() - t0
+
+        assert published == 0
+        assert 0.3 <= elapsed < 1.0
+        assert campaign._timers == []
+        assert campaign.status_counts[DECISION_TIMEOUT] == 3
+        campaign._flush_store()
+        assert store.status_counts("2.0.0") == {DECISION_TIMEOUT: 3}
+
+
+def test_free_slot_is_taken_even_at_deadline():
+    campaign = OtaCampaign(UPDATE, ["A"], max_inflight=1)
+    assert campaign._acquire_slot(time.monotonic() - 1.0)
+    assert not campaign._acquire_slot(time.monotonic() + 0.05)
@@ -0,0 +1,52 @@
+"""send_ota.py routing between the single-VIN publisher and the campaign."""
+import pytest
+
+import send_ota
+from config import STATE_DB_ENV_VAR
+
+
+@pytest.fixture
+def payload_path(tmp_path):
+    path = tmp_path / "update.json"
+    path.write_text("{}", encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Replace both publish paths (and the checksum refresh) with recorders."""
+    recorded = []
+    monkeypatch.delenv(STATE_DB_ENV_VAR, raising=False)
+    monkeypatch.setattr(send_ota, "update_checksum_in_json", lambda _path: {"version": "1.0"})
+    monkeypatch.setattr(
+        send_ota, "publish_ota_message", lambda payload, **kw: recorded.append(("single", kw))
+    )
+    monkeypatch.setattr(
+        send_ota,
+        "run_campaign",
+        lambda payload, vins, **kw: recorded.append(("campaign", dict(kw, vins=vins))) or {"unapproved": []},
+    )
+    return recorded
+
+
+def test_single_vin_uses_publish_ota_message(payload_path, calls):
+    assert send_ota.main([payload_path, "--vin", "V1", "--max-repeat", "3"]) == 0
+    (path, kwargs), = calls
+    assert path == "single"
+    assert (kwargs["vin"], kwargs["max_repeat"]) == ("V1", 3)
+
+
+@pytest.mark.parametrize("option", [["--timeout", "30"], ["--max-inflight", "5"]])
+def test_campaign_options_select_campaign_for_single_vin(payload_path, calls, option):
+    assert send_ota.main([payload_path, "--vin", "V1", *option]) == 0
+    (path, kwargs), = calls
+    assert path == "campaign"
+    assert kwargs["vins"] == ["V1"]
+    assert kwargs["timeout"] == (30.0 if option[0] == "--timeout" else None)
+    assert kwargs["max_inflight"] == (5 if option[0] == "--max-inflight" else send_ota.DEFAULT_MAX_INFLIGHT)
+
+
+def test_several_vins_use_campaign(payload_path, calls):
+    assert send_ota.main([payload_path, "--vin", "V1", "--vin", "V2"]) == 0
+    (path, kwargs), = calls
+    assert path == "campaign" and kwargs["vins"] == ["V1", "V2"]
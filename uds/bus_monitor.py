@@ -0,0 +1,223 @@
+"""
+CAN 버스 부하 모니터 (스니퍼).
+
+수신한 모든 프레임의 (타임스탬프, ID, DLC, 확장 ID 여부)를 미리 할당한 NumPy 링버퍼에 기록하고,
+통계는 화면을 갱신할 때만 최근 구간을 벡터 연산으로 한 번에 계산한다.
+  - ID별 프레임 수 / 주기(Hz), 평균 주기와 지터(도착 간격 표준편차), 최대 간격
+  - DLC 분포, ID별 버스 점유율, 전체 버스 사용률 (짧은/긴 두 구간)
+
+버스 사용률은 비트 스터핑 최악값을 포함한 프레임 길이로 계산한다.
+  클래식 표준 ID: 47 + 8*DLC + floor((34 + 8*DLC - 1) / 4) bit
+  클래식 확장 ID: 67 + 8*DLC + floor((54 + 8*DLC - 1) / 4) bit
+  CAN FD: 중재 구간(+스터핑)과 CRC 구분자~IFS는 중재 비트레이트, ESI~CRC(고정 스터핑 포함)는
+          BRS면 데이터 비트레이트로 보내므로 중재 비트 시간으로 환산해 더한다
+
+can_dash.py는 IsoTpTransport 리스너로 붙여 쓰고, 단독 실행 시 버스 전체를 받아 표를 갱신한다.
+
+사용 예:
+    python bus_monitor.py --bustype pcan --channel PCAN_USBBUS1
+    python bus_monitor.py --bustype vcan --window 1 --long-window 10 --top 20
+"""
+import argparse
+import sys
+import threading
+import time
+
+import can
+import numpy as np
+
+from can_backend import DEFAULT_BITRATE, DEFAULT_DATA_BITRATE, add_bus_args, default_channel, open_bus
+
+DEFAULT_CAPACITY = 1 << 20  # 500 kbit/s 최대 부하(약 4천 frame/s)에서 4분 이상
+DEFAULT_WINDOW = 1.0
+DEFAULT_LONG_WINDOW = 10.0
+DLC_MAX = 8
+FD_LEN_MAX = 64
+
+
+def frame_bits(dlc, extended):
+    """비트 스터핑 최악값을 포함한 클래식 CAN 프레임 길이 (배열 연산)"""
+    data_bits = 8 * np.minimum(dlc, DLC_MAX).astype(np.int64)
+    std = 47 + data_bits + (34 + data_bits - 1) // 4
+    ext = 67 + data_bits + (54 + data_bits - 1) // 4
+    return np.where(extended, ext, std)
+
+
+def fd_frame_bits(length, extended, brs, data_ratio):
+    """
+    CAN FD 프레임 길이를 중재 비트 단위로 (배열 연산, 스터핑 최악값 포함)
+    length: 데이터 바이트 수, data_ratio: 중재 비트레이트 / 데이터 비트레이트 (BRS 프레임에만 적용)
+    """
+    data_bits = 8 * np.minimum(length, FD_LEN_MAX).astype(np.int64)
+    arb = np.where(extended, 36, 17)  # SOF ~ BRS
+    arb = arb + (arb - 1) // 4
+    crc = np.where(length > 16, 21, 17)
+    data_phase = 5 + data_bits + (4 + data_bits) // 4 + 4 + crc + (4 + crc + 3) // 4  # ESI ~ CRC
+    return arb + 13 + data_phase * np.where(brs, data_ratio, 1.0)
+
+
+class BusLoadMonitor:
+    """
+    프레임 링버퍼 + 구간 통계. monitor(msg)로 프레임을 넣는다 (IsoTpTransport 리스너 / can.Notifier 호환).
+    IsoTpTransport 리스너는 수신 스레드와 송신 스레드에서 동시에 불리므로 슬롯 기록과 total 증가는
+    잠금 안에서 한다. 통계 계산은 잠금 없이 다른 스레드에서 해도 된다.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, bitrate=DEFAULT_BITRATE, data_bitrate=DEFAULT_DATA_BITRATE):
+        self.capacity = capacity
+        self.bitrate = bitrate
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.ids = np.zeros(capacity, dtype=np.uint32)
+        self.dlcs = np.zeros(capacity, dtype=np.uint8)
+        self.extended = np.zeros(capacity, dtype=np.bool_)
+        self.fd = np.zeros(capacity, dtype=np.bool_)
+        self.brs = np.zeros(capacity, dtype=np.bool_)
+        self.data_ratio = bitrate / data_bitrate
+        self.total = 0  # 지금까지 기록한 프레임 수 (다음 기록 위치 = total % capacity)
+        self.error_frames = 0
+        self._clock_offset = 0.0  # time.time() - msg.timestamp (드라이버 시계 → 벽시계)
+        self._lock = threading.Lock()
+
+    def __call__(self, msg):
+        with self._lock:
+            if msg.is_error_frame:
+                self.error_frames += 1
+                return
+            i = self.total % self.capacity
+            self.timestamps[i] = msg.timestamp
+            self.ids[i] = msg.arbitration_id
+            self.dlcs[i] = msg.dlc
+            self.extended[i] = msg.is_extended_id
+            self.fd[i] = msg.is_fd
+            self.brs[i] = msg.bitrate_switch
+            self._clock_offset = time.time() - msg.timestamp
+            self.total += 1
+
+    def clear(self):
+        with self._lock:
+            self.total = 0
+            self.error_frames = 0
+
+    def _columns(self):
+        return self.timestamps, self.ids, self.dlcs, self.extended, self.fd, self.brs
+
+    def window(self, seconds, now=None):
+        """최근 seconds초 구간의 (timestamps, ids, dlcs, extended, fd, brs) 배열 (시간순 복사본)"""
+        total = self.total
+        head = total % self.capacity
+        if total <= self.capacity or head == 0:
+            sl = slice(0, min(total, self.capacity))
+            arrays = tuple(a[sl] for a in self._columns())
+        else:
+            order = np.r_[head:self.capacity, 0:head]
+            arrays = tuple(a[order] for a in self._columns())
+        if now is None:
+            now = time.time() - self._clock_offset
+        start = np.searchsorted(arrays[0], now - seconds, side="left")
+        return tuple(a[start:] for a in arrays)
+
+    def stats(self, seconds=DEFAULT_WINDOW, now=None):
+        """
+        최근 seconds초 통계.
+        반환: {"window", "frames", "utilization", "dlc_hist", "ids": 구조화 배열(ID별 행)}
+        """
+        ts, ids, dlcs, ext, fd, brs = self.window(seconds, now)
+        bits = frame_bits(dlcs, ext)
+        if fd.any():
+            bits = np.where(fd, fd_frame_bits(dlcs, ext, brs, self.data_ratio), bits)
+        uniq, inv, counts = np.unique(ids, return_inverse=True, return_counts=True)
+        n_ids = len(uniq)
+
+        # ID별 도착 간격: (ID, 시각) 순으로 정렬한 뒤 같은 ID끼리의 차분만 모음
+        order = np.lexsort((ts, inv))
+        sid, sts = inv[order], ts[order]
+        same = sid[1:] == sid[:-1]
+        gaps = np.diff(sts)[same]
+        gid = sid[1:][same]
+        n_gaps = np.bincount(gid, minlength=n_ids)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.bincount(gid, weights=gaps, minlength=n_ids) / n_gaps
+            var = np.bincount(gid, weights=gaps * gaps, minlength=n_ids) / n_gaps - mean * mean
+        max_gap = np.zeros(n_ids)
+        np.maximum.at(max_gap, gid, gaps)
+
+        rows = np.zeros(n_ids, dtype=[
+            ("id", np.uint32), ("count", np.int64), ("rate_hz", np.float64), ("period_ms", np.float64),
+            ("jitter_ms", np.float64), ("max_gap_ms", np.float64), ("dlc", np.uint8), ("load_pct", np.float64),
+        ])
+        rows["id"] = uniq
+        rows["count"] = counts
+        rows["rate_hz"] = counts / seconds
+        rows["period_ms"] = np.nan_to_num(mean, nan=0.0) * 1000
+        rows["jitter_ms"] = np.sqrt(np.clip(np.nan_to_num(var, nan=0.0), 0, None)) * 1000
+        rows["max_gap_ms"] = max_gap * 1000
+        if n_ids:
+            np.maximum.at(rows["dlc"], inv, dlcs)
+        capacity_bits = self.bitrate * seconds
+        rows["load_pct"] = np.bincount(inv, weights=bits, minlength=n_ids) / capacity_bits * 100
+        return {
+            "window": seconds,
+            "frames": int(len(ts)),
+            "utilization": float(bits.sum()) / capacity_bits * 100,
+            "dlc_hist": np.bincount(dlcs, minlength=DLC_MAX + 1),
+            "ids": rows,
+        }
+
+
+def format_table(short, long_, top=None):
+    """짧은 구간 통계(short)를 표로, 긴 구간(long_)은 주기/사용률 비교용 열로 붙인다."""
+    long_rate = dict(zip(long_["ids"]["id"].tolist(), long_["ids"]["rate_hz"].tolist()))
+    rows = np.sort(short["ids"], order="load_pct")[::-1]
+    if top:
+        rows = rows[:top]
+    lines = [
+        f"Bus load {short['utilization']:5.1f}% ({short['window']:g}s)  "
+        f"{long_['utilization']:5.1f}% ({long_['window']:g}s)  frames/s {short['frames'] / short['window']:.0f}",
+        "DLC " + " ".join(f"{d}:{c}" for d, c in enumerate(short["dlc_hist"].tolist()) if c),
+        f"{'ID':>8} {'Hz':>8} {'Hz(long)':>9} {'period':>8} {'jitter':>8} {'maxgap':>8} {'DLC':>4} {'load%':>6}",
+    ]
+    for r in rows:
+        lines.append(
+            f"{int(r['id']):>8X} {r['rate_hz']:>8.1f} {long_rate.get(int(r['id']), 0.0):>9.1f} "
+            f"{r['period_ms']:>8.2f} {r['jitter_ms']:>8.3f} {r['max_gap_ms']:>8.2f} {int(r['dlc']):>4} "
+            f"{r['load_pct']:>6.2f}"
+        )
+    return "\n".join(lines)
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Sniff a CAN bus and show per-ID rate, jitter and bus load.")
+    add_bus_args(parser)
+    parser.add_argument("--window", type=float, default=DEFAULT_WINDOW, help="Short statistics window (s).")
+    parser.add_argument("--long-window", type=float, default=DEFAULT_LONG_WINDOW, help="Long statistics window (s).")
+    parser.add_argument("--refresh", type=float, default=0.5, help="Table refresh interval (s).")
+    parser.add_argument("--top", type=int, help="Show only the N busiest IDs.")
+    parser.add_argument("--duration", type=float, help="Stop after this many seconds (default: Ctrl+C).")
+    parser.add_argument("--capacity", type=int, default=DEFAULT_CAPACITY, help="Frame ring buffer size.")
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    monitor = BusLoadMonitor(args.capacity, args.bitrate, args.data_bitrate)
+
+    with open_bus(args.bustype, args.channel, args.bitrate, fd=args.fd, data_bitrate=args.data_bitrate) as bus:
+        notifier = can.Notifier(bus, [monitor])
+        t_end = time.monotonic() + args.duration if args.duration else None
+        try:
+            while True:
+                time.sleep(args.refresh)
+                table = format_table(monitor.stats(args.window), monitor.stats(args.long_window), args.top)
+                print(f"\x1b[H\x1b[J{args.bustype}:{args.channel or default_channel(args.bustype)}  "
+                      f"total={monitor.total} errors={monitor.error_frames}\n{table}", flush=True)
+                if t_end and time.monotonic() >= t_end:
+                    break
+        except KeyboardInterrupt:
+            pass
+        finally:
+            notifier.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
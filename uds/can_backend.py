@@ -0,0 +1,105 @@
+"""
+CAN 버스 백엔드 선택 (pcan / socketcan / vcan / virtual).
+
+백엔드 이름을 python-can 인터페이스와 기본 채널로 풀어 can.Bus를 연다.
+테이블에 없는 이름(kvaser, vector 등)은 python-can 인터페이스 이름으로 그대로 넘긴다.
+
+SocketCAN(vcan 포함)은
+  - 수신 타임스탬프를 커널이 찍는다 (python-can이 SO_TIMESTAMPNS를 켬)
+  - IsoTpTransport.subscribe()의 ID 필터가 커널 소켓 필터로 적용되어 필요 없는 프레임은 올라오지 않는다
+  - 여기서 소켓 수신 버퍼(SO_RCVBUF)를 키워 버스 부하가 높을 때 커널 단계의 드롭을 줄인다
+비트레이트는 SocketCAN에서는 `ip link set can0 type can bitrate 500000`으로 미리 설정한다.
+
+CAN FD(fd=True):
+  - pcan: 중재/데이터 구간 비트레이트로 BitTimingFd(샘플 포인트 80 %, 80 MHz 클럭)를 만들어 연다
+  - socketcan: `ip link set can0 type can bitrate 500000 dbitrate 2000000 fd on`으로 설정된 인터페이스에
+    CAN_RAW_FD_FRAMES를 켜고 연다
+  - virtual: FD 프레임을 그대로 전달한다 (ecu_simulator의 FD 모드 검증용)
+"""
+import collections
+import logging
+import socket
+
+import can
+
+LOGGER = logging.getLogger(__name__)
+
+BusBackend = collections.namedtuple("BusBackend", ["interface", "default_channel", "uses_bitrate"])
+
+BACKENDS = {
+    "pcan": BusBackend("pcan", "PCAN_USBBUS1", True),
+    "socketcan": BusBackend("socketcan", "can0", False),
+    "vcan": BusBackend("socketcan", "vcan0", False),
+    "virtual": BusBackend("virtual", "virtual", False),
+}
+DEFAULT_BACKEND = "pcan"
+DEFAULT_BITRATE = 500000
+DEFAULT_DATA_BITRATE = 2000000
+FD_CLOCK_HZ = 80_000_000  # PCAN-USB FD 기본 클럭
+FD_SAMPLE_POINT = 80.0
+SOCKET_RCVBUF = 1 << 20  # 1 MiB (커널 상한 net.core.rmem_max를 넘으면 상한까지만 적용됨)
+
+
+def default_channel(backend):
+    spec = BACKENDS.get(backend)
+    return spec.default_channel if spec else None
+
+
+def open_bus(backend=DEFAULT_BACKEND, channel=None, bitrate=DEFAULT_BITRATE, fd=False,
+             data_bitrate=DEFAULT_DATA_BITRATE, rcvbuf=SOCKET_RCVBUF, **kwargs):
+    """백엔드 이름으로 can.Bus를 연다. channel이 None이면 백엔드 기본 채널을 쓴다."""
+    spec = BACKENDS.get(backend) or BusBackend(backend, None, True)
+    if fd:
+        _add_fd_args(spec, bitrate, data_bitrate, kwargs)
+    elif spec.uses_bitrate and bitrate:
+        kwargs["bitrate"] = bitrate
+    bus = can.Bus(interface=spec.interface, channel=channel or spec.default_channel, **kwargs)
+    if spec.interface == "socketcan" and rcvbuf:
+        _set_rcvbuf(bus, rcvbuf)
+    return bus
+
+
+def _add_fd_args(spec, bitrate, data_bitrate, kwargs):
+    if spec.interface == "virtual":
+        kwargs["protocol"] = can.CanProtocol.CAN_FD
+        return
+    kwargs["fd"] = True
+    if spec.uses_bitrate:
+        kwargs["timing"] = can.BitTimingFd.from_sample_point(
+            f_clock=FD_CLOCK_HZ, nom_bitrate=bitrate or DEFAULT_BITRATE, nom_sample_point=FD_SAMPLE_POINT,
+            data_bitrate=data_bitrate, data_sample_point=FD_SAMPLE_POINT,
+        )
+
+
+def _set_rcvbuf(bus, size):
+    sock = getattr(bus, "socket", None)
+    if sock is None:
+        return
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, size)
+    except OSError as e:
+        LOGGER.warning("SO_RCVBUF=%d failed: %s", size, e)
+
+
+def add_bus_args(parser, backend=DEFAULT_BACKEND, channel=None):
+    """CLI 공통 버스 옵션 (--bustype/--channel/--bitrate). --channel 생략 시 백엔드 기본 채널"""
+    parser.add_argument("--bustype", default=backend,
+                        help=f"Bus backend: {', '.join(BACKENDS)} or any python-can interface (default: {backend}).")
+    parser.add_argument("--channel", default=channel, help="CAN channel (default depends on --bustype).")
+    parser.add_argument("--bitrate", type=int, default=DEFAULT_BITRATE,
+                        help="Bit rate for backends that set it (pcan); SocketCAN uses the ip link setting.")
+    add_fd_args(parser)
+
+
+def add_fd_args(parser):
+    """CAN FD 옵션 (--fd/--data-bitrate/--no-brs)"""
+    parser.add_argument("--fd", action="store_true", help="Use CAN FD frames (64-byte ISO-TP frames).")
+    parser.add_argument("--data-bitrate", type=int, default=DEFAULT_DATA_BITRATE,
+                        help="CAN FD data phase bit rate (pcan); SocketCAN uses the ip link dbitrate setting.")
+    parser.add_argument("--no-brs", dest="brs", action="store_false",
+                        help="Send CAN FD frames without bit rate switching.")
+
+
+def fd_options(args):
+    """add_bus_args로 받은 FD 옵션을 IsoTpTransport.open() 키워드 인자로"""
+    return {"fd": args.fd, "data_bitrate": args.data_bitrate, "brs": args.brs}
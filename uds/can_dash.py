@@ -1,776 +1,1760 @@
-import sys
-import can
-import time
-import struct  # [신규] 바이트 패킹(pack)을 위해 import
-from PyQt5 import QtWidgets, QtCore, QtGui
-
-
-class ECUInfoDialog(QtWidgets.QDialog):
-    """
-    DID 0x0005 (ECU Info) 쓰기 전용 다이얼로그 (이전과 동일)
-    """
-    def __init__(self, current_info, parent=None):
-        super().__init__(parent)
-        self.setWindowTitle("✏️ Edit ECU Info (WriteDataByIdentifier 0x2E)")
-        self.setFixedSize(450, 360)
-        
-        layout = QtWidgets.QGridLayout(self)
-        layout.setSpacing(10)
-
-        self.fields = {
-            'VIN': (18, current_info.get('vin', '')),
-            'Hardware PN': (20, current_info.get('hw', '')),
-            'Software PN': (20, current_info.get('sw', '')),
-            'Serial Number': (20, current_info.get('sn', '')),
-            'Supplier': (20, current_info.get('supplier', ''))
-        }
-        
-        self.editors = {}
-        row = 0
-
-        for label_text, (max_len, default_val) in self.fields.items():
-            label = QtWidgets.QLabel(f"{label_text}:")
-            layout.addWidget(label, row, 0, QtCore.Qt.AlignRight)
-
-            editor = QtWidgets.QLineEdit(default_val)
-            layout.addWidget(editor, row, 1)
-            
-            self.editors[label_text] = editor 
-            row += 1
-
-            hint_label = QtWidgets.QLabel(f"Max {max_len} bytes (ASCII)")
-            hint_label.setStyleSheet("font-size: 8pt; color: #555; padding-left: 5px;")
-            layout.addWidget(hint_label, row, 1, QtCore.Qt.AlignLeft)
-            row += 1
-
-        self.btn_send = QtWidgets.QPushButton("🚀 Send to ECU (0x2E)")
-        self.btn_send.clicked.connect(self.validate_and_accept)
-        layout.addWidget(self.btn_send, row, 0, 1, 2, QtCore.Qt.AlignCenter)
-        layout.setRowStretch(row + 1, 1)
-
-    def validate_and_accept(self):
-        errors = []
-        for label_text, (max_len, _) in self.fields.items():
-            editor = self.editors[label_text]
-            text = editor.text()
-            
-            try:
-                byte_len = len(text.encode('ascii', errors='ignore'))
-            except Exception:
-                byte_len = len(text.encode('ascii', errors='replace'))
-
-            if byte_len > max_len:
-                errors.append(f"❌ '{label_text}' is too long: {byte_len} bytes (Max {max_len})")
-
-        if errors:
-            error_msg = "Please correct the following errors:\n\n" + "\n".join(errors)
-            QtWidgets.QMessageBox.critical(self, "Validation Error", error_msg)
-            return
-        
-        self.accept()
-
-    def get_info_bytes(self):
-        def to_fixed_bytes(s, length):
-            b = s.encode('ascii', errors='ignore')[:length]
-            return b + b'\x00' * (length - len(b))
-
-        vin = to_fixed_bytes(self.editors['VIN'].text(), 18)
-        pad = b'\x00' * 2
-        hw = to_fixed_bytes(self.editors['Hardware PN'].text(), 20)
-        sw = to_fixed_bytes(self.editors['Software PN'].text(), 20)
-        sn = to_fixed_bytes(self.editors['Serial Number'].text(), 20)
-        supplier = to_fixed_bytes(self.editors['Supplier'].text(), 20)
-        return vin + pad + hw + sw + sn + supplier
-
-
-class SensorConfigDialog(QtWidgets.QDialog):
-    """
-    [신규] DID 0x0006 (센서 설정) 쓰기 전용 다이얼로그
-    """
-    def __init__(self, current_config, parent=None):
-        super().__init__(parent)
-        # [수정] 창 제목의 "Error" -> "Pass"
-        self.setWindowTitle("🔧 Edit Sensor Pass Conditions (DID 0x0006)")
-        self.setFixedSize(450, 300)
-
-        layout = QtWidgets.QVBoxLayout(self)
-        
-        # [수정] 메인 라벨 "ERROR" -> "PASS" (이모지 변경)
-        title_label = QtWidgets.QLabel("✅ PASS CONDITION")
-        title_label.setStyleSheet("font-size: 14pt; font-weight: 600; margin-bottom: 10px;")
-        layout.addWidget(title_label, alignment=QtCore.Qt.AlignCenter)
-
-        # 0~65535 (unsigned short)
-        validator = QtGui.QIntValidator(0, 65535, self)
-
-        form_layout = QtWidgets.QFormLayout()
-        
-        # [수정] 라벨 텍스트 변경 (Min/Max 순서가 PASS 로직과 일치함)
-        # [수정] 기본값을 current_config에서 가져오도록 수정 (C코드 기본값 반영)
-        self.ultra_min_edit = QtWidgets.QLineEdit(str(current_config.get('ultra_min', 0)))
-        self.ultra_min_edit.setValidator(validator)
-        self.ultra_max_edit = QtWidgets.QLineEdit(str(current_config.get('ultra_max', 400)))
-        self.ultra_max_edit.setValidator(validator)
-        form_layout.addRow("Ultrasonic Min (mm):", self.ultra_min_edit)
-        form_layout.addRow("Ultrasonic Max (mm):", self.ultra_max_edit)
-
-        self.tof_min_edit = QtWidgets.QLineEdit(str(current_config.get('tof_min', 0)))
-        self.tof_min_edit.setValidator(validator)
-        self.tof_max_edit = QtWidgets.QLineEdit(str(current_config.get('tof_max', 5000)))
-        self.tof_max_edit.setValidator(validator)
-        form_layout.addRow("ToF Min (mm):", self.tof_min_edit)
-        form_layout.addRow("ToF Max (mm):", self.tof_max_edit)
-        
-        layout.addLayout(form_layout)
-        layout.addStretch()
-
-        self.btn_send = QtWidgets.QPushButton("🚀 Send to ECU (0x2E)")
-        self.btn_send.clicked.connect(self.validate_and_accept)
-        layout.addWidget(self.btn_send, alignment=QtCore.Qt.AlignCenter)
-
-    def validate_and_accept(self):
-        try:
-            u_min = int(self.ultra_min_edit.text())
-            u_max = int(self.ultra_max_edit.text())
-            t_min = int(self.tof_min_edit.text())
-            t_max = int(self.tof_max_edit.text())
-        except ValueError:
-            QtWidgets.QMessageBox.critical(self, "Validation Error", "❌ All fields must be valid numbers.")
-            return
-
-        errors = []
-        if u_min >= u_max:
-            # Min/Max가 같을 수는 있으므로 (예: 0/0) < 로 수정
-            errors.append("❌ Ultrasonic Min must be strictly less than Max.")
-        if t_min >= t_max:
-            errors.append("❌ ToF Min must be strictly less than Max.")
-
-        if errors:
-            QtWidgets.QMessageBox.critical(self, "Validation Error", "\n".join(errors))
-            return
-        
-        self.accept()
-
-    def get_config_bytes(self):
-        u_min = int(self.ultra_min_edit.text())
-        u_max = int(self.ultra_max_edit.text())
-        t_min = int(self.tof_min_edit.text())
-        t_max = int(self.tof_max_edit.text())
-        
-        # C 구조체: unsigned short (2B) 4개
-        # Little-endian ('<'), Unsigned Short ('H') 4개 (TC375는 Little Endian)
-        return struct.pack('<HHHH', u_min, u_max, t_min, t_max)  
-
-
-class CANUDSGui(QtWidgets.QWidget):
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle("CAN/UDS Diagnostic GUI")
-        self.resize(1150, 820)
-
-        self.setStyleSheet("""
-            QWidget { background-color: #FAFAFF; color: #111; font-family: 'Segoe UI'; font-size: 10pt; }
-            QPushButton { background-color: #E9F1FF; border: 1px solid #BBD1FF; border-radius: 6px; padding: 6px; }
-            QPushButton:hover { background-color: #D9E9FF; }
-            QTextEdit { background-color: #FFFFFF; border: 1px solid #CFCFCF; border-radius: 4px; font-family: Consolas; }
-            QTableWidget { background-color: #FFFFFF; border: 1px solid #CFCFCF; border-radius: 4px; }
-            QGroupBox { font-weight: 600; }
-            QLabel.title { font-size: 12pt; font-weight: 600; }
-        """)
-
-        self.channel = "PCAN_USBBUS1"
-        self.bustype = "pcan"
-        self.bitrate = 500000
-        self.req_id = 0x7E0
-        self.res_id = 0x7E8
-
-        # [신규] 센서 설정값 (임계값)을 GUI 내부에 저장
-        # (원래는 0x22 0006으로 읽어와야 하지만, 현재는 쓰기만 구현하므로 기본값 저장)
-        
-        # [수정] C 코드(g_sensorThresholds)의 초기 기본값과 일치시킴
-        self.current_sensor_config = {
-            'ultra_min': 0,    # 2000 -> 0
-            'ultra_max': 400,  # 4000 -> 400
-            'tof_min': 0,      # 1000 -> 0
-            'tof_max': 5000
-        }
-
-        root = QtWidgets.QVBoxLayout(self)
-
-        # UDS 버튼
-        uds_row = QtWidgets.QHBoxLayout()
-        self.btn_read_ecu_info = QtWidgets.QPushButton("ℹ️ Read ECU Info (DID 0x0005)")
-        self.btn_write_ecu_info = QtWidgets.QPushButton("✏️ Write (0x2E...)") # 버튼 텍스트 수정
-        self.btn_read_dtc = QtWidgets.QPushButton("📖 Read DTCs (0x19)")
-        self.btn_clear_dtc = QtWidgets.QPushButton("🧹 Clear DTCs (0x14)")
-        uds_row.addWidget(self.btn_read_ecu_info)
-        uds_row.addWidget(self.btn_write_ecu_info)
-        uds_row.addWidget(self.btn_read_dtc)
-        uds_row.addWidget(self.btn_clear_dtc)
-        root.addLayout(uds_row)
-
-        # ... (기존 센서 버튼, 프레임 모니터, ECU Info 카드 등 UI 정의) ...
-        # (이하 UI 정의 코드는 변경 없음)
-        sensor_row = QtWidgets.QHBoxLayout()
-        self.btn_ultra1 = QtWidgets.QPushButton("🔹 Ultra Sensor 1 (0x0001)")
-        self.btn_ultra2 = QtWidgets.QPushButton("🔹 Ultra Sensor 2 (0x0002)")
-        self.btn_ultra3 = QtWidgets.QPushButton("🔹 Ultra Sensor 3 (0x0003)")
-        self.btn_tof = QtWidgets.QPushButton("🔹 ToF Sensor (0x0004)")
-        sensor_row.addWidget(self.btn_ultra1)
-        sensor_row.addWidget(self.btn_ultra2)
-        sensor_row.addWidget(self.btn_ultra3)
-        sensor_row.addWidget(self.btn_tof)
-        root.addLayout(sensor_row)
-        frame_layout = QtWidgets.QHBoxLayout()
-        self.sent_box = QtWidgets.QTextEdit(); self.sent_box.setReadOnly(True)
-        self.recv_box = QtWidgets.QTextEdit(); self.recv_box.setReadOnly(True)
-        left = QtWidgets.QVBoxLayout(); left.addWidget(QtWidgets.QLabel("📤 Sent Frames")); left.addWidget(self.sent_box)
-        right = QtWidgets.QVBoxLayout(); right.addWidget(QtWidgets.QLabel("📥 Received Frames")); right.addWidget(self.recv_box)
-        frame_layout.addLayout(left); frame_layout.addLayout(right)
-        root.addLayout(frame_layout)
-        info_card = QtWidgets.QGroupBox("🧾 ECU Information")
-        info_layout = QtWidgets.QFormLayout()
-        self.lbl_vin = QtWidgets.QLabel("-")
-        self.lbl_hw = QtWidgets.QLabel("-")
-        self.lbl_sw = QtWidgets.QLabel("-")
-        self.lbl_sn = QtWidgets.QLabel("-")
-        self.lbl_supplier = QtWidgets.QLabel("-")
-        info_layout.addRow("VIN:", self.lbl_vin)
-        info_layout.addRow("HW:", self.lbl_hw)
-        info_layout.addRow("SW:", self.lbl_sw)
-        info_layout.addRow("SN:", self.lbl_sn)
-        info_layout.addRow("Supplier:", self.lbl_supplier)
-        info_card.setLayout(info_layout)
-        root.addWidget(info_card)
-        sensor_card = QtWidgets.QGroupBox("📡 Sensor Values")
-        self.sensor_result = QtWidgets.QTextEdit(); self.sensor_result.setReadOnly(True)
-        scv = QtWidgets.QVBoxLayout(); scv.addWidget(self.sensor_result); sensor_card.setLayout(scv)
-        root.addWidget(sensor_card)
-        
-        # --- [DTC 테이블 수정] ---
-        dtc_card = QtWidgets.QGroupBox("⚙️ Diagnostic Trouble Codes (DTC)")
-        dtc_layout = QtWidgets.QVBoxLayout()
-        # [수정] 열 개수 4 -> 5
-        self.dtc_table = QtWidgets.QTableWidget(0, 5) 
-        # [수정] 헤더에 "DTC 설명" 추가
-        self.dtc_table.setHorizontalHeaderLabels(["#", "DTC 코드", "DTC 설명 (발생 센서)", "상태값", "상태 설명"])
-        
-        # [수정] 설명 열(2)이 가장 넓도록 설정
-        self.dtc_table.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.ResizeToContents)
-        self.dtc_table.horizontalHeader().setSectionResizeMode(0, QtWidgets.QHeaderView.ResizeToContents)
-        self.dtc_table.horizontalHeader().setSectionResizeMode(1, QtWidgets.QHeaderView.ResizeToContents)
-        self.dtc_table.horizontalHeader().setSectionResizeMode(2, QtWidgets.QHeaderView.Stretch) # 설명 열
-        self.dtc_table.horizontalHeader().setSectionResizeMode(3, QtWidgets.QHeaderView.ResizeToContents)
-        self.dtc_table.horizontalHeader().setSectionResizeMode(4, QtWidgets.QHeaderView.ResizeToContents)
-        
-        dtc_layout.addWidget(self.dtc_table)
-        # --- [DTC 테이블 수정 끝] ---
-        
-        dtc_card.setLayout(dtc_layout)
-        root.addWidget(dtc_card)
-        self.log_box = QtWidgets.QTextEdit(); self.log_box.setReadOnly(True)
-        self.result_box = QtWidgets.QTextEdit(); self.result_box.setReadOnly(True)
-        root.addWidget(QtWidgets.QLabel("🪶 Log Output"))
-        root.addWidget(self.log_box)
-        root.addWidget(QtWidgets.QLabel("📊 Diagnostic Results"))
-        root.addWidget(self.result_box)
-        # (여기까지 UI 정의 코드)
-
-        try:
-            self.bus = can.interface.Bus(channel=self.channel, bustype=self.bustype, bitrate=self.bitrate)
-            self.log("✅ PCAN USB connected successfully.")
-        except Exception as e:
-            self.bus = None
-            self.log(f"❌ CAN init failed: {e}")
-
-        # 버튼 연결
-        self.btn_ultra1.clicked.connect(lambda: self.read_by_did(0x0001))
-        self.btn_ultra2.clicked.connect(lambda: self.read_by_did(0x0002))
-        self.btn_ultra3.clicked.connect(lambda: self.read_by_did(0x0003))
-        self.btn_tof.clicked.connect(lambda: self.read_by_did(0x0004))
-        self.btn_read_ecu_info.clicked.connect(lambda: self.read_by_did(0x0005))
-        
-        # [수정] Write 버튼은 선택창을 띄우는 함수(start_write_process)에 연결
-        self.btn_write_ecu_info.clicked.connect(self.start_write_process)
-        
-        self.btn_read_dtc.clicked.connect(self.read_dtc)
-        self.btn_clear_dtc.clicked.connect(self.clear_dtc)
-
-    # ---------------- 유틸 ----------------
-    def log(self, text):
-        self.log_box.append(text)
-        self.log_box.verticalScrollBar().setValue(self.log_box.verticalScrollBar().maximum())
-
-    def recv_all(self, timeout=2.0):
-        frames = []
-        start = time.time()
-        while time.time() - start < timeout:
-            msg = self.bus.recv(timeout=0.1) if self.bus else None
-            if msg and msg.arbitration_id == self.res_id:
-                frames.append(msg)
-        return frames
-
-    def show_frames(self, frames):
-        for f in frames:
-            self.recv_box.append(f"ID:{hex(f.arbitration_id)} DATA: {' '.join(f'{b:02X}' for b in f.data)}")
-        self.recv_box.verticalScrollBar().setValue(self.recv_box.verticalScrollBar().maximum())
-
-    # ---------------- 기능: 0x22 (Read) ----------------
-    def read_by_did(self, did):
-        if not self.bus:
-            self.log("⚠️ CAN bus not ready")
-            return
-
-        did_h = (did >> 8) & 0xFF
-        did_l = did & 0xFF
-        tx = [0x03, 0x22, did_h, did_l, 0, 0, 0, 0]
-        msg = can.Message(arbitration_id=self.req_id, data=tx, is_extended_id=False)
-        self.bus.send(msg)
-        self.sent_box.append(" ".join(f"{b:02X}" for b in tx))
-        self.log(f"▶ Sent ReadDataByIdentifier DID=0x{did:04X}")
-
-        frames = self.recv_all(timeout=3.0)
-        if frames:
-            self.show_frames(frames)
-            self.parse_uds_response(frames, 0x22, did)
-
-    # ---------------- 기능: 0x2E (Write) - 로직 분리 ----------------
-
-    def start_write_process(self):
-        """
-        [신규] 'Write' 버튼 클릭 시 어떤 작업을 할지 선택하는 팝업창 표시
-        """
-        msg_box = QtWidgets.QMessageBox(self)
-        msg_box.setWindowTitle("Select Write Operation")
-        msg_box.setText("Which information would you like to write?")
-        btn_ecu = msg_box.addButton("✏️ ECU Info (DID 0x0005)", QtWidgets.QMessageBox.ActionRole)
-        btn_sensor = msg_box.addButton("🔧 Sensor Conditions (DID 0x0006)", QtWidgets.QMessageBox.ActionRole)
-        msg_box.addButton("Cancel", QtWidgets.QMessageBox.RejectRole)
-        msg_box.exec_()
-
-        clicked_button = msg_box.clickedButton()
-
-        if clicked_button == btn_ecu:
-            self.write_ecu_info_dialog()
-        elif clicked_button == btn_sensor:
-            self.write_sensor_config_dialog()
-
-    def write_ecu_info_dialog(self):
-        """
-        [수정] 기존 write_ecu_info 함수 -> ECU Info 전용 다이얼로그 호출
-        """
-        current_info = {
-            'vin': self.lbl_vin.text() if self.lbl_vin.text() != '-' else '',
-            'hw': self.lbl_hw.text() if self.lbl_hw.text() != '-' else '',
-            'sw': self.lbl_sw.text() if self.lbl_sw.text() != '-' else '',
-            'sn': self.lbl_sn.text() if self.lbl_sn.text() != '-' else '',
-            'supplier': self.lbl_supplier.text() if self.lbl_supplier.text() != '-' else ''
-        }
-        
-        dialog = ECUInfoDialog(current_info, self)
-        
-        if dialog.exec_():
-            data = dialog.get_info_bytes()
-            # ECU Info는 데이터가 길어서 TP(Transport Protocol) 전송 필요
-            self.send_uds_tp_write(0x0005, data)
-
-    def write_sensor_config_dialog(self):
-        """
-        [신규] 센서 설정 다이얼로그를 띄우고 전송하는 함수
-        """
-        dialog = SensorConfigDialog(self.current_sensor_config, self)
-        
-        if dialog.exec_():
-            data = dialog.get_config_bytes() # 8 bytes
-            
-            # [수정] 전송 성공 시, GUI 내부 변수도 업데이트
-            # (사용자가 다음에 창을 열 때 이 값이 기본값이 됨)
-            self.current_sensor_config['ultra_min'] = int(dialog.ultra_min_edit.text())
-            self.current_sensor_config['ultra_max'] = int(dialog.ultra_max_edit.text())
-            self.current_sensor_config['tof_min'] = int(dialog.tof_min_edit.text())
-            self.current_sensor_config['tof_max'] = int(dialog.tof_max_edit.text())
-            
-            # [주석 수정] UDS 페이로드(SID+DID+Data = 3+8=11 bytes)가 
-            # 7바이트를 초과하므로 TP 전송이 필요함.
-            self.send_uds_tp_write(0x0006, data)
-
-    def send_uds_sf_write(self, did, data):
-        """
-        [신규] Single Frame Write 전송 함수 (짧은 데이터, 8바이트 미만)
-        """
-        did_h = (did >> 8) & 0xFF
-        did_l = did & 0xFF
-        
-        # PCI(len+3) | SID | DID H | DID L | data...
-        payload_len = 3 + len(data)
-        if payload_len > 7:
-            self.log("❌ SF Error: Data too long for Single Frame.")
-            return
-
-        tx = bytearray(8)
-        tx[0] = payload_len
-        tx[1] = 0x2E
-        tx[2] = did_h
-        tx[3] = did_l
-        tx[4:4+len(data)] = data
-        
-        self.bus.send(can.Message(arbitration_id=self.req_id, data=tx, is_extended_id=False))
-        self.sent_box.append(" ".join(f"{b:02X}" for b in tx))
-        self.log(f"🚀 Sent Write (SF) DID=0x{did:04X}, len={len(data)}")
-        
-        self.wait_for_write_ack(did) # ACK 대기 및 확인
-
-    def send_uds_tp_write(self, did, data):
-        """
-        [신규] Transport Protocol Write 전송 함수 (긴 데이터 - 기존 로직 재활용)
-        """
-        did_h, did_l = (did >> 8) & 0xFF, did & 0xFF
-        uds_data = bytearray([0x2E, did_h, did_l]) + data
-        total_len = len(uds_data)
-        self.log(f"🚀 Sending {total_len} bytes (DID 0x{did:04X}) via TP...")
-
-        # First Frame
-        ff = bytearray(8)
-        ff[0] = 0x10 | ((total_len >> 8) & 0x0F)
-        ff[1] = total_len & 0xFF
-        ff[2:8] = uds_data[:6]
-        self.bus.send(can.Message(arbitration_id=self.req_id, data=ff, is_extended_id=False))
-        self.sent_box.append(" ".join(f"{b:02X}" for b in ff))
-
-        # ▶ FlowControl(0x30) 기다리기
-        fc = None
-        t0 = time.time()
-        while time.time() - t0 < 2.0:
-            m = self.bus.recv(timeout=0.1)
-            if m and m.arbitration_id == self.res_id and (m.data[0] >> 4) == 0x3:
-                fc = m.data
-                break
-        if not fc:
-            self.log("⚠️ FlowControl(0x30) 미수신 → 전송 중단")
-            return
-
-        fs, bs, stmin = fc[0] & 0x0F, fc[1], fc[2]
-        if fs != 0x0: # 0x0 = CTS
-            self.log(f"⚠️ FC FS!=CTS (FS=0x{fs:02X})")
-            return
-        gap_sec = (stmin/1000.0) if stmin <= 0x7F else ((stmin-0xF0)/10000.0 if 0xF1 <= stmin <= 0xF9 else 0.0)
-
-        # ▶ CF 전송
-        sent, sn, blk = 6, 1, 0
-        while sent < total_len:
-            cf = bytearray(8); cf[0] = 0x20 | (sn & 0x0F)
-            # 마지막 프레임이 7바이트 미만일 수 있으므로 정확히 채움
-            payload_size = min(7, total_len - sent)
-            cf[1:1+payload_size] = uds_data[sent:sent+payload_size]
-            sent += payload_size
-                
-            self.bus.send(can.Message(arbitration_id=self.req_id, data=cf, is_extended_id=False))
-            self.sent_box.append(" ".join(f"{b:02X}" for b in cf))
-            sn = (sn + 1) % 16; blk += 1
-            time.sleep(gap_sec if gap_sec > 0 else 0.0)
-
-            if bs and blk >= bs and sent < total_len:
-                blk = 0
-                fc = None; t1 = time.time()
-                while time.time() - t1 < 1.0:
-                    m = self.bus.recv(timeout=0.1)
-                    if m and m.arbitration_id == self.res_id and (m.data[0] >> 4) == 0x3:
-                        fc = m.data; break
-                if not fc: 
-                    self.log("⚠️ 다음 블록 FC 미수신"); return
-        
-        self.wait_for_write_ack(did) # ACK 대기 및 확인
-
-    def wait_for_write_ack(self, did):
-        """
-        [신규] Write Positive Response(0x6E)를 기다리는 공통 함수
-        """
-        self.log(f"⏳ Waiting for 0x6E (Write ACK for DID 0x{did:04X})...")
-        did_h, did_l = (did >> 8) & 0xFF, did & 0xFF
-        
-        frames = self.recv_all(timeout=3.0)
-        if frames:
-            self.show_frames(frames)
-            # SF 응답: [0x03, 0x6E, DID_H, DID_L]
-            ack_ok = any(
-                (len(f.data) >= 4 and f.data[0] == 0x03 and f.data[1] == 0x6E and f.data[2] == did_h and f.data[3] == did_l)
-                for f in frames
-            )
-            if ack_ok:
-                self.log(f"✅ Write ACK OK for DID 0x{did:04X}.")
-                # ECU Info (0x0005)를 쓴 경우에만 화면 갱신을 위해 Read 실행
-                if did == 0x0005:
-                    self.log("... Verify by reading...")
-                    self.read_by_did(0x0005)
-            else:
-                self.result_box.append(f"⚠️ 0x6E ACK for DID 0x{did:04X} not found.")
-        else:
-            self.result_box.append("⚠️ No response received.")
-
-            
-    # ---------------- 기능: 0x19 (Read DTC) ----------------
-    def read_dtc(self):
-        tx = [0x03, 0x19, 0x02, 0xFF, 0, 0, 0, 0]
-        msg = can.Message(arbitration_id=self.req_id, data=tx, is_extended_id=False)
-        self.bus.send(msg)
-        self.sent_box.append(" ".join(f"{b:02X}" for b in tx))
-        self.log("▶ Sent ReadDTCInformation")
-
-        frames = self.recv_all(timeout=3.0)
-        if frames:
-            self.show_frames(frames)
-            self.parse_uds_response(frames, 0x19, 0)
-
-    # ---------------- 기능: 0x14 (Clear DTC) ----------------
-    def clear_dtc(self):
-        tx = [0x02, 0x14, 0xFF, 0, 0, 0, 0, 0]
-        msg = can.Message(arbitration_id=self.req_id, data=tx, is_extended_id=False)
-        self.bus.send(msg)
-        self.sent_box.append(" ".join(f"{b:02X}" for b in tx))
-        self.log("▶ Sent ClearDiagnosticInformation")
-        frames = self.recv_all(timeout=2.0)
-        if frames:
-            self.show_frames(frames)
-            # 0x54 (Positive) 응답이 있는지 명시적으로 확인
-            is_cleared = any(f.data[0] == 0x02 and f.data[1] == 0x54 for f in frames)
-            if is_cleared:
-                self.log("✅ DTC Clear acknowledged (0x54). Reading DTCs again...")
-                # 확인을 위해 즉시 DTC 재조회
-                self.read_dtc() 
-            else:
-                self.log("⚠️ DTC Clear response 0x54 not found.")
-        else:
-            self.log("⚠️ No response for ClearDTC.")
-
-
-    # ---------------- TP 파서 ----------------
-    def parse_uds_response(self, frames, req_sid, did):
-        payload = bytearray()
-        total_len = 0
-        sn_expected = 1
-        pos_sid = (req_sid + 0x40) & 0xFF
-        got_ff = False
-
-        for f in frames:
-            d = f.data
-            pci_type = d[0] >> 4
-
-            if pci_type == 3:  # FC
-                continue # FC는 수신 시 파싱에서는 무시
-
-            if pci_type == 0:  # SF
-                sf_len = d[0] & 0x0F
-                # SF는 0x6E(Write Ack)일 수도 있고 0x62(Read Ack)일 수도 있음
-                # Write Ack는 recv_all에서 별도 처리했으므로 여기서는 무시
-                if d[1] == pos_sid:
-                    payload.extend(d[1:1+sf_len])
-                    self.log(f"📥 Single Frame received ({sf_len} bytes).")
-                continue
-
-            if pci_type == 1:  # FF
-                total_len = ((d[0] & 0x0F) << 8) | d[1]
-                payload.extend(d[2:8])
-                sn_expected = 1
-                got_ff = True
-                self.log(f"📦 First Frame (len={total_len}) received.")
-                continue
-
-            if pci_type == 2 and got_ff:  # CF
-                sn = d[0] & 0x0F
-                if sn != (sn_expected & 0x0F):
-                    self.log(f"⚠️ SeqErr: expected SN={sn_expected}, got={sn}")
-                sn_expected = (sn_expected + 1) % 16
-                
-                # 마지막 프레임 처리: total_len 기준으로 정확히 파싱
-                bytes_left = total_len - len(payload)
-                bytes_to_copy = min(7, bytes_left)
-                if bytes_to_copy > 0:
-                    payload.extend(d[1:1+bytes_to_copy])
-                
-                if len(payload) >= total_len:
-                    got_ff = False # 수신 완료
-                
-                continue
-
-        if not payload:
-            self.log("⚠️ No valid UDS Read payload collected.")
-            return
-            
-        self.log(f"ℹ️ Reconstructed payload ({len(payload)} bytes): "
-                 f"{' '.join(f'{b:02X}' for b in payload[:40])}{' ...' if len(payload) > 40 else ''}")
-
-        uds_sid = payload[0]
-        if uds_sid != pos_sid:
-            self.log(f"⚠️ Unexpected SID=0x{uds_sid:02X} (expected 0x{pos_sid:02X})")
-            return
-
-        # -------- 서비스별 헤더 분리 --------
-        if req_sid == 0x22: # Read
-            if len(payload) < 3:
-                self.log("⚠️ Payload too short for DID-based response.")
-                return
-            uds_did = (payload[1] << 8) | payload[2]
-            data = payload[3:]
-            data_len = len(data)
-
-            # ECU Info (DID 0x0005)
-            if did == 0x0005: 
-                if data_len < 100:
-                    self.log(f"⚠️ ECU Info payload too short ({data_len} bytes), expected 100.")
-                    return
-
-                def safe_decode(segment):
-                    try:
-                        return segment.split(b'\x00')[0].decode('ascii', errors='ignore')
-                    except Exception:
-                        return "<DecodeError>"
-
-                vin = safe_decode(data[0:18])
-                hw = safe_decode(data[20:40])
-                sw = safe_decode(data[40:60])
-                sn = safe_decode(data[60:80])
-                supplier = safe_decode(data[80:100])
-
-                self.lbl_vin.setText(vin)
-                self.lbl_hw.setText(hw)
-                self.lbl_sw.setText(sw)
-                self.lbl_sn.setText(sn)
-                self.lbl_supplier.setText(supplier)
-                
-                self.log("📗 ECU Info successfully parsed (100 bytes).")
-                return
-
-            # 센서 (DID 0x0001 ~ 0x0004)
-            if did in (0x0001, 0x0002, 0x0003, 0x0004):
-                if data_len >= 3:
-                    val = (data[0] << 8) | data[1]
-                    status_char = chr(data[2]) if 32 <= data[2] <= 126 else '?'
-                    self.sensor_result.append(
-                        f"✅ Sensor DID 0x{did:04X}: {val} mm (0x{val:04X}) '{status_char}'"
-                    )
-                    self.log(f"📘 Sensor data decoded (Result={status_char}).")
-                else:
-                    self.log(f"⚠️ Invalid sensor payload length ({data_len}).")
-                return
-            
-            # TODO: DID 0x0006 (센서 설정값 읽기) 파싱 로직 추가
-            
-            return
-
-        elif req_sid == 0x19: # Read DTC
-            if len(payload) < 2:
-                self.log("⚠️ DTC payload too short.")
-                return
-            subfunc = payload[1]
-            data = payload[2:]  # status mask + entries...
-            data_len = len(data)
-
-            # DTC 없음
-            if data_len <= 1:
-                self.result_box.append("✅ DTC 없음 (No Diagnostic Trouble Code Stored)")
-                self.update_dtc_table([])
-                self.log("📙 DTC information decoded (empty).")
-                return
-
-            # DTC 있음
-            if data_len >= 5:
-                status_mask = data[0]
-                dtcs = []
-                off = 1
-                while off + 3 < data_len: # 4바이트(DTC 3 + Status 1)가 남아있어야 함
-                    code = (data[off] << 16) | (data[off+1] << 8) | data[off+2]
-                    status = data[off+3]
-                    dtcs.append((code, status))
-                    off += 4
-
-                self.result_box.append(f"✅ DTC Count: {len(dtcs)}")
-                for i, (code, status) in enumerate(dtcs, 1):
-                    desc = self.get_dtc_status_desc(status)
-                    self.result_box.append(f" DTC {i}: 0x{code:06X}, Status: 0x{status:02X} ({desc})")
-
-                self.update_dtc_table(dtcs)
-                self.log("📙 DTC information decoded.")
-                return
-
-            self.log("⚠️ DTC payload format not recognized.")
-            return
-
-        elif req_sid == 0x14: # Clear DTC
-            # 0x54 응답은 보통 SF (pci_type == 0)이며,
-            # 여기서는 TP로 조립된 페이로드가 아니므로 parse_uds_response에 들어오지 않음
-            # (clear_dtc 함수 내에서 직접 처리함)
-            pass
-
-    # ---------------- DTC 테이블 업데이트 (수정됨) ----------------
-    def update_dtc_table(self, dtcs):
-        self.dtc_table.setRowCount(0)
-        if not dtcs:
-            self.dtc_table.insertRow(0)
-            self.dtc_table.setItem(0, 0, QtWidgets.QTableWidgetItem("1"))
-            self.dtc_table.setItem(0, 1, QtWidgets.QTableWidgetItem("없음"))
-            # [수정] 5열에 맞게 수정
-            self.dtc_table.setItem(0, 2, QtWidgets.QTableWidgetItem("DTC 없음")) 
-            self.dtc_table.setItem(0, 3, QtWidgets.QTableWidgetItem("-"))
-            self.dtc_table.setItem(0, 4, QtWidgets.QTableWidgetItem("정상 (No Fault)"))
-            return
-
-        for i, (code, status) in enumerate(dtcs, 1):
-            row = self.dtc_table.rowCount()
-            self.dtc_table.insertRow(row)
-            self.dtc_table.setItem(row, 0, QtWidgets.QTableWidgetItem(str(i)))
-            self.dtc_table.setItem(row, 1, QtWidgets.QTableWidgetItem(f"0x{code:06X}"))
-            # [신규] 2번 열에 DTC 설명 추가
-            self.dtc_table.setItem(row, 2, QtWidgets.QTableWidgetItem(self.get_dtc_description(code)))
-            # [수정] 기존 열 인덱스 2->3, 3->4
-            self.dtc_table.setItem(row, 3, QtWidgets.QTableWidgetItem(f"0x{status:02X}"))
-            self.dtc_table.setItem(row, 4, QtWidgets.QTableWidgetItem(self.get_dtc_status_desc(status)))
-
-    # ---------------- DTC 설명 변환 (신규) ----------------
-    def get_dtc_description(self, code):
-        """
-        [신규] C 펌웨어(can.c)에서 정의한 DTC 코드를
-        사람이 읽을 수 있는 설명으로 변환합니다.
-        """
-        
-        # 펌웨어(can.c)의 DTC 생성 로직:
-        # 0x010100 + (side_index * 0x10) + 0x0 (Timeout)
-        # 0x010100 + (side_index * 0x10) + 0x1 (Range Error)
-        # 0x010200 (ToF Timeout)
-        # 0x010201 (ToF Range Error)
-        
-        mapping = {
-            # 초음파 센서 1 (Left)
-            0x010100: "Ultrasonic 1 (Left) - Timeout/No Data",
-            0x010101: "Ultrasonic 1 (Left) - Out of Range",
-            
-            # 초음파 센서 2 (Right)
-            0x010110: "Ultrasonic 2 (Right) - Timeout/No Data",
-            0x010111: "Ultrasonic 2 (Right) - Out of Range",
-            
-            # 초음파 센서 3 (Rear)
-            0x010120: "Ultrasonic 3 (Rear) - Timeout/No Data",
-            0x010121: "Ultrasonic 3 (Rear) - Out of Range",
-            
-            # ToF 센서
-            0x010200: "ToF Sensor - Timeout/No Data",
-            0x010201: "ToF Sensor - Out of Range",
-        }
-        return mapping.get(code, f"알 수 없는 코드 (0x{code:06X})")
-
-    # ---------------- 상태 설명 변환 ----------------
-    def get_dtc_status_desc(self, status):
-        mapping = {
-            0x00: "정상 (No Fault)",
-            0x01: "보류 (Pending)",
-            0x08: "이번 주기 실패",
-            0x10: "현재 실패 (Test Failed)",
-            0x40: "확정 (Confirmed)",
-        }
-        return mapping.get(status, f"알 수 없음 (0x{status:02X})")
-
-
-if __name__ == "__main__":
-    app = QtWidgets.QApplication(sys.argv)
-    gui = CANUDSGui()
-    gui.show()
+import argparse
+import json
+import sys
+import can
+import queue
+import threading
+import time
+from PyQt5 import QtWidgets, QtCore, QtGui
+
+from bus_monitor import DEFAULT_LONG_WINDOW, DEFAULT_WINDOW, BusLoadMonitor
+from can_backend import BACKENDS, DEFAULT_BACKEND, DEFAULT_BITRATE, DEFAULT_DATA_BITRATE, default_channel
+from dtc_state import DtcStateCache
+from isotp_transport import IsoTpError, IsoTpTransport
+from sensor_buffer import SensorRingBuffer
+from trace_tools import TraceRecorder
+from uds_client import (
+    DID_ECU_INFO,
+    DID_SENSOR_CONFIG,
+    SENSOR_DIDS,
+    decode_dtc_report,
+    encode_ecu_info,
+    encode_sensor_config,
+    P2_CLIENT,
+    P2_STAR_CLIENT,
+    UdsClient,
+    UdsError,
+    wait_response,
+)
+from uds_codec import decode_did_records, did_name, dtc_description, dtc_status_description, nrc_name
+from uds_flash import FLASH_BASE, download, open_image
+from uds_scan import DEFAULT_SCAN_REQUESTS, parse_target, scan
+
+# 라이브 폴링: 링버퍼 크기(DID당 샘플 수), 플롯 최대 갱신 속도, 플롯에 보이는 시간 범위
+POLL_BUFFER_SIZE = 6000
+PLOT_MAX_FPS = 15
+PLOT_WINDOW_SEC = 60.0
+
+# 프레임/로그 뷰: 보관 개수 상한과 화면 반영 주기
+FRAME_LOG_SIZE = 5000
+LOG_MAX_LINES = 2000
+VIEW_FLUSH_MS = 100
+
+# DTC 자동 조회 주기 (변경된 행만 다시 그리므로 계속 켜 두어도 부담이 적음)
+DTC_POLL_MS = 1000
+
+# 버스 모니터 표 갱신 주기 (통계는 갱신할 때만 계산)
+BUS_MONITOR_REFRESH_MS = 500
+
+# 다중 DID 0x22를 ECU가 지원하지 않는다고 보는 부정 응답 (그 외 실패는 이번 한 번만 개별 요청)
+#   0x11 serviceNotSupported (펌웨어: 멀티프레임 0x22), 0x13 길이/형식 오류,
+#   0x14 responseTooLong, 0x31 requestOutOfRange
+MULTI_DID_REJECT_NRCS = {0x11, 0x13, 0x14, 0x31}
+
+
+class ECUInfoDialog(QtWidgets.QDialog):
+    """
+    DID 0x0005 (ECU Info) 쓰기 전용 다이얼로그 (이전과 동일)
+    """
+    def __init__(self, current_info, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("✏️ Edit ECU Info (WriteDataByIdentifier 0x2E)")
+        self.setFixedSize(450, 360)
+        
+        layout = QtWidgets.QGridLayout(self)
+        layout.setSpacing(10)
+
+        self.fields = {
+            'VIN': (18, current_info.get('vin', '')),
+            'Hardware PN': (20, current_info.get('hw', '')),
+            'Software PN': (20, current_info.get('sw', '')),
+            'Serial Number': (20, current_info.get('sn', '')),
+            'Supplier': (20, current_info.get('supplier', ''))
+        }
+        
+        self.editors = {}
+        row = 0
+
+        for label_text, (max_len, default_val) in self.fields.items():
+            label = QtWidgets.QLabel(f"{label_text}:")
+            layout.addWidget(label, row, 0, QtCore.Qt.AlignRight)
+
+            editor = QtWidgets.QLineEdit(default_val)
+            layout.addWidget(editor, row, 1)
+            
+            self.editors[label_text] = editor 
+            row += 1
+
+            hint_label = QtWidgets.QLabel(f"Max {max_len} bytes (ASCII)")
+            hint_label.setStyleSheet("font-size: 8pt; color: #555; padding-left: 5px;")
+            layout.addWidget(hint_label, row, 1, QtCore.Qt.AlignLeft)
+            row += 1
+
+        self.btn_send = QtWidgets.QPushButton("🚀 Send to ECU (0x2E)")
+        self.btn_send.clicked.connect(self.validate_and_accept)
+        layout.addWidget(self.btn_send, row, 0, 1, 2, QtCore.Qt.AlignCenter)
+        layout.setRowStretch(row + 1, 1)
+
+    def validate_and_accept(self):
+        errors = []
+        for label_text, (max_len, _) in self.fields.items():
+            editor = self.editors[label_text]
+            text = editor.text()
+            
+            try:
+                byte_len = len(text.encode('ascii', errors='ignore'))
+            except Exception:
+                byte_len = len(text.encode('ascii', errors='replace'))
+
+            if byte_len > max_len:
+                errors.append(f"❌ '{label_text}' is too long: {byte_len} bytes (Max {max_len})")
+
+        if errors:
+            error_msg = "Please correct the following errors:\n\n" + "\n".join(errors)
+            QtWidgets.QMessageBox.critical(self, "Validation Error", error_msg)
+            return
+        
+        self.accept()
+
+    def get_info_bytes(self):
+        # VIN(18) + pad(2) + HW/SW/SN/Supplier(20씩) = 100 bytes
+        return encode_ecu_info({
+            'vin': self.editors['VIN'].text(),
+            'hw': self.editors['Hardware PN'].text(),
+            'sw': self.editors['Software PN'].text(),
+            'sn': self.editors['Serial Number'].text(),
+            'supplier': self.editors['Supplier'].text(),
+        })
+
+
+class SensorConfigDialog(QtWidgets.QDialog):
+    """
+    [신규] DID 0x0006 (센서 설정) 쓰기 전용 다이얼로그
+    """
+    def __init__(self, current_config, parent=None):
+        super().__init__(parent)
+        # [수정] 창 제목의 "Error" -> "Pass"
+        self.setWindowTitle("🔧 Edit Sensor Pass Conditions (DID 0x0006)")
+        self.setFixedSize(450, 300)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        
+        # [수정] 메인 라벨 "ERROR" -> "PASS" (이모지 변경)
+        title_label = QtWidgets.QLabel("✅ PASS CONDITION")
+        title_label.setStyleSheet("font-size: 14pt; font-weight: 600; margin-bottom: 10px;")
+        layout.addWidget(title_label, alignment=QtCore.Qt.AlignCenter)
+
+        # 0~65535 (unsigned short)
+        validator = QtGui.QIntValidator(0, 65535, self)
+
+        form_layout = QtWidgets.QFormLayout()
+        
+        # [수정] 라벨 텍스트 변경 (Min/Max 순서가 PASS 로직과 일치함)
+        # [수정] 기본값을 current_config에서 가져오도록 수정 (C코드 기본값 반영)
+        self.ultra_min_edit = QtWidgets.QLineEdit(str(current_config.get('ultra_min', 0)))
+        self.ultra_min_edit.setValidator(validator)
+        self.ultra_max_edit = QtWidgets.QLineEdit(str(current_config.get('ultra_max', 400)))
+        self.ultra_max_edit.setValidator(validator)
+        form_layout.addRow("Ultrasonic Min (mm):", self.ultra_min_edit)
+        form_layout.addRow("Ultrasonic Max (mm):", self.ultra_max_edit)
+
+        self.tof_min_edit = QtWidgets.QLineEdit(str(current_config.get('tof_min', 0)))
+        self.tof_min_edit.setValidator(validator)
+        self.tof_max_edit = QtWidgets.QLineEdit(str(current_config.get('tof_max', 5000)))
+        self.tof_max_edit.setValidator(validator)
+        form_layout.addRow("ToF Min (mm):", self.tof_min_edit)
+        form_layout.addRow("ToF Max (mm):", self.tof_max_edit)
+        
+        layout.addLayout(form_layout)
+        layout.addStretch()
+
+        self.btn_send = QtWidgets.QPushButton("🚀 Send to ECU (0x2E)")
+        self.btn_send.clicked.connect(self.validate_and_accept)
+        layout.addWidget(self.btn_send, alignment=QtCore.Qt.AlignCenter)
+
+    def validate_and_accept(self):
+        try:
+            u_min = int(self.ultra_min_edit.text())
+            u_max = int(self.ultra_max_edit.text())
+            t_min = int(self.tof_min_edit.text())
+            t_max = int(self.tof_max_edit.text())
+        except ValueError:
+            QtWidgets.QMessageBox.critical(self, "Validation Error", "❌ All fields must be valid numbers.")
+            return
+
+        errors = []
+        if u_min >= u_max:
+            # Min/Max가 같을 수는 있으므로 (예: 0/0) < 로 수정
+            errors.append("❌ Ultrasonic Min must be strictly less than Max.")
+        if t_min >= t_max:
+            errors.append("❌ ToF Min must be strictly less than Max.")
+
+        if errors:
+            QtWidgets.QMessageBox.critical(self, "Validation Error", "\n".join(errors))
+            return
+        
+        self.accept()
+
+    def get_config_bytes(self):
+        u_min = int(self.ultra_min_edit.text())
+        u_max = int(self.ultra_max_edit.text())
+        t_min = int(self.tof_min_edit.text())
+        t_max = int(self.tof_max_edit.text())
+        
+        # C 구조체: unsigned short (2B) 4개, Little-endian (TC375는 Little Endian)
+        return encode_sensor_config(u_min, u_max, t_min, t_max)
+
+
+class UdsJob:
+    """
+    [신규] 워커 스레드에서 실행할 UDS 요청 한 건
+    on_done(job)은 완료 후 GUI 스레드에서 호출됨 (pdu=None이면 응답 없음)
+    payload에 리스트를 주면 요청을 연달아 보낸 뒤(파이프라인) 응답을 순서대로 pdus에 모은다.
+    """
+    def __init__(self, payload, on_done, sent_log=None, quiet=False):
+        if isinstance(payload, (bytes, bytearray)):
+            self.payloads = [bytes(payload)]
+        else:
+            self.payloads = [bytes(p) for p in payload]
+        self.on_done = on_done
+        self.sent_log = sent_log
+        self.quiet = quiet  # 라이브 폴링처럼 반복되는 요청은 프레임/로그 표시 생략
+        self.pdus = []
+        self.error = None
+
+    @property
+    def pdu(self):
+        return self.pdus[0] if self.pdus else None
+
+
+class WorkerHold:
+    """
+    [신규] UdsWorker 큐에 넣는 점유 작업
+    스캔/다운로드처럼 같은 응답 ID 큐를 직접 쓰는 스레드가 도는 동안 워커를 멈춰 둔다.
+    (워커가 다른 요청 전에 flush()하거나 응답을 가져가면 0x36/0x37, 스캔 응답이 사라짐)
+    acquired: 워커가 진행 중이던 요청을 끝내고 멈춤, released: 점유 해제
+    """
+    def __init__(self):
+        self.acquired = threading.Event()
+        self.released = threading.Event()
+
+    def hold(self):
+        self.acquired.set()
+        self.released.wait()
+
+
+class HoldingThread(QtCore.QThread):
+    """
+    [신규] 대상 ECU 워커들을 WorkerHold로 멈춘 뒤 work()를 실행하는 스레드
+    (폴링/수동 요청은 그동안 워커 큐에서 기다렸다가 끝난 뒤 이어서 처리됨)
+    """
+    def __init__(self, holds=(), parent=None):
+        super().__init__(parent)
+        self.holds = list(holds)
+
+    def run(self):
+        try:
+            for h in self.holds:
+                h.acquired.wait()
+            self.work()
+        finally:
+            for h in self.holds:
+                h.released.set()
+
+    def work(self):
+        raise NotImplementedError
+
+
+class UdsWorker(QtCore.QThread):
+    """
+    [신규] 대상 ECU(req_id/res_id) 하나에 대한 UDS 요청 실행 스레드
+    버튼 슬롯은 submit()으로 큐에 넣기만 하고, 송신/응답 대기는 여기서 처리한다.
+    결과는 시그널로 GUI 스레드에 전달되므로 대기 중에도 화면이 멈추지 않는다.
+    """
+    frames_sent = QtCore.pyqtSignal(list)
+    frames_received = QtCore.pyqtSignal(list)
+    log_message = QtCore.pyqtSignal(str)
+    job_done = QtCore.pyqtSignal(object)
+
+    def __init__(self, tp, req_id, res_id, p2=P2_CLIENT, p2_star=P2_STAR_CLIENT, parent=None):
+        super().__init__(parent)
+        self.tp = tp
+        self.req_id = req_id
+        self.res_id = res_id
+        self.p2 = p2
+        self.p2_star = p2_star
+        self._jobs = queue.Queue()
+
+    def submit(self, job):
+        self._jobs.put(job)
+
+    def pending(self):
+        return self._jobs.qsize()
+
+    def stop(self):
+        self._jobs.put(None)
+        self.wait(2000)
+
+    def report_pending(self, pdu):
+        self.frames_received.emit(pdu.frames)
+        self.log_message.emit(f"⏳ ECU busy: SID 0x{pdu.data[1]:02X} responsePending (0x78) → P2* {self.p2_star:.1f}s 대기")
+
+    def run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            if isinstance(job, WorkerHold):
+                job.hold()
+                continue
+
+            # 이전 요청의 늦은 응답이 섞이지 않도록 응답 큐를 먼저 비움
+            self.tp.flush(self.res_id)
+            sent = []
+            try:
+                for payload in job.payloads:
+                    sent.extend(self.tp.send_pdu(self.req_id, self.res_id, payload))
+            except IsoTpError as e:
+                job.error = f"⚠️ {e} → 전송 중단"
+            except can.CanError as e:
+                job.error = f"❌ CAN send failed: {e}"
+            else:
+                if job.sent_log and not job.quiet:
+                    self.log_message.emit(job.sent_log)
+                # [수정] 최종 응답(긍정/부정) 도착 즉시 반환, 응답이 없을 때만 P2를 다 채움
+                # NRC 0x78(responsePending)을 받으면 P2*만큼 다시 기다림
+                on_pending = None if job.quiet else self.report_pending
+                while len(job.pdus) < len(job.payloads):
+                    pdu = wait_response(self.tp, self.res_id, self.p2, self.p2_star, on_pending)
+                    if pdu is None:
+                        break
+                    job.pdus.append(pdu)
+                    if not job.quiet:
+                        self.frames_received.emit(pdu.frames)
+            if sent and not job.quiet:
+                self.frames_sent.emit(sent)
+            self.job_done.emit(job)
+
+
+class ScanWorker(HoldingThread):
+    """
+    [신규] 여러 ECU(요청/응답 ID 쌍)를 동시에 스캔하는 스레드 (uds_scan.scan 사용)
+    ECU별 결과는 끝나는 순서대로 result_ready로 전달된다.
+    """
+    result_ready = QtCore.pyqtSignal(object)
+    scan_done = QtCore.pyqtSignal(float)
+
+    def __init__(self, tp, targets, holds=(), parent=None):
+        super().__init__(holds, parent)
+        self.tp = tp
+        self.targets = targets
+
+    def work(self):
+        t0 = time.perf_counter()
+        try:
+            scan({None: self.tp}, self.targets, DEFAULT_SCAN_REQUESTS, on_result=self.result_ready.emit)
+        finally:
+            # 예외로 끝나도 GUI가 스캔 중 상태에 남지 않도록 항상 완료를 알림
+            self.scan_done.emit((time.perf_counter() - t0) * 1000)
+
+
+class DownloadWorker(HoldingThread):
+    """
+    [신규] 펌웨어 이미지를 0x34/0x36/0x37로 다운로드하는 스레드 (uds_flash.download 사용)
+    진행률은 1% 단위로만 progress로 알린다.
+    """
+    progress = QtCore.pyqtSignal(int, int, float)
+    download_done = QtCore.pyqtSignal(object, str)  # (DownloadResult 또는 None, 오류 메시지)
+
+    def __init__(self, tp, req_id, res_id, path, address, holds=(), parent=None):
+        super().__init__(holds, parent)
+        self.tp = tp
+        self.req_id = req_id
+        self.res_id = res_id
+        self.path = path
+        self.address = address
+        self._last_pct = -1
+
+    def report(self, sent, total, elapsed):
+        pct = sent * 100 // total
+        if pct != self._last_pct:
+            self._last_pct = pct
+            self.progress.emit(sent, total, elapsed)
+
+    def work(self):
+        client = UdsClient(self.tp, self.req_id, self.res_id)
+        try:
+            with open_image(self.path) as image:
+                result = download(client, image, self.address, on_progress=self.report)
+        except (OSError, ValueError, UdsError, can.CanError) as e:
+            self.download_done.emit(None, str(e))
+            return
+        self.download_done.emit(result, "")
+
+
+class FrameLogModel(QtCore.QAbstractTableModel):
+    """
+    [신규] 고정 용량 링버퍼 기반 CAN 프레임 로그 모델 (Time / ID / DLC / Data)
+    add_frames()는 대기 목록에만 쌓고, flush()가 묶어서 행 삭제/추가를 한 번씩 알린다.
+    문자열 변환은 화면에 보이는 행에 대해서만 data()에서 수행한다.
+    """
+    HEADERS = ("Time", "ID", "DLC", "Data")
+
+    def __init__(self, capacity=FRAME_LOG_SIZE, parent=None):
+        super().__init__(parent)
+        self.capacity = capacity
+        self._ring = [None] * capacity
+        self._start = 0
+        self._count = 0
+        self._pending = []
+
+    def add_frames(self, frames):
+        self._pending.extend(frames)
+
+    def flush(self):
+        """대기 중인 프레임을 반영. 새 행이 있었으면 True"""
+        if not self._pending:
+            return False
+        new = self._pending[-self.capacity:]
+        self._pending = []
+
+        overflow = self._count + len(new) - self.capacity
+        if overflow > 0:
+            self.beginRemoveRows(QtCore.QModelIndex(), 0, overflow - 1)
+            self._start = (self._start + overflow) % self.capacity
+            self._count -= overflow
+            self.endRemoveRows()
+
+        first = self._count
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + len(new) - 1)
+        for i, msg in enumerate(new):
+            self._ring[(self._start + first + i) % self.capacity] = msg
+        self._count += len(new)
+        self.endInsertRows()
+        return True
+
+    def clear(self):
+        self.beginResetModel()
+        self._start = 0
+        self._count = 0
+        self._pending = []
+        self.endResetModel()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self._count
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole and orientation == QtCore.Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if role != QtCore.Qt.DisplayRole or not index.isValid():
+            return None
+        msg = self._ring[(self._start + index.row()) % self.capacity]
+        col = index.column()
+        if col == 0:
+            ts = msg.timestamp
+            return time.strftime("%H:%M:%S", time.localtime(ts)) + f".{int(ts * 1000) % 1000:03d}"
+        if col == 1:
+            return f"0x{msg.arbitration_id:03X}"
+        if col == 2:
+            return str(msg.dlc)
+        return " ".join(f"{b:02X}" for b in msg.data)
+
+
+class BoundedLogView(QtWidgets.QPlainTextEdit):
+    """
+    [신규] 줄 수 상한이 있는 텍스트 로그. append()는 버퍼에만 쌓고 flush()에서 한 번에 반영한다.
+    """
+    def __init__(self, max_lines=LOG_MAX_LINES, parent=None):
+        super().__init__(parent)
+        self.setReadOnly(True)
+        self.setMaximumBlockCount(max_lines)
+        self._pending = []
+
+    def append(self, text):
+        self._pending.append(text)
+
+    def flush(self):
+        if not self._pending:
+            return
+        bar = self.verticalScrollBar()
+        at_bottom = bar.value() >= bar.maximum() - 2
+        self.appendPlainText("\n".join(self._pending[-self.maximumBlockCount():]))
+        self._pending = []
+        if at_bottom:
+            bar.setValue(bar.maximum())
+
+
+def make_frame_view(model):
+    """
+    [신규] FrameLogModel용 테이블 뷰 (행 높이 고정 → 행 수와 무관한 그리기 비용)
+    """
+    view = QtWidgets.QTableView()
+    view.setModel(model)
+    view.verticalHeader().setVisible(False)
+    view.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+    view.verticalHeader().setDefaultSectionSize(18)
+    view.horizontalHeader().setStretchLastSection(True)
+    view.setColumnWidth(0, 95)
+    view.setColumnWidth(1, 55)
+    view.setColumnWidth(2, 35)
+    view.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+    view.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+    return view
+
+
+class SensorPlotWidget(QtWidgets.QWidget):
+    """
+    [신규] SensorRingBuffer를 그리는 경량 플롯 (최근 PLOT_WINDOW_SEC초)
+    다시 그리기는 mark_dirty() 후 GUI의 플롯 타이머가 update()를 부를 때만 일어난다.
+    """
+    COLORS = ("#1F77B4", "#FF7F0E", "#2CA02C", "#9467BD")
+
+    def __init__(self, buffer, parent=None):
+        super().__init__(parent)
+        self.buffer = buffer
+        self.dirty = False
+        self.setMinimumHeight(160)
+
+    def mark_dirty(self):
+        self.dirty = True
+
+    def refresh(self):
+        if self.dirty:
+            self.dirty = False
+            self.update()
+
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        painter.fillRect(self.rect(), QtGui.QColor("#FFFFFF"))
+
+        left, top, right, bottom = 50, 8, self.width() - 10, self.height() - 20
+        plot_w, plot_h = right - left, bottom - top
+        if plot_w <= 0 or plot_h <= 0:
+            return
+
+        series = []
+        t_end = 0.0
+        y_max = 1.0
+        for did in self.buffer.dids:
+            t, v, st = self.buffer.view(did)
+            if len(t):
+                t_end = max(t_end, float(t[-1]))
+                y_max = max(y_max, float(v.max()) * 1.1)
+            series.append((did, t, v, st))
+        t_start = t_end - PLOT_WINDOW_SEC
+
+        painter.setPen(QtGui.QColor("#CFCFCF"))
+        painter.drawRect(left, top, plot_w, plot_h)
+        painter.setPen(QtGui.QColor("#555"))
+        painter.drawText(2, top + 10, f"{int(y_max)}")
+        painter.drawText(2, bottom, "0 mm")
+        painter.drawText(left, self.height() - 4, f"-{int(PLOT_WINDOW_SEC)} s")
+
+        for i, (did, t, v, st) in enumerate(series):
+            mask = t >= t_start
+            t, v, st = t[mask], v[mask], st[mask]
+            if not len(t):
+                continue
+            # 픽셀 폭보다 많은 점은 건너뛰어 그리기 비용을 화면 크기에 묶어 둠
+            step = max(1, len(t) // plot_w)
+            xs = left + (t[::step] - t_start) / PLOT_WINDOW_SEC * plot_w
+            ys = bottom - v[::step] / y_max * plot_h
+            poly = QtGui.QPolygonF([QtCore.QPointF(x, y) for x, y in zip(xs, ys)])
+
+            color = QtGui.QColor(self.COLORS[i % len(self.COLORS)])
+            painter.setPen(QtGui.QPen(color, 1.5))
+            painter.drawPolyline(poly)
+            painter.drawText(right - 90, top + 14 + i * 14, f"0x{did:04X}")
+
+            fail = st[::step] == ord('F')
+            if fail.any():
+                painter.setPen(QtGui.QPen(QtGui.QColor("#D62728"), 4))
+                for x, y in zip(xs[fail], ys[fail]):
+                    painter.drawPoint(QtCore.QPointF(x, y))
+
+
+class BusMonitorDialog(QtWidgets.QDialog):
+    """
+    [신규] 버스 부하 모니터 창 (bus_monitor.BusLoadMonitor 표시)
+    ID별 행은 한 번 만들어 두고 셀 텍스트만 바꾸므로 ID 수가 많아도 갱신 비용이 일정하다.
+    """
+    HEADERS = ["ID", "Hz", f"Hz ({DEFAULT_LONG_WINDOW:g}s)", "Period ms", "Jitter ms", "Max gap ms", "DLC", "Load %"]
+    closed = QtCore.pyqtSignal()
+
+    def __init__(self, monitor, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("📊 CAN Bus Monitor")
+        self.resize(640, 480)
+        self.monitor = monitor
+        self.rows = {}  # arbitration ID -> 행의 QTableWidgetItem 목록
+
+        self.lbl_load = QtWidgets.QLabel("-")
+        self.lbl_dlc = QtWidgets.QLabel("-")
+        self.table = QtWidgets.QTableWidget(0, len(self.HEADERS))
+        self.table.setHorizontalHeaderLabels(self.HEADERS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setDefaultSectionSize(18)
+        self.table.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Stretch)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        btn_clear = QtWidgets.QPushButton("🧹 Reset")
+        btn_clear.clicked.connect(self.reset)
+
+        top = QtWidgets.QHBoxLayout()
+        top.addWidget(self.lbl_load, 1)
+        top.addWidget(btn_clear)
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addLayout(top)
+        layout.addWidget(self.lbl_dlc)
+        layout.addWidget(self.table)
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(BUS_MONITOR_REFRESH_MS)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start()
+
+    def reset(self):
+        self.monitor.clear()
+        self.rows.clear()
+        self.table.setRowCount(0)
+
+    def refresh(self):
+        short = self.monitor.stats(DEFAULT_WINDOW)
+        long_ = self.monitor.stats(DEFAULT_LONG_WINDOW)
+        self.lbl_load.setText(
+            f"Bus load {short['utilization']:.1f}% ({DEFAULT_WINDOW:g}s) / {long_['utilization']:.1f}% "
+            f"({DEFAULT_LONG_WINDOW:g}s)   {short['frames'] / DEFAULT_WINDOW:.0f} frames/s   "
+            f"total {self.monitor.total}   error frames {self.monitor.error_frames}")
+        self.lbl_dlc.setText("DLC  " + "  ".join(
+            f"{d}: {c}" for d, c in enumerate(short["dlc_hist"].tolist()) if c))
+
+        # 긴 구간 기준으로 행을 유지 (잠깐 조용한 ID가 표에서 깜빡이지 않도록)
+        short_rows = {int(r["id"]): r for r in short["ids"]}
+        self.table.setSortingEnabled(False)
+        for r in long_["ids"]:
+            arb_id = int(r["id"])
+            cur = short_rows.get(arb_id)
+            values = [f"{arb_id:03X}", f"{cur['rate_hz']:.1f}" if cur is not None else "0.0", f"{r['rate_hz']:.1f}",
+                      f"{r['period_ms']:.2f}", f"{r['jitter_ms']:.3f}", f"{r['max_gap_ms']:.2f}",
+                      str(int(r["dlc"])), f"{r['load_pct']:.2f}"]
+            items = self.rows.get(arb_id)
+            if items is None:
+                row = self.table.rowCount()
+                self.table.insertRow(row)
+                items = self.rows[arb_id] = [QtWidgets.QTableWidgetItem() for _ in values]
+                for col, item in enumerate(items):
+                    self.table.setItem(row, col, item)
+            for item, text in zip(items, values):
+                if item.text() != text:
+                    item.setText(text)
+        self.table.setSortingEnabled(True)
+
+    def closeEvent(self, event):
+        self.timer.stop()
+        self.closed.emit()
+        super().closeEvent(event)
+
+
+class CANUDSGui(QtWidgets.QWidget):
+    def __init__(self, bustype=DEFAULT_BACKEND, channel=None, bitrate=DEFAULT_BITRATE, req_id=0x7E0, res_id=0x7E8,
+                 p2=P2_CLIENT, p2_star=P2_STAR_CLIENT, fd=False, data_bitrate=DEFAULT_DATA_BITRATE, brs=True):
+        super().__init__()
+        self.setWindowTitle("CAN/UDS Diagnostic GUI")
+        self.resize(1150, 820)
+
+        self.setStyleSheet("""
+            QWidget { background-color: #FAFAFF; color: #111; font-family: 'Segoe UI'; font-size: 10pt; }
+            QPushButton { background-color: #E9F1FF; border: 1px solid #BBD1FF; border-radius: 6px; padding: 6px; }
+            QPushButton:hover { background-color: #D9E9FF; }
+            QTextEdit, QPlainTextEdit { background-color: #FFFFFF; border: 1px solid #CFCFCF; border-radius: 4px; font-family: Consolas; }
+            QTableView { background-color: #FFFFFF; border: 1px solid #CFCFCF; border-radius: 4px; font-family: Consolas; }
+            QTableWidget { background-color: #FFFFFF; border: 1px solid #CFCFCF; border-radius: 4px; }
+            QGroupBox { font-weight: 600; }
+            QLabel.title { font-size: 12pt; font-weight: 600; }
+        """)
+
+        # [수정] 버스 백엔드는 명령행/설정 파일로 선택 (pcan, socketcan, vcan, virtual)
+        self.bustype = bustype
+        self.channel = channel or default_channel(bustype)
+        self.bitrate = bitrate
+        # [신규] CAN FD: 64바이트 ISO-TP 프레임 (escape SF/FF), 데이터 구간 비트레이트 전환(BRS)
+        self.fd = fd
+        self.data_bitrate = data_bitrate
+        self.brs = brs
+        self.req_id = req_id
+        self.res_id = res_id
+        # [신규] 응답 대기 타이머: P2(응답 시작까지), P2*(NRC 0x78 이후)
+        self.p2 = p2
+        self.p2_star = p2_star
+
+        # [신규] 센서 설정값 (임계값)을 GUI 내부에 저장
+        # (원래는 0x22 0006으로 읽어와야 하지만, 현재는 쓰기만 구현하므로 기본값 저장)
+        
+        # [신규] ECU가 다중 DID 0x22를 거부하면 이후에는 바로 개별 요청 파이프라인 사용
+        self.multi_did_supported = True
+        # [신규] DID별 화면 표시 함수 (없는 DID는 show_did_values로 필드를 그대로 출력)
+        self.did_handlers = {DID_ECU_INFO: self.show_ecu_info, DID_SENSOR_CONFIG: self.show_sensor_config}
+        self.did_handlers.update({did: self.show_sensor_value for did in SENSOR_DIDS})
+
+        # [수정] C 코드(g_sensorThresholds)의 초기 기본값과 일치시킴
+        self.current_sensor_config = {
+            'ultra_min': 0,    # 2000 -> 0
+            'ultra_max': 400,  # 4000 -> 400
+            'tof_min': 0,      # 1000 -> 0
+            'tof_max': 5000
+        }
+
+        root = QtWidgets.QVBoxLayout(self)
+
+        # UDS 버튼
+        uds_row = QtWidgets.QHBoxLayout()
+        self.btn_read_ecu_info = QtWidgets.QPushButton("ℹ️ Read ECU Info (DID 0x0005)")
+        self.btn_read_sensor_config = QtWidgets.QPushButton("🔧 Read Sensor Config (DID 0x0006)")
+        self.btn_write_ecu_info = QtWidgets.QPushButton("✏️ Write (0x2E...)") # 버튼 텍스트 수정
+        self.btn_read_dtc = QtWidgets.QPushButton("📖 Read DTCs (0x19)")
+        self.btn_clear_dtc = QtWidgets.QPushButton("🧹 Clear DTCs (0x14)")
+        uds_row.addWidget(self.btn_read_ecu_info)
+        uds_row.addWidget(self.btn_read_sensor_config)
+        uds_row.addWidget(self.btn_write_ecu_info)
+        uds_row.addWidget(self.btn_read_dtc)
+        uds_row.addWidget(self.btn_clear_dtc)
+        # [신규] 여러 ECU 동시 스캔 (ECU Info / DTC / 센서 DID)
+        self.btn_scan = QtWidgets.QPushButton("🛰 Scan ECUs")
+        uds_row.addWidget(self.btn_scan)
+        # [신규] 펌웨어 다운로드 (0x34/0x36/0x37)
+        self.btn_download = QtWidgets.QPushButton("⬇ Download FW (0x34)")
+        uds_row.addWidget(self.btn_download)
+        root.addLayout(uds_row)
+
+        # ... (기존 센서 버튼, 프레임 모니터, ECU Info 카드 등 UI 정의) ...
+        # (이하 UI 정의 코드는 변경 없음)
+        sensor_row = QtWidgets.QHBoxLayout()
+        self.btn_ultra1 = QtWidgets.QPushButton("🔹 Ultra Sensor 1 (0x0001)")
+        self.btn_ultra2 = QtWidgets.QPushButton("🔹 Ultra Sensor 2 (0x0002)")
+        self.btn_ultra3 = QtWidgets.QPushButton("🔹 Ultra Sensor 3 (0x0003)")
+        self.btn_tof = QtWidgets.QPushButton("🔹 ToF Sensor (0x0004)")
+        sensor_row.addWidget(self.btn_ultra1)
+        sensor_row.addWidget(self.btn_ultra2)
+        sensor_row.addWidget(self.btn_ultra3)
+        sensor_row.addWidget(self.btn_tof)
+        # [신규] 0x22 다중 DID 요청으로 센서 4개를 한 번에 읽기
+        self.btn_read_all_sensors = QtWidgets.QPushButton("📡 Read All Sensors")
+        sensor_row.addWidget(self.btn_read_all_sensors)
+        root.addLayout(sensor_row)
+
+        # [신규] 멀티프레임 응답 수신 시 ECU로 보낼 FlowControl(0x30) 파라미터
+        fc_row = QtWidgets.QHBoxLayout()
+        # [신규] 진단 대상 ECU 변경 (응답 ID 수신 필터도 함께 갱신)
+        hex_validator = QtGui.QRegExpValidator(QtCore.QRegExp("[0-9A-Fa-f]{1,3}"), self)
+        self.edit_req_id = QtWidgets.QLineEdit(f"{self.req_id:03X}")
+        self.edit_res_id = QtWidgets.QLineEdit(f"{self.res_id:03X}")
+        for edit in (self.edit_req_id, self.edit_res_id):
+            edit.setValidator(hex_validator)
+            edit.setFixedWidth(50)
+        self.btn_set_target = QtWidgets.QPushButton("🎯 Set Target")
+        fc_row.addWidget(QtWidgets.QLabel("Req ID: 0x"))
+        fc_row.addWidget(self.edit_req_id)
+        fc_row.addWidget(QtWidgets.QLabel("Res ID: 0x"))
+        fc_row.addWidget(self.edit_res_id)
+        fc_row.addWidget(self.btn_set_target)
+        fc_row.addSpacing(20)
+        self.spin_fc_bs = QtWidgets.QSpinBox()
+        self.spin_fc_bs.setRange(0, 0xFF)
+        self.spin_fc_bs.setToolTip(
+            "0 = 블록 제한 없음 (FC 1회 후 끝까지 연속 전송)\n"
+            "TC375는 FC를 무시하고 1 ms 간격으로 CF를 보내므로 시뮬레이터/ISO-TP 준수 ECU에만 적용됨"
+        )
+        self.spin_fc_stmin = QtWidgets.QSpinBox()
+        self.spin_fc_stmin.setRange(0, 0xF9)
+        self.spin_fc_stmin.setDisplayIntegerBase(16)
+        self.spin_fc_stmin.setPrefix("0x")
+        self.spin_fc_stmin.setToolTip("0x00~0x7F: ms, 0xF1~0xF9: 100~900 us (TC375는 무시)")
+        fc_row.addWidget(QtWidgets.QLabel("🔁 Rx FlowControl  BS:"))
+        fc_row.addWidget(self.spin_fc_bs)
+        fc_row.addWidget(QtWidgets.QLabel("STmin:"))
+        fc_row.addWidget(self.spin_fc_stmin)
+        fc_row.addStretch()
+        # [신규] 송수신 프레임 전체를 BLF/ASC 트레이스로 기록 (trace_tools.py로 재생/디코딩)
+        self.btn_record = QtWidgets.QPushButton("⏺ Record Trace")
+        self.btn_record.setCheckable(True)
+        fc_row.addWidget(self.btn_record)
+        # [신규] 버스 부하 모니터 (ID별 주기/지터/점유율)
+        self.btn_bus_monitor = QtWidgets.QPushButton("📊 Bus Monitor")
+        self.btn_bus_monitor.setCheckable(True)
+        fc_row.addWidget(self.btn_bus_monitor)
+        root.addLayout(fc_row)
+        frame_layout = QtWidgets.QHBoxLayout()
+        # [수정] 프레임 모니터: QTextEdit 누적 → 고정 용량 모델 + 테이블 뷰
+        self.sent_model = FrameLogModel(FRAME_LOG_SIZE, self)
+        self.recv_model = FrameLogModel(FRAME_LOG_SIZE, self)
+        self.sent_box = make_frame_view(self.sent_model)
+        self.recv_box = make_frame_view(self.recv_model)
+        left = QtWidgets.QVBoxLayout(); left.addWidget(QtWidgets.QLabel("📤 Sent Frames")); left.addWidget(self.sent_box)
+        right = QtWidgets.QVBoxLayout(); right.addWidget(QtWidgets.QLabel("📥 Received Frames")); right.addWidget(self.recv_box)
+        frame_layout.addLayout(left); frame_layout.addLayout(right)
+        root.addLayout(frame_layout)
+        info_card = QtWidgets.QGroupBox("🧾 ECU Information")
+        info_layout = QtWidgets.QFormLayout()
+        self.lbl_vin = QtWidgets.QLabel("-")
+        self.lbl_hw = QtWidgets.QLabel("-")
+        self.lbl_sw = QtWidgets.QLabel("-")
+        self.lbl_sn = QtWidgets.QLabel("-")
+        self.lbl_supplier = QtWidgets.QLabel("-")
+        info_layout.addRow("VIN:", self.lbl_vin)
+        info_layout.addRow("HW:", self.lbl_hw)
+        info_layout.addRow("SW:", self.lbl_sw)
+        info_layout.addRow("SN:", self.lbl_sn)
+        info_layout.addRow("Supplier:", self.lbl_supplier)
+        info_card.setLayout(info_layout)
+        root.addWidget(info_card)
+        sensor_card = QtWidgets.QGroupBox("📡 Sensor Values")
+        self.sensor_result = BoundedLogView()
+        # [신규] 라이브 폴링: 링버퍼 + 플롯 (텍스트 누적 대신 고정 메모리)
+        self.sensor_buffer = SensorRingBuffer(SENSOR_DIDS, POLL_BUFFER_SIZE)
+        self.sensor_plot = SensorPlotWidget(self.sensor_buffer)
+        poll_row = QtWidgets.QHBoxLayout()
+        self.btn_poll = QtWidgets.QPushButton("▶ Live Poll")
+        self.btn_poll.setCheckable(True)
+        self.spin_poll_hz = QtWidgets.QDoubleSpinBox()
+        self.spin_poll_hz.setRange(0.5, 50.0)
+        self.spin_poll_hz.setValue(5.0)
+        self.spin_poll_hz.setSuffix(" Hz")
+        self.lbl_poll_stat = QtWidgets.QLabel("-")
+        poll_row.addWidget(self.btn_poll)
+        poll_row.addWidget(self.spin_poll_hz)
+        poll_row.addWidget(self.lbl_poll_stat, 1)
+        scv = QtWidgets.QVBoxLayout()
+        scv.addLayout(poll_row)
+        scv.addWidget(self.sensor_plot)
+        scv.addWidget(self.sensor_result)
+        sensor_card.setLayout(scv)
+        root.addWidget(sensor_card)
+
+        self.poll_timer = QtCore.QTimer(self)
+        self.poll_in_flight = False
+        self.plot_timer = QtCore.QTimer(self)
+        self.plot_timer.setInterval(int(1000 / PLOT_MAX_FPS))
+
+        # [신규] 프레임/로그 뷰는 VIEW_FLUSH_MS마다 묶어서 갱신
+        self.view_timer = QtCore.QTimer(self)
+        self.view_timer.setInterval(VIEW_FLUSH_MS)
+        
+        # --- [DTC 테이블 수정] ---
+        dtc_card = QtWidgets.QGroupBox("⚙️ Diagnostic Trouble Codes (DTC)")
+        dtc_layout = QtWidgets.QVBoxLayout()
+        # [수정] 열 개수 4 -> 5 -> 6 (최초 발생 시각)
+        self.dtc_table = QtWidgets.QTableWidget(0, 6) 
+        # [수정] 헤더에 "DTC 설명" 추가
+        self.dtc_table.setHorizontalHeaderLabels(["#", "DTC 코드", "DTC 설명 (발생 센서)", "상태값", "상태 설명", "최초 발생"])
+        
+        # [수정] 설명 열(2)이 가장 넓도록 설정
+        self.dtc_table.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.ResizeToContents)
+        self.dtc_table.horizontalHeader().setSectionResizeMode(0, QtWidgets.QHeaderView.ResizeToContents)
+        self.dtc_table.horizontalHeader().setSectionResizeMode(1, QtWidgets.QHeaderView.ResizeToContents)
+        self.dtc_table.horizontalHeader().setSectionResizeMode(2, QtWidgets.QHeaderView.Stretch) # 설명 열
+        self.dtc_table.horizontalHeader().setSectionResizeMode(3, QtWidgets.QHeaderView.ResizeToContents)
+        self.dtc_table.horizontalHeader().setSectionResizeMode(4, QtWidgets.QHeaderView.ResizeToContents)
+        self.dtc_table.horizontalHeader().setSectionResizeMode(5, QtWidgets.QHeaderView.ResizeToContents)
+        
+        # [신규] DTC 상태 캐시: 코드별 행을 기억해 두고 변경된 행만 갱신
+        self.dtc_state = DtcStateCache()
+        self.dtc_rows = {}  # code -> 행의 QTableWidgetItem 목록
+        self.dtc_placeholder = False
+        self.dtc_poll_in_flight = False
+        self.dtc_timer = QtCore.QTimer(self)
+        self.dtc_timer.setInterval(DTC_POLL_MS)
+        self.btn_dtc_poll = QtWidgets.QPushButton("🔁 Auto Read DTCs")
+        self.btn_dtc_poll.setCheckable(True)
+        self.dtc_history = BoundedLogView()
+        self.dtc_history.setMaximumHeight(100)
+
+        dtc_layout.addWidget(self.dtc_table)
+        dtc_history_row = QtWidgets.QHBoxLayout()
+        dtc_history_row.addWidget(QtWidgets.QLabel("🕘 DTC 변경 이력"))
+        dtc_history_row.addStretch()
+        dtc_history_row.addWidget(self.btn_dtc_poll)
+        dtc_layout.addLayout(dtc_history_row)
+        dtc_layout.addWidget(self.dtc_history)
+        # --- [DTC 테이블 수정 끝] ---
+        
+        dtc_card.setLayout(dtc_layout)
+        root.addWidget(dtc_card)
+        self.log_box = BoundedLogView()
+        self.result_box = BoundedLogView()
+        root.addWidget(QtWidgets.QLabel("🪶 Log Output"))
+        root.addWidget(self.log_box)
+        root.addWidget(QtWidgets.QLabel("📊 Diagnostic Results"))
+        root.addWidget(self.result_box)
+        # (여기까지 UI 정의 코드)
+
+        # [신규] can.Bus는 IsoTpTransport가 소유하고, 수신은 전용 스레드에서 조립됨
+        self.workers = {}
+        self.scan_worker = None
+        self.download_worker = None
+        self.scan_targets_text = "7E0:7E8 7E1:7E9 7E2:7EA 7E3:7EB"
+        self.recorder = None
+        self.bus_monitor = None
+        self.bus_monitor_dialog = None
+        try:
+            self.tp = IsoTpTransport.open(self.channel, self.bustype, self.bitrate,
+                                          fd=self.fd, data_bitrate=self.data_bitrate, brs=self.brs)
+            self.tp.subscribe(self.res_id, self.req_id)
+            self.tp.start()
+            mode = f", CAN FD{' BRS' if self.brs else ''} {self.data_bitrate // 1000} kbit/s" if self.fd else ""
+            self.log(f"✅ CAN connected ({self.bustype}: {self.channel}{mode}).")
+        except Exception as e:
+            self.tp = None
+            self.log(f"❌ CAN init failed: {e}")
+
+        # 버튼 연결
+        self.btn_ultra1.clicked.connect(lambda: self.read_by_did(0x0001))
+        self.btn_ultra2.clicked.connect(lambda: self.read_by_did(0x0002))
+        self.btn_ultra3.clicked.connect(lambda: self.read_by_did(0x0003))
+        self.btn_tof.clicked.connect(lambda: self.read_by_did(0x0004))
+        self.btn_read_all_sensors.clicked.connect(lambda: self.read_all_sensors())
+        self.btn_poll.toggled.connect(self.toggle_polling)
+        self.spin_poll_hz.valueChanged.connect(self.update_poll_rate)
+        self.view_timer.timeout.connect(self.flush_views)
+        self.view_timer.start()
+        self.poll_timer.timeout.connect(self.poll_sensors)
+        self.plot_timer.timeout.connect(self.refresh_poll_view)
+        self.btn_read_ecu_info.clicked.connect(lambda: self.read_by_did(DID_ECU_INFO))
+        self.btn_read_sensor_config.clicked.connect(lambda: self.read_by_did(DID_SENSOR_CONFIG))
+        
+        # [수정] Write 버튼은 선택창을 띄우는 함수(start_write_process)에 연결
+        self.btn_write_ecu_info.clicked.connect(self.start_write_process)
+        
+        self.btn_read_dtc.clicked.connect(lambda: self.read_dtc())
+        self.btn_clear_dtc.clicked.connect(self.clear_dtc)
+        self.btn_dtc_poll.toggled.connect(self.toggle_dtc_polling)
+        self.dtc_timer.timeout.connect(self.poll_dtc)
+        self.btn_scan.clicked.connect(self.start_scan)
+        self.btn_download.clicked.connect(self.start_download)
+
+        self.btn_set_target.clicked.connect(self.set_target)
+        self.spin_fc_bs.valueChanged.connect(self.update_rx_flow_control)
+        self.spin_fc_stmin.valueChanged.connect(self.update_rx_flow_control)
+        self.btn_record.toggled.connect(self.toggle_recording)
+        self.btn_bus_monitor.toggled.connect(self.toggle_bus_monitor)
+
+    # ---------------- 유틸 ----------------
+    def log(self, text):
+        self.log_box.append(text)
+
+    def flush_views(self):
+        """
+        [신규] 쌓인 프레임/로그를 화면에 반영 (맨 아래를 보고 있을 때만 자동 스크롤)
+        """
+        for view, model in ((self.sent_box, self.sent_model), (self.recv_box, self.recv_model)):
+            bar = view.verticalScrollBar()
+            at_bottom = bar.value() >= bar.maximum() - 1
+            if model.flush() and at_bottom:
+                view.scrollToBottom()
+        for box in (self.log_box, self.result_box, self.sensor_result, self.dtc_history):
+            box.flush()
+
+    def set_target(self):
+        """
+        [신규] 요청/응답 ID 변경. 이전 응답 ID는 구독 해제되어 수신 필터에서 빠진다.
+        """
+        try:
+            req_id = int(self.edit_req_id.text(), 16)
+            res_id = int(self.edit_res_id.text(), 16)
+        except ValueError:
+            self.log("⚠️ Invalid CAN ID")
+            return
+        if req_id == res_id:
+            self.log("⚠️ Req ID and Res ID must differ")
+            return
+
+        if self.tp and res_id != self.res_id:
+            self.tp.unsubscribe(self.res_id)
+        self.req_id, self.res_id = req_id, res_id
+        if self.tp:
+            self.tp.subscribe(self.res_id, self.req_id)
+        self.multi_did_supported = True
+        self.log(f"🎯 Target set: Req=0x{req_id:03X}, Res=0x{res_id:03X} (Rx filter updated)")
+
+    def update_rx_flow_control(self):
+        """
+        [신규] 수신 FC의 BS/STmin 변경 (다음 First Frame 수신부터 적용)
+        TC375 펌웨어는 FC를 버리므로(PCI 3 무시) 시뮬레이터/ISO-TP 준수 ECU에서만 효과가 있음
+        """
+        if not self.tp:
+            return
+        bs, stmin = self.spin_fc_bs.value(), self.spin_fc_stmin.value()
+        try:
+            self.tp.set_rx_flow_control(bs, stmin)
+        except ValueError as e:
+            self.log(f"⚠️ {e} (0x80~0xF0 is reserved)")
+            return
+        self.log(f"🔁 Rx FlowControl set: BS={bs}, STmin=0x{stmin:02X}")
+
+    def worker_for(self, req_id, res_id):
+        """
+        [신규] 대상 ECU별 워커 스레드 (같은 ECU 요청은 순서대로, 다른 ECU 요청은 동시에 처리)
+        """
+        key = (req_id, res_id)
+        worker = self.workers.get(key)
+        if worker is None:
+            worker = UdsWorker(self.tp, req_id, res_id, self.p2, self.p2_star, self)
+            worker.frames_sent.connect(self.show_sent_frames)
+            worker.frames_received.connect(self.show_frames)
+            worker.log_message.connect(self.log)
+            worker.job_done.connect(self.on_job_done)
+            worker.start()
+            self.workers[key] = worker
+        return worker
+
+    def hold_workers(self, keys):
+        """
+        [신규] (req_id, res_id) 대상 워커마다 WorkerHold를 넣고 목록을 반환
+        스캔/다운로드 스레드는 이 hold가 모두 잡힌 뒤에 응답 큐를 쓰기 시작한다.
+        """
+        holds = []
+        for req_id, res_id in dict.fromkeys(keys):
+            hold = WorkerHold()
+            self.worker_for(req_id, res_id).submit(hold)
+            holds.append(hold)
+        return holds
+
+    def submit_request(self, payload, on_done, sent_log=None, quiet=False):
+        """
+        [신규] UDS 요청을 워커 큐에 넣고 바로 반환 (SF/멀티프레임은 IsoTpTransport가 판단)
+        [수정] 고정 대기시간 대신 워커가 P2/P2* 타이머로 응답을 기다림
+        """
+        if not self.tp:
+            self.log("⚠️ CAN bus not ready")
+            return False
+        job = UdsJob(payload, on_done, sent_log, quiet)
+        self.worker_for(self.req_id, self.res_id).submit(job)
+        return True
+
+    def on_job_done(self, job):
+        if job.error:
+            self.log(job.error)
+            if job.quiet:
+                job.on_done(job)
+            return
+        if job.quiet:
+            job.on_done(job)
+            return
+        for pdu in job.pdus:
+            if len(pdu.frames) > 1:
+                self.log(f"📦 Multi Frame received (len={len(pdu.data)}, frames={len(pdu.frames)}).")
+            else:
+                self.log(f"📥 Single Frame received ({len(pdu.data)} bytes).")
+            if pdu.data[:1] == b"\x7F" and len(pdu.data) >= 3:
+                self.log_negative_response(pdu.data)
+        if len(job.pdus) < len(job.payloads):
+            self.log(f"⚠️ No response within P2={self.p2:.2f}s "
+                     f"({len(job.pdus)}/{len(job.payloads)} responses)")
+        job.on_done(job)
+
+    def log_negative_response(self, data):
+        """
+        [신규] 0x7F 부정 응답을 NRC 이름과 함께 표시
+        """
+        self.result_box.append(f"❌ Negative Response: SID 0x{data[1]:02X}, NRC 0x{data[2]:02X} ({nrc_name(data[2])})")
+
+    def show_sent_frames(self, frames):
+        self.sent_model.add_frames(frames)
+
+    def show_frames(self, frames):
+        self.recv_model.add_frames(frames)
+
+    def closeEvent(self, event):
+        self.view_timer.stop()
+        self.poll_timer.stop()
+        self.plot_timer.stop()
+        self.dtc_timer.stop()
+        # 스캔/다운로드가 끝나야 hold가 풀려 워커가 종료 요청을 받을 수 있음
+        if self.scan_worker:
+            self.scan_worker.wait(5000)
+        if self.download_worker:
+            self.download_worker.wait()
+        for worker in self.workers.values():
+            worker.stop()
+        self.stop_recording()
+        self.stop_bus_monitor()
+        if self.tp:
+            self.tp.close()
+        super().closeEvent(event)
+
+    # ---------------- 다중 ECU 스캔 ----------------
+    def start_scan(self):
+        if not self.tp:
+            self.log("⚠️ CAN bus not ready")
+            return
+        if self.scan_worker and self.scan_worker.isRunning():
+            self.log("⚠️ Scan already running")
+            return
+        text, ok = QtWidgets.QInputDialog.getText(
+            self, "Scan ECUs", "Req:Res ID pairs (hex, space separated):", text=self.scan_targets_text)
+        if not ok:
+            return
+        try:
+            targets = [parse_target(t, None) for t in text.split()]
+        except ValueError:
+            self.log(f"❌ Invalid scan targets: {text}")
+            return
+        if not targets:
+            return
+        self.scan_targets_text = text
+        holds = self.hold_workers((t.req_id, t.res_id) for t in targets)
+        self.scan_worker = ScanWorker(self.tp, targets, holds, self)
+        self.scan_worker.result_ready.connect(self.on_scan_result)
+        self.scan_worker.scan_done.connect(self.on_scan_done)
+        self.btn_scan.setEnabled(False)
+        self.log(f"🛰 Scanning {len(targets)} ECUs...")
+        self.scan_worker.start()
+
+    def on_scan_result(self, result):
+        target = f"{result['req_id']}/{result['res_id']}"
+        if not result["present"]:
+            self.result_box.append(f"🛰 {target}: no response")
+            return
+        self.result_box.append(f"🛰 {target}: {'OK' if result['ok'] else 'FAILED'} ({result['elapsed_ms']:.0f} ms)")
+        for step in result["steps"]:
+            detail = step["result"] if step["ok"] else step["error"]
+            self.result_box.append(f"    {step['request']}: {detail}")
+
+    def on_scan_done(self, elapsed_ms):
+        self.btn_scan.setEnabled(True)
+        self.log(f"✅ Scan finished in {elapsed_ms:.0f} ms")
+
+    # ---------------- 펌웨어 다운로드 ----------------
+    def start_download(self):
+        if not self.tp:
+            self.log("⚠️ CAN bus not ready")
+            return
+        if self.download_worker and self.download_worker.isRunning():
+            self.log("⚠️ Download already running")
+            return
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Firmware Image", "", "Binary (*.bin);;All files (*)")
+        if not path:
+            return
+        text, ok = QtWidgets.QInputDialog.getText(
+            self, "Download Address", "Target address (hex):", text=f"0x{FLASH_BASE:08X}")
+        if not ok:
+            return
+        try:
+            address = int(text, 16)
+        except ValueError:
+            self.log(f"❌ Invalid address: {text}")
+            return
+        holds = self.hold_workers([(self.req_id, self.res_id)])
+        self.download_worker = DownloadWorker(self.tp, self.req_id, self.res_id, path, address, holds, self)
+        self.download_worker.progress.connect(self.on_download_progress)
+        self.download_worker.download_done.connect(self.on_download_done)
+        self.btn_download.setEnabled(False)
+        self.log(f"⬇ Downloading {path} → 0x{address:08X} ...")
+        self.download_worker.start()
+
+    def on_download_progress(self, sent, total, elapsed):
+        rate = sent / elapsed / 1024 if elapsed > 0 else 0.0
+        self.btn_download.setText(f"⬇ {sent * 100 // total}% ({rate:.0f} KiB/s)")
+
+    def on_download_done(self, result, error):
+        self.btn_download.setEnabled(True)
+        self.btn_download.setText("⬇ Download FW (0x34)")
+        if result is None:
+            self.log(f"❌ Download failed: {error}")
+            return
+        self.log(f"✅ Download finished: {result.size} bytes, {result.blocks} blocks x {result.block_len} B, "
+                 f"{result.elapsed:.2f}s ({result.size / result.elapsed / 1024:.1f} KiB/s)")
+        if len(result.exit_params) >= 4:
+            ecu_crc = int.from_bytes(result.exit_params[:4], "big")
+            mark = "✅" if ecu_crc == result.crc32 else "⚠️"
+            self.log(f"{mark} CRC32 image=0x{result.crc32:08X}, ECU=0x{ecu_crc:08X}")
+
+    # ---------------- 트레이스 기록 ----------------
+    def toggle_recording(self, enabled):
+        if not enabled:
+            self.stop_recording()
+            return
+        if not self.tp:
+            self.log("⚠️ CAN bus not ready")
+            self.btn_record.setChecked(False)
+            return
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self, "Record CAN Trace", time.strftime("trace_%Y%m%d_%H%M%S.blf"),
+            "BLF (*.blf);;ASC (*.asc)")
+        try:
+            if not path:
+                raise ValueError("No file selected")
+            self.recorder = TraceRecorder(path)
+        except Exception as e:
+            self.log(f"❌ Trace record failed: {e}")
+            self.btn_record.setChecked(False)
+            return
+        self.tp.add_listener(self.recorder)
+        self.btn_record.setText("⏹ Stop Recording")
+        self.log(f"⏺ Recording trace → {path}")
+
+    def stop_recording(self):
+        if self.recorder is None:
+            return
+        if self.tp:
+            self.tp.remove_listener(self.recorder)
+        self.recorder.stop()
+        self.log(f"💾 Trace saved: {self.recorder.path} ({self.recorder.count} frames)")
+        self.recorder = None
+        self.btn_record.setText("⏺ Record Trace")
+
+    # ---------------- 버스 모니터 ----------------
+    def toggle_bus_monitor(self, enabled):
+        if not enabled:
+            self.stop_bus_monitor()
+            return
+        if not self.tp:
+            self.log("⚠️ CAN bus not ready")
+            self.btn_bus_monitor.setChecked(False)
+            return
+        # 모니터가 열려 있는 동안만 수신 필터를 열어 다른 ECU 트래픽까지 받는다
+        self.bus_monitor = BusLoadMonitor(bitrate=self.bitrate, data_bitrate=self.data_bitrate)
+        self.tp.add_listener(self.bus_monitor)
+        self.tp.set_pass_all(True)
+        self.bus_monitor_dialog = BusMonitorDialog(self.bus_monitor, self)
+        self.bus_monitor_dialog.closed.connect(lambda: self.btn_bus_monitor.setChecked(False))
+        self.bus_monitor_dialog.show()
+        self.log("📊 Bus monitor started (receive filter opened)")
+
+    def stop_bus_monitor(self):
+        if self.bus_monitor is None:
+            return
+        if self.tp:
+            self.tp.set_pass_all(False)
+            self.tp.remove_listener(self.bus_monitor)
+        self.bus_monitor = None
+        dialog, self.bus_monitor_dialog = self.bus_monitor_dialog, None
+        if dialog.isVisible():
+            dialog.close()
+        self.log("📊 Bus monitor stopped")
+
+    # ---------------- 기능: 0x22 (Read) ----------------
+    def read_by_did(self, did):
+        self.submit_request(
+            bytes([0x22, (did >> 8) & 0xFF, did & 0xFF]),
+            lambda job: self.on_read_by_did(job, did),
+            sent_log=f"▶ Sent ReadDataByIdentifier DID=0x{did:04X}",
+        )
+
+    def on_read_by_did(self, job, did):
+        if job.pdu:
+            self.parse_uds_response(job.pdu.data, 0x22, did)
+
+    # ---------------- 기능: 0x22 다중 DID (센서 일괄 읽기) ----------------
+    def read_all_sensors(self, on_records=None, quiet=False):
+        """
+        [신규] 22 0001 0002 0003 0004 한 번으로 센서 스냅샷 요청
+        ECU가 목록 형태를 거부하면 개별 요청을 연달아 보내는 방식으로 전환
+        on_records((did, data) 목록)를 주지 않으면 센서 패널에 한 줄로 표시
+        """
+        on_records = on_records or self.show_sensor_snapshot
+        if not self.multi_did_supported:
+            return self.read_sensors_pipelined(on_records, quiet)
+
+        payload = bytearray([0x22])
+        for did in SENSOR_DIDS:
+            payload += bytes([(did >> 8) & 0xFF, did & 0xFF])
+        return self.submit_request(
+            payload, lambda job: self.on_read_all_sensors(job, on_records),
+            sent_log=f"▶ Sent ReadDataByIdentifier (multi DID x{len(SENSOR_DIDS)})",
+            quiet=quiet,
+        )
+
+    def on_read_all_sensors(self, job, on_records):
+        pdu = job.pdu
+        records = None
+        if pdu and pdu.data[:1] == b"\x62":
+            records = decode_did_records(pdu.data[1:])
+
+        if records is None or [did for did, _ in records] != list(SENSOR_DIDS):
+            # 0x22 자체를 거부한 경우에만 이후 요청을 개별 방식으로 고정
+            # (응답 누락/깨진 응답은 이번 한 번만 개별 요청으로 다시 읽음)
+            if pdu and len(pdu.data) >= 3 and pdu.data[:2] == b"\x7F\x22" \
+                    and pdu.data[2] in MULTI_DID_REJECT_NRCS:
+                self.log(f"⚠️ Multi DID rejected (NRC=0x{pdu.data[2]:02X}) → 개별 요청으로 전환")
+                self.multi_did_supported = False
+            elif not job.quiet:
+                reason = "no response" if pdu is None else "invalid response"
+                self.log(f"⚠️ Multi DID {reason} → 이번 조회만 개별 요청")
+            self.read_sensors_pipelined(on_records, job.quiet)
+            return
+
+        on_records(records)
+
+    def read_sensors_pipelined(self, on_records, quiet=False):
+        """
+        [신규] 다중 DID 미지원 ECU용: 개별 0x22 요청을 대기 없이 연달아 보내고 응답을 순서대로 수집
+        """
+        payloads = [bytes([0x22, (did >> 8) & 0xFF, did & 0xFF]) for did in SENSOR_DIDS]
+        return self.submit_request(
+            payloads, lambda job: self.on_read_sensors_pipelined(job, on_records),
+            sent_log=f"▶ Sent ReadDataByIdentifier x{len(payloads)} (pipelined)",
+            quiet=quiet,
+        )
+
+    def on_read_sensors_pipelined(self, job, on_records):
+        records = []
+        for pdu in job.pdus:
+            if pdu.data[:1] != b"\x62":
+                if not job.quiet:
+                    self.log(f"⚠️ Sensor read failed: {' '.join(f'{b:02X}' for b in pdu.data[:3])}")
+                continue
+            records.extend(decode_did_records(pdu.data[1:]) or [])
+        if len(job.pdus) < len(job.payloads) and not job.quiet:
+            self.log(f"⚠️ Sensor responses missing ({len(job.pdus)}/{len(job.payloads)})")
+        on_records(records)
+
+    # ---------------- 라이브 폴링 ----------------
+    def toggle_polling(self, enabled):
+        """
+        [신규] 설정한 주기로 센서 DID를 계속 읽어 링버퍼에 기록
+        """
+        if enabled:
+            if not self.tp:
+                self.log("⚠️ CAN bus not ready")
+                self.btn_poll.setChecked(False)
+                return
+            self.sensor_buffer.clear()
+            self.poll_started = time.monotonic()
+            self.poll_count = 0
+            self.poll_misses = 0
+            self.update_poll_rate()
+            self.poll_timer.start()
+            self.plot_timer.start()
+            self.btn_poll.setText("⏹ Stop Poll")
+            self.log(f"⏱ Live polling started ({self.spin_poll_hz.value():.1f} Hz)")
+        else:
+            self.poll_timer.stop()
+            self.plot_timer.stop()
+            self.refresh_poll_view()
+            self.btn_poll.setText("▶ Live Poll")
+            self.log("⏹ Live polling stopped")
+
+    def update_poll_rate(self):
+        self.poll_timer.setInterval(int(1000 / self.spin_poll_hz.value()))
+
+    def poll_sensors(self):
+        # 이전 주기 요청이 아직 진행 중이면 건너뜀 (워커 큐가 쌓이지 않도록)
+        if self.poll_in_flight:
+            self.poll_misses += 1
+            return
+        self.poll_in_flight = self.read_all_sensors(self.on_poll_records, quiet=True)
+
+    def on_poll_records(self, records):
+        self.poll_in_flight = False
+        if not self.btn_poll.isChecked():
+            return
+        now = time.monotonic() - self.poll_started
+        for did, values in records:
+            self.sensor_buffer.append(did, values["distance_mm"], values["result"], now)
+        self.poll_count += 1
+        self.sensor_plot.mark_dirty()
+
+    def refresh_poll_view(self):
+        """
+        [신규] PLOT_MAX_FPS로 제한된 플롯/상태 갱신 (샘플 수신마다 다시 그리지 않음)
+        """
+        if not self.sensor_plot.dirty:
+            return
+        latest = []
+        for did in SENSOR_DIDS:
+            sample = self.sensor_buffer.latest(did)
+            if sample:
+                latest.append(f"0x{did:04X}={sample[0]}mm '{sample[1]}'")
+        self.lbl_poll_stat.setText(
+            f"polls={self.poll_count} skipped={self.poll_misses}  " + ", ".join(latest)
+        )
+        self.sensor_plot.refresh()
+
+    def show_sensor_snapshot(self, records):
+        """
+        [신규] 센서 여러 개를 한 줄로 표시 (센서 패널 1회 갱신)
+        """
+        parts = [f"0x{did:04X}={values['distance_mm']}mm '{values['result']}'" for did, values in records]
+        self.sensor_result.append("✅ Snapshot: " + ", ".join(parts))
+        self.log(f"📘 Sensor snapshot decoded ({len(records)} DIDs).")
+
+    # ---------------- 기능: 0x2E (Write) - 로직 분리 ----------------
+
+    def start_write_process(self):
+        """
+        [신규] 'Write' 버튼 클릭 시 어떤 작업을 할지 선택하는 팝업창 표시
+        """
+        msg_box = QtWidgets.QMessageBox(self)
+        msg_box.setWindowTitle("Select Write Operation")
+        msg_box.setText("Which information would you like to write?")
+        btn_ecu = msg_box.addButton("✏️ ECU Info (DID 0x0005)", QtWidgets.QMessageBox.ActionRole)
+        btn_sensor = msg_box.addButton("🔧 Sensor Conditions (DID 0x0006)", QtWidgets.QMessageBox.ActionRole)
+        msg_box.addButton("Cancel", QtWidgets.QMessageBox.RejectRole)
+        msg_box.exec_()
+
+        clicked_button = msg_box.clickedButton()
+
+        if clicked_button == btn_ecu:
+            self.write_ecu_info_dialog()
+        elif clicked_button == btn_sensor:
+            self.write_sensor_config_dialog()
+
+    def write_ecu_info_dialog(self):
+        """
+        [수정] 기존 write_ecu_info 함수 -> ECU Info 전용 다이얼로그 호출
+        """
+        current_info = {
+            'vin': self.lbl_vin.text() if self.lbl_vin.text() != '-' else '',
+            'hw': self.lbl_hw.text() if self.lbl_hw.text() != '-' else '',
+            'sw': self.lbl_sw.text() if self.lbl_sw.text() != '-' else '',
+            'sn': self.lbl_sn.text() if self.lbl_sn.text() != '-' else '',
+            'supplier': self.lbl_supplier.text() if self.lbl_supplier.text() != '-' else ''
+        }
+        
+        dialog = ECUInfoDialog(current_info, self)
+        
+        if dialog.exec_():
+            data = dialog.get_info_bytes()
+            # ECU Info는 데이터가 길어서 TP(Transport Protocol) 전송 필요
+            self.send_uds_tp_write(0x0005, data)
+
+    def write_sensor_config_dialog(self):
+        """
+        [신규] 센서 설정 다이얼로그를 띄우고 전송하는 함수
+        """
+        dialog = SensorConfigDialog(self.current_sensor_config, self)
+        
+        if dialog.exec_():
+            data = dialog.get_config_bytes() # 8 bytes
+            
+            # [수정] 전송 성공 시, GUI 내부 변수도 업데이트
+            # (사용자가 다음에 창을 열 때 이 값이 기본값이 됨)
+            self.current_sensor_config['ultra_min'] = int(dialog.ultra_min_edit.text())
+            self.current_sensor_config['ultra_max'] = int(dialog.ultra_max_edit.text())
+            self.current_sensor_config['tof_min'] = int(dialog.tof_min_edit.text())
+            self.current_sensor_config['tof_max'] = int(dialog.tof_max_edit.text())
+            
+            # [주석 수정] UDS 페이로드(SID+DID+Data = 3+8=11 bytes)가 
+            # 7바이트를 초과하므로 TP 전송이 필요함.
+            self.send_uds_tp_write(0x0006, data)
+
+    def send_uds_sf_write(self, did, data):
+        """
+        [신규] Single Frame Write 전송 함수 (짧은 데이터, 8바이트 미만)
+        """
+        # PCI(len+3) | SID | DID H | DID L | data...
+        if 3 + len(data) > 7:
+            self.log("❌ SF Error: Data too long for Single Frame.")
+            return
+
+        # ACK 대기 및 확인은 워커에서, 결과는 handle_write_ack에서 처리
+        self.submit_request(
+            bytes([0x2E, (did >> 8) & 0xFF, did & 0xFF]) + bytes(data),
+            lambda job: self.handle_write_ack(job, did),
+            sent_log=f"🚀 Sent Write (SF) DID=0x{did:04X}, len={len(data)}\n"
+                     f"⏳ Waiting for 0x6E (Write ACK for DID 0x{did:04X})...",
+        )
+
+    def send_uds_tp_write(self, did, data):
+        """
+        [신규] Transport Protocol Write 전송 함수 (긴 데이터)
+        FF 전송 → FC(0x30) 대기 → CF 전송은 IsoTpTransport.send_pdu가 처리
+        """
+        uds_data = bytes([0x2E, (did >> 8) & 0xFF, did & 0xFF]) + bytes(data)
+        self.log(f"🚀 Sending {len(uds_data)} bytes (DID 0x{did:04X}) via TP...")
+
+        self.submit_request(
+            uds_data,
+            lambda job: self.handle_write_ack(job, did),
+            sent_log=f"⏳ Waiting for 0x6E (Write ACK for DID 0x{did:04X})...",
+        )
+
+    def handle_write_ack(self, job, did):
+        """
+        [수정] Write Positive Response(0x6E) 확인 공통 함수 (워커 완료 후 GUI 스레드에서 호출)
+        """
+        pdu = job.pdu
+        if pdu:
+            # 응답 PDU: [0x6E, DID_H, DID_L]
+            ack_ok = pdu.data[:3] == bytes([0x6E, (did >> 8) & 0xFF, did & 0xFF])
+            if ack_ok:
+                self.log(f"✅ Write ACK OK for DID 0x{did:04X}.")
+                # ECU Info (0x0005)를 쓴 경우에만 화면 갱신을 위해 Read 실행
+                if did == 0x0005:
+                    self.log("... Verify by reading...")
+                    self.read_by_did(0x0005)
+            else:
+                self.result_box.append(f"⚠️ 0x6E ACK for DID 0x{did:04X} not found.")
+        else:
+            self.result_box.append("⚠️ No response received.")
+
+            
+    # ---------------- 기능: 0x19 (Read DTC) ----------------
+    def read_dtc(self, quiet=False):
+        return self.submit_request(
+            bytes([0x19, 0x02, 0xFF]), self.on_read_dtc,
+            sent_log="▶ Sent ReadDTCInformation",
+            quiet=quiet,
+        )
+
+    def on_read_dtc(self, job):
+        if job.quiet:
+            self.dtc_poll_in_flight = False
+            if job.pdu and job.pdu.data[:1] == b"\x59":
+                self.apply_dtc_report(job.pdu.data, verbose=False)
+            return
+        if job.pdu:
+            self.parse_uds_response(job.pdu.data, 0x19, 0)
+
+    def toggle_dtc_polling(self, enabled):
+        """
+        [신규] DTC_POLL_MS마다 DTC를 조회 (보고 내용이 바뀔 때만 테이블/이력 갱신)
+        """
+        if enabled and not self.tp:
+            self.log("⚠️ CAN bus not ready")
+            self.btn_dtc_poll.setChecked(False)
+            return
+        if enabled:
+            self.dtc_timer.start()
+            self.poll_dtc()
+            self.log(f"🔁 DTC auto read started ({DTC_POLL_MS} ms)")
+        else:
+            self.dtc_timer.stop()
+            self.log("⏹ DTC auto read stopped")
+
+    def poll_dtc(self):
+        if not self.dtc_poll_in_flight:
+            self.dtc_poll_in_flight = self.read_dtc(quiet=True)
+
+    # ---------------- 기능: 0x14 (Clear DTC) ----------------
+    def clear_dtc(self):
+        self.submit_request(
+            bytes([0x14, 0xFF]), self.on_clear_dtc,
+            sent_log="▶ Sent ClearDiagnosticInformation",
+        )
+
+    def on_clear_dtc(self, job):
+        pdu = job.pdu
+        if pdu:
+            # 0x54 (Positive) 응답이 있는지 명시적으로 확인
+            is_cleared = pdu.data[:1] == b"\x54"
+            if is_cleared:
+                # [수정] 재조회 대신 캐시에서 모두 지움 (다시 발생하면 다음 조회 때 신규로 표시)
+                self.log("✅ DTC Clear acknowledged (0x54). DTC table cleared.")
+                self.update_dtc_table(self.dtc_state.clear())
+            else:
+                self.log("⚠️ DTC Clear response 0x54 not found.")
+        else:
+            self.log("⚠️ No response for ClearDTC.")
+
+
+    # ---------------- UDS 응답 파서 ----------------
+    def parse_uds_response(self, payload, req_sid, did):
+        """
+        [수정] SF/FF/CF 조립은 IsoTpTransport 수신 스레드가 끝낸 상태로,
+        여기서는 완성된 UDS 페이로드만 서비스별로 해석한다.
+        """
+        pos_sid = (req_sid + 0x40) & 0xFF
+
+        if not payload:
+            self.log("⚠️ No valid UDS Read payload collected.")
+            return
+            
+        self.log(f"ℹ️ Reconstructed payload ({len(payload)} bytes): "
+                 f"{' '.join(f'{b:02X}' for b in payload[:40])}{' ...' if len(payload) > 40 else ''}")
+
+        uds_sid = payload[0]
+        if uds_sid == 0x7F:
+            return  # 부정 응답은 on_job_done에서 NRC 이름과 함께 표시
+        if uds_sid != pos_sid:
+            self.log(f"⚠️ Unexpected SID=0x{uds_sid:02X} (expected 0x{pos_sid:02X})")
+            return
+
+        # -------- 서비스별 헤더 분리 --------
+        if req_sid == 0x22: # Read
+            # [수정] DID 레이아웃 테이블(uds_codec)로 응답 전체를 한 번에 디코딩
+            records = decode_did_records(payload[1:])
+            if records is None:
+                self.log(f"⚠️ Unknown DID or invalid payload length ({len(payload) - 1} bytes).")
+                return
+            for uds_did, values in records:
+                self.did_handlers.get(uds_did, self.show_did_values)(uds_did, values)
+            return
+
+        elif req_sid == 0x19: # Read DTC
+            self.apply_dtc_report(payload, verbose=True)
+            return
+
+        elif req_sid == 0x14: # Clear DTC
+            # 0x54 응답은 clear_dtc 함수 내에서 직접 처리하므로
+            # parse_uds_response에 들어오지 않음
+            pass
+
+    # ---------------- DID별 표시 ----------------
+    def show_ecu_info(self, did, info):
+        self.lbl_vin.setText(info['vin'])
+        self.lbl_hw.setText(info['hw'])
+        self.lbl_sw.setText(info['sw'])
+        self.lbl_sn.setText(info['sn'])
+        self.lbl_supplier.setText(info['supplier'])
+        self.log("📗 ECU Info successfully parsed (100 bytes).")
+
+    def show_sensor_value(self, did, values):
+        val, status_char = values['distance_mm'], values['result']
+        self.sensor_result.append(f"✅ Sensor DID 0x{did:04X}: {val} mm (0x{val:04X}) '{status_char}'")
+        self.log(f"📘 Sensor data decoded (Result={status_char}).")
+
+    def show_sensor_config(self, did, config):
+        self.current_sensor_config.update(config)
+        self.result_box.append(
+            f"✅ Sensor Config: Ultra {config['ultra_min']}~{config['ultra_max']} mm, "
+            f"ToF {config['tof_min']}~{config['tof_max']} mm"
+        )
+        self.log("📗 Sensor config decoded (DID 0x0006).")
+
+    def show_did_values(self, did, values):
+        fields = ", ".join(f"{k}={v}" for k, v in values.items())
+        self.result_box.append(f"✅ {did_name(did)} (0x{did:04X}): {fields}")
+
+    # ---------------- DTC 테이블 업데이트 (수정됨) ----------------
+    def apply_dtc_report(self, payload, verbose):
+        """
+        [신규] 0x59 응답을 DTC 캐시에 반영하고 바뀐 행만 갱신
+        verbose=False(자동 조회)이면 변경이 있을 때만 결과창에 남김
+        """
+        try:
+            _, dtcs = decode_dtc_report(payload)
+        except ValueError as e:
+            if verbose:
+                self.log(f"⚠️ {e}")
+            return
+
+        diff = self.dtc_state.update(dtcs)
+        self.update_dtc_table(diff)
+        if not verbose:
+            return
+
+        # DTC 없음
+        if not dtcs:
+            self.result_box.append("✅ DTC 없음 (No Diagnostic Trouble Code Stored)")
+            self.log("📙 DTC information decoded (empty).")
+            return
+
+        # DTC 있음
+        self.result_box.append(f"✅ DTC Count: {len(dtcs)}")
+        for i, (code, status) in enumerate(dtcs, 1):
+            desc = dtc_status_description(status)
+            self.result_box.append(f" DTC {i}: 0x{code:06X}, Status: 0x{status:02X} ({desc})")
+        self.log("📙 DTC information decoded.")
+
+    def update_dtc_table(self, diff):
+        """
+        [수정] 전체 재구성(setRowCount(0)) 대신 DtcDiff에 들어 있는 행만 추가/수정/삭제
+        """
+        table = self.dtc_table
+        for entry in diff.removed:
+            items = self.dtc_rows.pop(entry.code)
+            table.removeRow(table.row(items[0]))
+        if diff.added and self.dtc_placeholder:
+            table.removeRow(0)
+            self.dtc_placeholder = False
+
+        for entry in diff.added:
+            row = table.rowCount()
+            table.insertRow(row)
+            items = [
+                QtWidgets.QTableWidgetItem(str(row + 1)),
+                QtWidgets.QTableWidgetItem(f"0x{entry.code:06X}"),
+                # [신규] 2번 열에 DTC 설명 추가
+                QtWidgets.QTableWidgetItem(dtc_description(entry.code)),
+                QtWidgets.QTableWidgetItem(f"0x{entry.status:02X}"),
+                QtWidgets.QTableWidgetItem(dtc_status_description(entry.status)),
+                QtWidgets.QTableWidgetItem(time.strftime("%H:%M:%S", time.localtime(entry.first_seen))),
+            ]
+            for col, item in enumerate(items):
+                table.setItem(row, col, item)
+            self.dtc_rows[entry.code] = items
+
+        for entry, _ in diff.changed:
+            items = self.dtc_rows[entry.code]
+            items[3].setText(f"0x{entry.status:02X}")
+            items[4].setText(dtc_status_description(entry.status))
+
+        if diff.removed:
+            for row in range(table.rowCount()):
+                table.item(row, 0).setText(str(row + 1))
+        if not self.dtc_rows and not self.dtc_placeholder:
+            table.setRowCount(0)
+            table.insertRow(0)
+            for col, text in enumerate(("1", "없음", "DTC 없음", "-", "정상 (No Fault)", "-")):
+                table.setItem(0, col, QtWidgets.QTableWidgetItem(text))
+            self.dtc_placeholder = True
+
+        self.log_dtc_history(diff)
+
+    def log_dtc_history(self, diff):
+        """
+        [신규] 신규/상태 전이/사라진 DTC를 이력 창에 기록
+        """
+        stamp = time.strftime("%H:%M:%S", time.localtime(self.dtc_state.last_update))
+        for entry in diff.added:
+            self.dtc_history.append(
+                f"{stamp}  0x{entry.code:06X}  발생 → 0x{entry.status:02X} ({dtc_status_description(entry.status)})")
+        for entry, old in diff.changed:
+            self.dtc_history.append(
+                f"{stamp}  0x{entry.code:06X}  0x{old:02X} → 0x{entry.status:02X} "
+                f"({dtc_status_description(entry.status)})")
+        for entry in diff.removed:
+            self.dtc_history.append(f"{stamp}  0x{entry.code:06X}  해제 (0x{entry.status:02X} → 없음)")
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="CAN/UDS diagnostic GUI.")
+    parser.add_argument("--config", help="JSON file with bustype/channel/bitrate/req_id/res_id/p2/p2_star/"
+                                         "fd/data_bitrate/brs (CLI options override it).")
+    parser.add_argument("--bustype", help=f"Bus backend: {', '.join(BACKENDS)} or any python-can interface "
+                                          f"(default: {DEFAULT_BACKEND}).")
+    parser.add_argument("--channel", help="CAN channel (default depends on --bustype).")
+    parser.add_argument("--bitrate", type=int)
+    parser.add_argument("--req-id", type=lambda x: int(x, 16))
+    parser.add_argument("--res-id", type=lambda x: int(x, 16))
+    parser.add_argument("--p2", type=float, help=f"P2 response timeout in seconds (default: {P2_CLIENT}).")
+    parser.add_argument("--p2-star", type=float,
+                        help=f"P2* timeout after 0x78 responsePending (default: {P2_STAR_CLIENT}).")
+    parser.add_argument("--fd", action="store_true", default=None, help="Use CAN FD (64-byte ISO-TP frames).")
+    parser.add_argument("--data-bitrate", type=int,
+                        help=f"CAN FD data phase bit rate (default: {DEFAULT_DATA_BITRATE}).")
+    parser.add_argument("--no-brs", dest="brs", action="store_false", default=None,
+                        help="Send CAN FD frames without bit rate switching.")
+    return parser
+
+
+def load_settings(argv=None):
+    """
+    [신규] 설정 파일(--config) 위에 명령행 옵션을 덮어써 CANUDSGui 인자를 만든다.
+    설정 파일 예: {"bustype": "vcan", "channel": "vcan0", "req_id": "7E0", "res_id": "7E8"}
+    """
+    args, _ = build_arg_parser().parse_known_args(argv)  # 나머지는 Qt 옵션(-style 등)
+    settings = {}
+    if args.config:
+        with open(args.config, "r", encoding="utf-8") as f:
+            settings = json.load(f)
+        for key in ("req_id", "res_id"):
+            if isinstance(settings.get(key), str):
+                settings[key] = int(settings[key], 16)
+    settings.update({k: v for k, v in vars(args).items() if k != "config" and v is not None})
+    return settings
+
+
+if __name__ == "__main__":
+    settings = load_settings(sys.argv[1:])
+    app = QtWidgets.QApplication(sys.argv)
+    gui = CANUDSGui(**settings)
+    gui.show()
     sys.exit(app.exec_())
\ No newline at end of file
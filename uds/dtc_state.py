@@ -0,0 +1,95 @@
+"""
+DTC 상태 캐시 (코드별 현재 상태 + 변경 이력).
+
+0x19 02 응답을 받을 때마다 이전 보고와 코드 단위로 비교해 신규/상태 변경/사라진 DTC만
+DtcDiff로 돌려준다. 화면은 diff에 들어 있는 행만 다시 그리면 되므로,
+DTC를 계속 폴링해도 보고 내용이 같으면 비교 한 번으로 끝난다.
+
+이력(history)에는 (시각, 코드, 이전 상태, 새 상태)가 쌓이며 상태 None은 "보고에 없음"을 뜻한다.
+"""
+import collections
+import time
+
+DtcDiff = collections.namedtuple("DtcDiff", ["added", "changed", "removed"])
+DtcEvent = collections.namedtuple("DtcEvent", ["timestamp", "code", "old_status", "new_status"])
+
+NO_CHANGE = DtcDiff((), (), ())
+
+
+class DtcEntry:
+    """DTC 하나의 현재 상태와 최초/최근 보고 시각."""
+
+    __slots__ = ("code", "status", "first_seen", "last_seen", "active")
+
+    def __init__(self, code, status, now):
+        self.code = code
+        self.status = status
+        self.first_seen = now
+        self.last_seen = now
+        self.active = True
+
+
+class DtcStateCache:
+    """
+    코드별 DtcEntry 캐시. update()에 0x19 보고 [(code, status), ...]를 넣으면
+    DtcDiff(added=[DtcEntry], changed=[(DtcEntry, 이전 상태)], removed=[DtcEntry])를 반환한다.
+    보고에서 사라진 DTC도 엔트리는 남겨 두므로 다시 나타나면 최초 발생 시각이 유지된다.
+    """
+
+    def __init__(self, history_size=1000):
+        self.entries = {}
+        self.history = collections.deque(maxlen=history_size)
+        self.last_update = None
+        self._last_report = None
+
+    def active(self):
+        return [e for e in self.entries.values() if e.active]
+
+    def update(self, dtcs, now=None):
+        now = time.time() if now is None else now
+        report = tuple(dtcs)
+        self.last_update = now
+        if report == self._last_report:
+            for code, _ in report:
+                self.entries[code].last_seen = now
+            return NO_CHANGE
+        self._last_report = report
+
+        added, changed = [], []
+        seen = set()
+        for code, status in report:
+            seen.add(code)
+            entry = self.entries.get(code)
+            if entry is None:
+                entry = self.entries[code] = DtcEntry(code, status, now)
+                added.append(entry)
+                self.history.append(DtcEvent(now, code, None, status))
+                continue
+            entry.last_seen = now
+            if not entry.active:
+                entry.active, entry.status = True, status
+                added.append(entry)
+                self.history.append(DtcEvent(now, code, None, status))
+            elif entry.status != status:
+                changed.append((entry, entry.status))
+                self.history.append(DtcEvent(now, code, entry.status, status))
+                entry.status = status
+
+        removed = [e for e in self.entries.values() if e.active and e.code not in seen]
+        for entry in removed:
+            self._deactivate(entry, now)
+        return DtcDiff(added, changed, removed)
+
+    def clear(self, now=None):
+        """0x14 (ClearDiagnosticInformation) 긍정 응답 후 호출: 모든 활성 DTC를 사라진 것으로 처리"""
+        now = time.time() if now is None else now
+        removed = self.active()
+        for entry in removed:
+            self._deactivate(entry, now)
+        self._last_report = ()
+        self.last_update = now
+        return DtcDiff((), (), removed)
+
+    def _deactivate(self, entry, now):
+        entry.active = False
+        self.history.append(DtcEvent(now, entry.code, entry.status, None))
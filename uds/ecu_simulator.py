@@ -0,0 +1,429 @@
+"""
+TC375 UDS ECU 시뮬레이터 (python-can virtual 버스 / Linux vcan).
+
+TC375 펌웨어(BSW/Driver/can.c)의 진단 서비스를 그대로 흉내 낸다.
+  - 0x22 ReadDataByIdentifier  : DID 0x0001~0x0004 센서, 0x0005 ECU Info, 0x0006 센서 판정 조건
+  - 0x2E WriteDataByIdentifier : DID 0x0005 (100바이트), 0x0006 (unsigned short 4개, Little Endian)
+  - 0x19 ReadDTCInformation    : sub-function 0x02 (DTC 3바이트 + Status 1바이트 반복)
+  - 0x14 ClearDiagnosticInformation
+  - 0x34/0x36/0x37 다운로드 (펌웨어 미구현, uds_flash.py 검증용): 받은 이미지는 flashed[주소]에 저장
+센서 값이 판정 조건을 벗어나면 'F' 판정과 함께 0x0101x1/0x010201 DTC를,
+센서 데이터가 없으면(None) 0x0101x0/0x010200 DTC와 NRC 0x11을 남긴다 (보류 0x01 → 재검출 시 확정 0x40).
+
+펌웨어와 다른 점:
+  - 멀티프레임 응답 송신 시 테스터의 FlowControl(BS/STmin)을 지킨다 (펌웨어는 FC 없이 1 ms 간격 송신).
+  - DID 0x0006 읽기를 지원한다 (펌웨어는 쓰기만 지원).
+  - multi_did=True면 다중 DID 0x22 요청에 한 번에 응답한다 (기본값은 펌웨어처럼 미지원).
+  - 0x37 긍정 응답에 받은 데이터의 CRC32(4바이트, Big-endian)를 실어 보낸다.
+
+IsoTpTransport를 ECU 방향(요청 ID 수신, 응답 ID 송신)으로 사용하므로 조립/FC 처리는 테스터와 같은 코드다.
+
+사용 예 (vcan, 별도 프로세스):
+    sudo ip link add dev vcan0 type vcan && sudo ip link set up vcan0
+    python ecu_simulator.py --bustype vcan --latency 0.002 --bs 8 --stmin 1
+    python ecu_simulator.py --bustype vcan --fd   (CAN FD: 64바이트 프레임, escape SF/FF)
+    python uds_cli.py requests.txt --bustype vcan
+
+같은 프로세스 안에서 (virtual 버스):
+    with VirtualEcu.open("sim", "virtual") as ecu:
+        ...
+"""
+import argparse
+import logging
+import random
+import struct
+import sys
+import threading
+import time
+import zlib
+
+import can
+
+from can_backend import DEFAULT_DATA_BITRATE, add_bus_args, default_channel, fd_options
+from isotp_transport import IsoTpError, IsoTpTransport, is_valid_stmin
+from uds_client import (
+    DID_ECU_INFO,
+    DID_SENSOR_CONFIG,
+    ECU_INFO_LEN,
+    SENSOR_DIDS,
+    did_bytes,
+    encode_ecu_info,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+# can.c의 g_ecuInfo / g_sensorThresholds 초기값
+DEFAULT_ECU_INFO = {
+    "vin": "MY_TC375_VIN_001",
+    "hw": "TC375_HW_V1.0.0",
+    "sw": "MY_APP_SW_V1.2.3",
+    "sn": "SN_ECU_1234567890",
+    "supplier": "MyProjectSupplier",
+}
+DEFAULT_SENSOR_CONFIG = (0, 400, 0, 5000)  # ultra_min, ultra_max, tof_min, tof_max (mm)
+DEFAULT_SENSOR_VALUES = {0x0001: 150, 0x0002: 220, 0x0003: 310, 0x0004: 1200}  # mm
+
+MAX_DTC_COUNT = 16
+DTC_PENDING = 0x01
+DTC_CONFIRMED = 0x40
+
+SENSOR_CONFIG_STRUCT = struct.Struct("<HHHH")
+
+# 다운로드 허용 영역: TC375 Program Flash (PFlash0/1, cached 0x8000_0000 ~ 6 MB)
+FLASH_BASE = 0x80000000
+FLASH_SIZE = 0x600000
+MAX_BLOCK_LEN = 0xFFF  # 0x36 요청 최대 길이 = 클래식 ISO-TP PDU 상한
+MAX_BLOCK_LEN_FD = 0x4002  # CAN FD: escape FF로 16 KiB 데이터 + SID/시퀀스 카운터
+PENDING_INTERVAL = 2.0  # NRC 0x78 재전송 간격 (P2*server_max 5 s보다 충분히 짧게)
+
+
+def sensor_dtc(did, timeout):
+    """can.c DTC_Report 규칙: 초음파 0x010100 + side*0x10 + (0 timeout / 1 range), ToF 0x010200/0x010201"""
+    base = 0x010200 if did == 0x0004 else 0x010100 + (did - 0x0001) * 0x10
+    return base + (0 if timeout else 1)
+
+
+class VirtualEcu:
+    """
+    TC375 진단 스택 시뮬레이터. start() 후 별도 스레드에서 요청을 하나씩 처리한다.
+
+    latency      : 요청 조립 완료 → 응답 송신까지 지연(초), jitter만큼 무작위로 더함
+    bs, stmin    : 멀티프레임 요청 수신 시 보내는 FlowControl 파라미터
+    drop_rate    : 요청을 무시(무응답)할 확률
+    nrc_rate     : 무작위 부정 응답(fail_nrc) 확률
+    nrc_overrides: {SID: NRC} 해당 서비스에 항상 부정 응답
+    max_block_len: 0x34 응답으로 알려 주는 maxNumberOfBlockLength (0x36 요청 전체 길이)
+                   None이면 전송 계층에 맞춰 MAX_BLOCK_LEN(클래식) / MAX_BLOCK_LEN_FD(CAN FD)
+    pending      : {SID: 초} 해당 서비스는 NRC 0x78(responsePending)을 보내며 그만큼 처리 시간을 끈다
+    """
+
+    def __init__(self, tp, req_id=0x7E0, res_id=0x7E8, latency=0.0, jitter=0.0, bs=0, stmin=0,
+                 drop_rate=0.0, nrc_rate=0.0, fail_nrc=0x22, nrc_overrides=None,
+                 multi_did=False, sensor_noise=0, seed=None, max_block_len=None, pending=None):
+        self.tp = tp
+        self.req_id = req_id
+        self.res_id = res_id
+        self.latency = latency
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        self.nrc_rate = nrc_rate
+        self.fail_nrc = fail_nrc
+        self.nrc_overrides = dict(nrc_overrides or {})
+        self.multi_did = multi_did
+        self.sensor_noise = sensor_noise
+        self.max_block_len = max_block_len or (MAX_BLOCK_LEN_FD if tp.fd else MAX_BLOCK_LEN)
+        self.pending = dict(pending or {})
+        self._rng = random.Random(seed)
+
+        self.ecu_info = encode_ecu_info(DEFAULT_ECU_INFO)
+        self.sensor_config = SENSOR_CONFIG_STRUCT.pack(*DEFAULT_SENSOR_CONFIG)
+        self.sensor_values = dict(DEFAULT_SENSOR_VALUES)
+        self.dtcs = {}  # code -> [status, detect_cnt] (삽입 순서 = 보고 순서)
+        self.request_count = 0
+        self.download = None  # 진행 중인 다운로드: [주소, 전체 크기, 받은 데이터, 마지막 시퀀스]
+        self.flashed = {}  # 주소 -> 다운로드 완료된 이미지 bytes
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        tp.set_rx_flow_control(bs, stmin)
+        tp.subscribe(req_id, res_id)  # 요청 ID 조립, FC는 응답 ID로 송신
+
+    @classmethod
+    def open(cls, channel, bustype="virtual", bitrate=500000, fd=False, data_bitrate=DEFAULT_DATA_BITRATE,
+             brs=True, **kwargs):
+        """can.Bus를 직접 열어 소유하는 시뮬레이터를 만든다 (fd=True면 CAN FD ISO-TP로 응답)."""
+        tp = IsoTpTransport.open(channel, bustype, bitrate, fd=fd, data_bitrate=data_bitrate, brs=brs)
+        return cls(tp, **kwargs)
+
+    # ---------------- 수명 관리 ----------------
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return self
+        self.tp.start()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._serve, name=f"ecu-sim-{self.req_id:03X}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def close(self):
+        self.stop()
+        self.tp.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------------- 상태 조작 (테스트/벤치마크용) ----------------
+    def set_sensor(self, did, value):
+        """센서 거리(mm) 설정. None이면 데이터 없음(타임아웃)으로 처리."""
+        with self._lock:
+            self.sensor_values[did] = value
+
+    def add_dtc(self, code, status=DTC_PENDING):
+        with self._lock:
+            self._report_dtc(code)
+            entry = self.dtcs.get(code)
+            if entry is not None and status > entry[0]:
+                entry[0] = status
+                entry[1] = max(entry[1], 2 if status == DTC_CONFIRMED else 1)
+
+    def _report_dtc(self, code):
+        entry = self.dtcs.get(code)
+        if entry is not None:
+            entry[1] += 1
+            entry[0] = DTC_CONFIRMED
+        elif len(self.dtcs) < MAX_DTC_COUNT:
+            self.dtcs[code] = [DTC_PENDING, 1]
+
+    # ---------------- 요청 처리 ----------------
+    def _serve(self):
+        while not self._stop.is_set():
+            pdu = self.tp.recv_pdu(self.req_id, timeout=0.1)
+            if pdu is None or not pdu.data:
+                continue
+            self.request_count += 1
+            if self.drop_rate and self._rng.random() < self.drop_rate:
+                continue
+
+            response = self.handle(pdu.data, single_frame=len(pdu.frames) == 1)
+            if response is None:
+                continue
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                self._respond_pending(pdu.data[0])
+                self.tp.send_pdu(self.res_id, self.req_id, response)
+            except (IsoTpError, can.CanError) as e:
+                LOGGER.warning("Simulator response 0x%02X failed: %s", response[0], e)
+
+    def _respond_pending(self, sid):
+        """pending에 등록된 서비스: P2*server 안에서 NRC 0x78을 반복하며 처리 시간을 흉내 냄"""
+        remaining = self.pending.get(sid, 0.0)
+        while remaining > 0:
+            self.tp.send_pdu(self.res_id, self.req_id, self._negative(sid, 0x78))
+            step = min(remaining, PENDING_INTERVAL)
+            time.sleep(step)
+            remaining -= step
+
+    def handle(self, request, single_frame=True):
+        """UDS 요청 하나를 처리해 응답 페이로드(bytes)를 반환한다. None이면 무응답."""
+        sid = request[0]
+        if sid in self.nrc_overrides:
+            return self._negative(sid, self.nrc_overrides[sid])
+        if self.nrc_rate and self._rng.random() < self.nrc_rate:
+            return self._negative(sid, self.fail_nrc)
+
+        with self._lock:
+            if sid == 0x22:
+                return self._read_did(request, single_frame)
+            if sid == 0x2E:
+                return self._write_did(request)
+            if sid == 0x19:
+                return self._read_dtc(request)
+            if sid == 0x14:
+                self.dtcs.clear()
+                return bytes([0x54, 0xFF])
+            if sid == 0x34:
+                return self._request_download(request)
+            if sid == 0x36:
+                return self._transfer_data(request)
+            if sid == 0x37:
+                return self._transfer_exit()
+        return self._negative(sid, 0x11)
+
+    @staticmethod
+    def _negative(sid, nrc):
+        return bytes([0x7F, sid, nrc])
+
+    def _read_did(self, request, single_frame):
+        if len(request) < 3:
+            return self._negative(0x22, 0x13)
+        dids = [(request[i] << 8) | request[i + 1] for i in range(1, len(request) - 1, 2)]
+        if len(dids) > 1 and not self.multi_did:
+            # 펌웨어: SF 요청은 첫 DID만 처리, 멀티프레임 0x22는 미지원(0x11)
+            if not single_frame:
+                return self._negative(0x22, 0x11)
+            dids = dids[:1]
+
+        out = bytearray([0x62])
+        for did in dids:
+            data = self._did_data(did)
+            if isinstance(data, int):
+                return self._negative(0x22, data)
+            out += did_bytes(did) + data
+        return bytes(out)
+
+    def _did_data(self, did):
+        """DID 데이터 bytes, 또는 부정 응답 NRC(int)"""
+        if did in SENSOR_DIDS:
+            value = self.sensor_values.get(did)
+            if value is None:
+                self._report_dtc(sensor_dtc(did, timeout=True))
+                return 0x11  # 펌웨어는 센서 타임아웃 시 negCanData(0x11)를 그대로 보냄
+            if self.sensor_noise:
+                value = max(0, value + self._rng.randint(-self.sensor_noise, self.sensor_noise))
+            ultra_min, ultra_max, tof_min, tof_max = SENSOR_CONFIG_STRUCT.unpack(self.sensor_config)
+            lo, hi = (tof_min, tof_max) if did == 0x0004 else (ultra_min, ultra_max)
+            result = b"P"
+            if not lo <= value <= hi:
+                self._report_dtc(sensor_dtc(did, timeout=False))
+                result = b"F"
+            return struct.pack(">H", value & 0xFFFF) + result
+        if did == DID_ECU_INFO:
+            return self.ecu_info
+        if did == DID_SENSOR_CONFIG:
+            return self.sensor_config
+        return 0x11  # 펌웨어: 알 수 없는 DID → negCanData(0x11)
+
+    def _write_did(self, request):
+        if len(request) < 3:
+            return self._negative(0x2E, 0x13)
+        did = (request[1] << 8) | request[2]
+        data = bytes(request[3:])
+        if did == DID_ECU_INFO:
+            if len(data) < ECU_INFO_LEN:
+                return self._negative(0x2E, 0x13)
+            self.ecu_info = data[:ECU_INFO_LEN]
+        elif did == DID_SENSOR_CONFIG:
+            if len(data) < SENSOR_CONFIG_STRUCT.size:
+                return self._negative(0x2E, 0x13)
+            self.sensor_config = data[:SENSOR_CONFIG_STRUCT.size]
+        else:
+            return self._negative(0x2E, 0x31)
+        return bytes([0x6E]) + did_bytes(did)
+
+    def _read_dtc(self, request):
+        if len(request) < 2 or request[1] != 0x02:
+            return self._negative(0x19, 0x12)
+        out = bytearray([0x59, 0x02, 0xFF])
+        for code, (status, _) in self.dtcs.items():
+            out += bytes([(code >> 16) & 0xFF, (code >> 8) & 0xFF, code & 0xFF, status])
+        return bytes(out)
+
+    def _request_download(self, request):
+        if len(request) < 3:
+            return self._negative(0x34, 0x13)
+        size_len, addr_len = request[2] >> 4, request[2] & 0x0F
+        if not 1 <= addr_len <= 4 or not 1 <= size_len <= 4 or len(request) != 3 + addr_len + size_len:
+            return self._negative(0x34, 0x13)
+        if request[1] != 0x00:
+            return self._negative(0x34, 0x31)  # 압축/암호화 미지원
+        address = int.from_bytes(request[3:3 + addr_len], "big")
+        size = int.from_bytes(request[3 + addr_len:], "big")
+        if not size or address < FLASH_BASE or address + size > FLASH_BASE + FLASH_SIZE:
+            return self._negative(0x34, 0x31)
+        self.download = [address, size, bytearray(), 0]  # 끝나지 않은 이전 다운로드는 버림
+        return bytes([0x74, 0x20]) + self.max_block_len.to_bytes(2, "big")
+
+    def _transfer_data(self, request):
+        if self.download is None:
+            return self._negative(0x36, 0x24)  # requestSequenceError
+        if len(request) < 2 or len(request) > self.max_block_len:
+            return self._negative(0x36, 0x13)
+        _, size, data, last_seq = self.download
+        seq = request[1]
+        if seq == last_seq and data:
+            return bytes([0x76, seq])  # 응답 유실 후 같은 블록 재전송: 다시 쓰지 않고 긍정 응답
+        if seq != (last_seq + 1) & 0xFF:
+            return self._negative(0x36, 0x73)  # wrongBlockSequenceCounter
+        if len(data) + len(request) - 2 > size:
+            return self._negative(0x36, 0x71)  # transferDataSuspended
+        data += request[2:]
+        self.download[3] = seq
+        return bytes([0x76, seq])
+
+    def _transfer_exit(self):
+        if self.download is None:
+            return self._negative(0x37, 0x24)
+        address, size, data, _ = self.download
+        if len(data) != size:
+            return self._negative(0x37, 0x24)
+        self.download = None
+        self.flashed[address] = bytes(data)
+        return bytes([0x77]) + zlib.crc32(data).to_bytes(4, "big")
+
+
+def _pair(text):
+    req, res = text.split(":")
+    return int(req, 16), int(res, 16)
+
+
+def _nrc_override(text):
+    sid, nrc = text.split(":")
+    return int(sid, 16), int(nrc, 16)
+
+
+def _pending(text):
+    sid, seconds = text.split(":")
+    return int(sid, 16), float(seconds)
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Simulated TC375 UDS ECU on a virtual/vcan CAN bus.")
+    add_bus_args(parser, backend="vcan")
+    parser.add_argument("--ecu", dest="ecus", action="append", type=_pair,
+                        help="REQ:RES ID pair in hex (repeatable, default 7E0:7E8).")
+    parser.add_argument("--latency", type=float, default=0.0, help="Response delay in seconds.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra delay up to this many seconds.")
+    parser.add_argument("--bs", type=int, default=0, help="FlowControl block size for multi-frame requests.")
+    parser.add_argument("--stmin", type=lambda x: int(x, 0), default=0, help="FlowControl STmin byte.")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="Probability of ignoring a request.")
+    parser.add_argument("--nrc-rate", type=float, default=0.0, help="Probability of a random negative response.")
+    parser.add_argument("--fail-nrc", type=lambda x: int(x, 16), default=0x22, help="NRC used by --nrc-rate (hex).")
+    parser.add_argument("--nrc", dest="nrc_overrides", action="append", type=_nrc_override, default=[],
+                        help="SID:NRC in hex, always answer SID negatively (repeatable).")
+    parser.add_argument("--pending", action="append", type=_pending, default=[],
+                        help="SID:SECONDS, answer SID with 0x78 responsePending for that long first (repeatable).")
+    parser.add_argument("--multi-did", action="store_true", help="Answer multi-DID 0x22 requests in one response.")
+    parser.add_argument("--max-block-len", type=lambda x: int(x, 0),
+                        help=f"maxNumberOfBlockLength returned for RequestDownload (0x34) "
+                             f"(default: 0x{MAX_BLOCK_LEN:X}, 0x{MAX_BLOCK_LEN_FD:X} with --fd).")
+    parser.add_argument("--sensor-noise", type=int, default=0, help="Random +/- mm added to sensor readings.")
+    parser.add_argument("--seed", type=int)
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    if not is_valid_stmin(args.stmin):
+        raise SystemExit(f"Invalid STmin: 0x{args.stmin:02X}")
+    logging.basicConfig(level=logging.INFO)
+
+    channel = args.channel or default_channel(args.bustype)
+    ecus = []
+    for req_id, res_id in args.ecus or [(0x7E0, 0x7E8)]:
+        tp = IsoTpTransport.open(channel, args.bustype, args.bitrate, **fd_options(args))
+        ecus.append(VirtualEcu(
+            tp, req_id, res_id, latency=args.latency, jitter=args.jitter, bs=args.bs, stmin=args.stmin,
+            drop_rate=args.drop_rate, nrc_rate=args.nrc_rate, fail_nrc=args.fail_nrc,
+            nrc_overrides=dict(args.nrc_overrides), multi_did=args.multi_did,
+            sensor_noise=args.sensor_noise, seed=args.seed, max_block_len=args.max_block_len,
+            pending=dict(args.pending),
+        ).start())
+        print(f"🟢 Simulated ECU 0x{req_id:03X}/0x{res_id:03X} on {args.bustype}:{channel}"
+              f"{' (CAN FD)' if args.fd else ''}", flush=True)
+
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for ecu in ecus:
+            ecu.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,534 @@
+"""
+ISO-TP(ISO 15765-2) 전송 계층.
+
+can.Bus를 소유하고 전용 수신 스레드에서 응답 ID별로 SF/FF/CF를 조립한다.
+PDU가 완성되는 즉시 해당 ID의 큐에 들어가므로, 요청 측은 고정 타임아웃을
+다 채우지 않고 마지막 CF가 도착한 순간 깨어난다.
+
+CAN FD(fd=True)에서는 TX_DL=64로 보낸다.
+  - SF: 7바이트 이하는 클래식 SF, 그보다 길면 escape SF [0x00, SF_DL] (최대 62바이트)
+  - FF: 4095바이트 이하는 12비트 FF_DL, 그보다 길면 escape FF [0x10, 0x00, FF_DL 4바이트]
+  - CF: 63바이트씩 (클래식 7바이트 대비 프레임 수 약 1/9)
+  - 프레임은 8바이트 미만이면 8바이트로, 8바이트를 넘으면 다음 FD 데이터 길이(12~64)로 패딩
+  - 데이터 구간 비트레이트 전환(BRS)은 brs로 켜고 끈다
+수신 측 조립기는 클래식/FD 프레임을 모두 받아들인다.
+"""
+import bisect
+import logging
+import queue
+import sys
+import threading
+import time
+from collections import namedtuple
+
+import can
+
+from can_backend import DEFAULT_DATA_BITRATE, open_bus
+
+LOGGER = logging.getLogger(__name__)
+
+FRAME_LEN = 8
+FD_FRAME_LEN = 64
+FD_DATA_LENGTHS = (8, 12, 16, 20, 24, 32, 48, 64)  # CAN FD DLC 8~15의 데이터 길이
+PAD_BYTE = 0x00
+
+MAX_FF_DL = 0xFFF  # 12비트 FF_DL 상한 (클래식 ISO-TP PDU 최대 길이)
+MAX_ESCAPE_FF_DL = 0xFFFFFFFF  # escape FF(32비트 FF_DL) 상한
+
+# PCI 타입 (data[0] 상위 니블)
+PCI_SF = 0x0
+PCI_FF = 0x1
+PCI_CF = 0x2
+PCI_FC = 0x3
+
+# FlowControl FlowStatus
+FS_CTS = 0x0
+FS_WAIT = 0x1
+FS_OVFLW = 0x2
+
+# 조립 완료된 UDS PDU 한 건 (data: bytes, frames: 수신한 can.Message 목록)
+Pdu = namedtuple("Pdu", ["arbitration_id", "data", "frames"])
+
+
+class IsoTpError(Exception):
+    """FlowControl 미수신, FS 거부 등 ISO-TP 전송 실패."""
+
+
+def is_valid_stmin(stmin):
+    """ISO 15765-2에서 정의된 STmin 값인지 (0x00~0x7F, 0xF1~0xF9)."""
+    return 0 <= stmin <= 0x7F or 0xF1 <= stmin <= 0xF9
+
+
+def stmin_to_ns(stmin):
+    """
+    FC의 STmin 바이트를 나노초 단위로 변환 (0x00~0x7F: ms, 0xF1~0xF9: 100~900us).
+    예약값(0x80~0xF0, 0xFA~0xFF)은 ISO 15765-2에 따라 최대값 0x7F(127 ms)로 취급한다.
+    """
+    if stmin <= 0x7F:
+        return stmin * 1_000_000
+    if 0xF1 <= stmin <= 0xF9:
+        return (stmin - 0xF0) * 100_000
+    return 0x7F * 1_000_000
+
+
+# STmin 대기: 남은 시간이 SPIN_THRESHOLD_NS보다 길면 그만큼 빼고 sleep, 나머지는 spin
+# (sleep은 평소 100 us 안쪽으로 늦지만 다른 스레드/프로세스와 겹치면 수 ms까지 밀리고,
+#  Windows는 타이머 해상도 때문에 1~2 ms 늦는 경우가 흔함)
+SPIN_THRESHOLD_NS = 2_000_000 if sys.platform == "win32" else 1_000_000
+
+
+def wait_until_ns(deadline_ns):
+    """
+    perf_counter_ns 기준 deadline_ns까지 대기한다.
+    time.sleep()은 OS 스케줄러 때문에 수백 us~1 ms 늦게 깨어나므로 마지막 구간은 spin으로 맞춘다.
+    spin 중에도 sleep(0)으로 GIL을 양보해 수신 스레드가 FC/응답을 처리할 수 있게 한다.
+    """
+    remaining = deadline_ns - time.perf_counter_ns()
+    if remaining > SPIN_THRESHOLD_NS:
+        time.sleep((remaining - SPIN_THRESHOLD_NS) / 1e9)
+    while time.perf_counter_ns() < deadline_ns:
+        time.sleep(0)
+
+
+def padded_len(length, fd=False):
+    """데이터 length바이트를 담는 프레임 길이 (클래식 8, FD는 8 이상 중 가장 가까운 FD 데이터 길이)"""
+    if not fd:
+        return FRAME_LEN
+    return FD_DATA_LENGTHS[bisect.bisect_left(FD_DATA_LENGTHS, length)]
+
+
+def frame_count(length, tx_dl=FRAME_LEN):
+    """PDU length바이트를 보내는 데 필요한 SF/FF+CF 프레임 수 (tx_dl: 프레임 최대 길이)"""
+    if length <= FRAME_LEN - 1 or length <= tx_dl - 2:
+        return 1
+    first = tx_dl - 2 if length <= MAX_FF_DL else tx_dl - 6
+    return 1 + -(-(length - first) // (tx_dl - 1))
+
+
+# IsoTpReassembler.feed() 결과 이벤트
+EV_NONE = 0  # 무시했거나 조립 중
+EV_FF = 1    # 멀티프레임 수신 시작 (수신 측은 FC 송신)
+EV_CF = 2    # CF 반영, 아직 미완성 (BS 카운트용)
+EV_PDU = 3   # PDU 완성 (value: Pdu)
+EV_FC = 4    # FlowControl 수신 (value: FC 3바이트)
+
+
+class _RxState:
+    """ID 하나에 대한 멀티프레임 수신 진행 상태."""
+    __slots__ = ("total", "payload", "next_sn", "frames", "last_rx")
+
+    def __init__(self, total, first_chunk, frame, now):
+        self.total = total
+        self.payload = bytearray(first_chunk)
+        self.next_sn = 1
+        self.frames = [frame]
+        self.last_rx = now
+
+
+class IsoTpReassembler:
+    """
+    ID별 SF/FF/CF 조립기.
+    송신/큐 같은 입출력이 없으므로 실시간 수신 스레드와 오프라인 트레이스 디코더가 함께 쓴다.
+    now는 N_Cr 검사용 시각(실시간: time.monotonic(), 트레이스: msg.timestamp)이다.
+    """
+
+    def __init__(self, n_cr=1.0):
+        self.n_cr = n_cr
+        self._states = {}
+
+    def reset(self, arb_id=None):
+        if arb_id is None:
+            self._states.clear()
+        else:
+            self._states.pop(arb_id, None)
+
+    def last_rx(self, arb_id):
+        """arb_id로 멀티프레임 수신 중이면 마지막 FF/CF 수신 시각, 아니면 None"""
+        state = self._states.get(arb_id)
+        return state.last_rx if state else None
+
+    def feed(self, msg, now):
+        """프레임 하나를 반영하고 (이벤트, 값)을 반환한다."""
+        d = msg.data
+        if not d:
+            return EV_NONE, None
+        arb_id = msg.arbitration_id
+        pci_type = d[0] >> 4
+
+        if pci_type == PCI_FC:
+            return EV_FC, bytes(d[:3])
+
+        if pci_type == PCI_SF:
+            sf_len = d[0] & 0x0F
+            if 0 < sf_len < len(d):
+                self._states.pop(arb_id, None)
+                return EV_PDU, Pdu(arb_id, bytes(d[1:1 + sf_len]), [msg])
+            if sf_len == 0 and len(d) > FRAME_LEN and 0 < d[1] <= len(d) - 2:  # CAN FD escape SF
+                self._states.pop(arb_id, None)
+                return EV_PDU, Pdu(arb_id, bytes(d[2:2 + d[1]]), [msg])
+            return EV_NONE, None
+
+        if pci_type == PCI_FF:
+            if len(d) < 2:
+                return EV_NONE, None
+            total = ((d[0] & 0x0F) << 8) | d[1]
+            if total:
+                first_chunk = d[2:]
+            else:  # escape FF: FF_DL 32비트 (4095바이트 초과)
+                total = int.from_bytes(d[2:6], "big")
+                first_chunk = d[6:]
+            self._states[arb_id] = _RxState(total, first_chunk, msg, now)
+            return EV_FF, None
+
+        if pci_type == PCI_CF:
+            state = self._states.get(arb_id)
+            if state is None:
+                return EV_NONE, None
+            sn = d[0] & 0x0F
+            gap = now - state.last_rx
+            if gap > self.n_cr:
+                LOGGER.warning("ISO-TP abort on 0x%X: N_Cr timeout (%.3fs > %.3fs)", arb_id, gap, self.n_cr)
+                self._states.pop(arb_id, None)
+                return EV_NONE, None
+            if sn != state.next_sn:
+                LOGGER.warning("ISO-TP abort on 0x%X: expected SN=%d, got=%d", arb_id, state.next_sn, sn)
+                self._states.pop(arb_id, None)
+                return EV_NONE, None
+            state.next_sn = (state.next_sn + 1) & 0x0F
+            state.last_rx = now
+            state.frames.append(msg)
+            state.payload.extend(d[1:1 + min(len(d) - 1, state.total - len(state.payload))])
+            if len(state.payload) >= state.total:
+                self._states.pop(arb_id, None)
+                return EV_PDU, Pdu(arb_id, bytes(state.payload), state.frames)
+            return EV_CF, None
+
+        return EV_NONE, None
+
+
+class IsoTpTransport:
+    """
+    수신 스레드 기반 ISO-TP 송수신기.
+
+    subscribe(res_id)로 등록한 응답 ID에 대해서만 조립을 수행하고,
+    나머지 프레임은 버린다. FlowControl 프레임은 별도 큐로 보내
+    send_pdu()의 멀티프레임 송신 흐름에서 사용한다.
+
+    수신 측에서는 FF를 받으면 짝이 되는 요청 ID로 FC(CTS, rx_bs, rx_stmin)를
+    즉시 송신하고, rx_bs개의 CF마다 다음 블록용 FC를 다시 보낸다.
+    TC375 펌웨어는 받은 FC를 버리고(Can_RxIsrHandler의 PCI 3 무시) Can_TpSend가 FC 없이
+    1 ms 간격으로 CF를 보내므로, rx_bs/rx_stmin은 ecu_simulator 같은 ISO-TP 준수 ECU에만
+    효과가 있다. PCI 3 무시 처리가 없는 이전 펌웨어는 FC를 SF로 해석해 BS 바이트를 SID로
+    처리하므로(0x7F 부정 응답, BS=0x14면 DTC 삭제) 반드시 해당 펌웨어로 갱신해서 써야 한다.
+
+    구독 ID 목록은 bus.set_filters()로 드라이버에 내려 보낸다. SocketCAN은 커널
+    (CAN_RAW_FILTER), 하드웨어 필터를 지원하는 인터페이스는 컨트롤러에서 걸러지므로
+    다른 ECU 트래픽이 많은 버스에서도 수신 스레드에는 응답 ID 프레임만 올라온다.
+    버스 모니터처럼 전체 트래픽이 필요하면 set_pass_all(True)로 필터를 잠시 연다
+    (조립 대상은 그대로 구독 ID뿐이고, 나머지 프레임은 리스너에만 전달된다).
+
+    fd=True면 CAN FD 프레임(TX_DL 64)으로 보내고 4095바이트를 넘는 PDU는 escape FF를 쓴다.
+    brs는 FD 프레임의 데이터 구간 비트레이트 전환 여부다.
+    """
+
+    def __init__(self, bus, n_bs=1.0, n_cr=1.0, rx_bs=0, rx_stmin=0, fd=False, brs=True, n_wft_max=10):
+        self.bus = bus
+        self.n_bs = n_bs  # FF/블록 전송 후 FC 대기 시간
+        self.n_cr = n_cr  # CF 사이 최대 허용 간격
+        self.n_wft_max = n_wft_max  # 연속으로 허용하는 FC(WAIT) 수 (N_WFTmax)
+        self.fd = fd
+        self.brs = brs
+        self.tx_dl = FD_FRAME_LEN if fd else FRAME_LEN
+        self.max_pdu_len = MAX_ESCAPE_FF_DL if fd else MAX_FF_DL
+
+        self._lock = threading.Lock()
+        self._tx_lock = threading.Lock()
+        self._pdu_queues = {}
+        self._fc_queues = {}
+        self._fc_tx_ids = {}  # res_id -> FC를 보낼 요청 ID
+        self._rx_block_cnt = {}  # res_id -> 마지막 FC 이후 받은 CF 수
+        self._reassembler = IsoTpReassembler(n_cr)
+        self._listeners = ()  # 송수신 프레임 관찰자 (트레이스 기록 등)
+        self._pass_all = False  # True면 수신 필터를 열어 버스 전체 프레임을 받음
+
+        self.rx_bs = 0
+        self.rx_stmin = 0
+        self.set_rx_flow_control(rx_bs, rx_stmin)
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def open(cls, channel, bustype, bitrate, fd=False, data_bitrate=DEFAULT_DATA_BITRATE, **kwargs):
+        """can.Bus를 직접 생성해 소유하는 전송 객체를 만든다 (bustype은 can_backend.BACKENDS 이름)."""
+        bus = open_bus(bustype, channel, bitrate, fd=fd, data_bitrate=data_bitrate)
+        return cls(bus, fd=fd, **kwargs)
+
+    # ---------------- 수명 관리 ----------------
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._rx_loop, name="isotp-rx", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self.bus.shutdown()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------------- 구독 ----------------
+    def subscribe(self, res_id, req_id=None):
+        """
+        res_id로 들어오는 응답을 조립 대상으로 등록한다.
+        req_id를 주면 멀티프레임 응답 수신 시 그 ID로 FlowControl을 보낸다.
+        """
+        with self._lock:
+            if res_id not in self._pdu_queues:
+                self._pdu_queues[res_id] = queue.Queue()
+                self._fc_queues[res_id] = queue.Queue()
+                self._apply_filters()
+            if req_id is not None:
+                self._fc_tx_ids[res_id] = req_id
+            return self._pdu_queues[res_id]
+
+    def unsubscribe(self, res_id):
+        """res_id 조립을 중단하고 수신 필터에서 제외한다 (대상 ECU 변경 시)."""
+        with self._lock:
+            self._pdu_queues.pop(res_id, None)
+            self._fc_queues.pop(res_id, None)
+            self._fc_tx_ids.pop(res_id, None)
+            self._reassembler.reset(res_id)
+            self._apply_filters()
+
+    def set_pass_all(self, enabled):
+        """수신 필터를 열거나(버스 전체 수신) 구독 ID 필터로 되돌린다."""
+        with self._lock:
+            self._pass_all = bool(enabled)
+            self._apply_filters()
+
+    def _apply_filters(self):
+        """구독 중인 응답 ID만 통과시키는 수신 필터 설정 (구독이 없거나 pass-all이면 전체 수신)."""
+        filters = [] if self._pass_all else [
+            {"can_id": res_id, "can_mask": 0x7FF, "extended": False}
+            for res_id in sorted(self._pdu_queues)
+        ]
+        try:
+            self.bus.set_filters(filters or None)
+        except (can.CanError, NotImplementedError) as e:
+            LOGGER.warning("CAN filter setup failed, falling back to software filtering: %s", e)
+
+    def set_rx_flow_control(self, bs, stmin):
+        """수신 측 FC 파라미터 설정 (BS=0: 블록 제한 없음, STmin: FC 바이트 원값)."""
+        if not 0 <= bs <= 0xFF:
+            raise ValueError(f"Invalid block size: {bs}")
+        if not is_valid_stmin(stmin):
+            raise ValueError(f"Invalid STmin: 0x{stmin:02X}")
+        self.rx_bs = bs
+        self.rx_stmin = stmin
+
+    def flush(self, res_id):
+        """이전 요청의 늦은 응답이 섞이지 않도록 대기 중인 PDU/FC를 비운다."""
+        with self._lock:
+            queues = (self._pdu_queues.get(res_id), self._fc_queues.get(res_id))
+            self._reassembler.reset(res_id)
+        for q in queues:
+            while q is not None:
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    break
+
+    def add_listener(self, callback):
+        """
+        송수신하는 모든 프레임을 callback(msg)으로 전달한다 (TX는 msg.is_rx=False).
+        수신 스레드와 송신 스레드에서 호출되므로 callback은 스레드 안전해야 한다.
+        """
+        with self._lock:
+            self._listeners = self._listeners + (callback,)
+
+    def remove_listener(self, callback):
+        with self._lock:
+            self._listeners = tuple(cb for cb in self._listeners if cb is not callback)
+
+    def _notify(self, msg):
+        for callback in self._listeners:
+            try:
+                callback(msg)
+            except Exception:
+                LOGGER.exception("Frame listener failed")
+
+    # ---------------- 송신 ----------------
+    def _make_frame(self, arb_id, data):
+        """패딩한 송신 프레임 (클래식 8바이트, FD는 padded_len 길이 + BRS 설정)"""
+        return can.Message(
+            arbitration_id=arb_id, data=bytes(data).ljust(padded_len(len(data), self.fd), bytes([PAD_BYTE])),
+            is_extended_id=False, is_rx=False, is_fd=self.fd, bitrate_switch=self.fd and self.brs,
+        )
+
+    def send_frame(self, arb_id, data):
+        """패딩한 단일 CAN(FD) 프레임을 전송하고 전송한 can.Message를 돌려준다."""
+        msg = self._make_frame(arb_id, data)
+        with self._tx_lock:
+            msg.timestamp = time.time()
+            self.bus.send(msg)
+        self._notify(msg)
+        return msg
+
+    def send_pdu(self, req_id, res_id, payload):
+        """
+        UDS 페이로드를 SF 또는 FF+CF로 전송한다.
+        멀티프레임이면 res_id로 오는 FC(0x30)를 기다리며, 전송한 프레임 목록을 반환한다.
+        """
+        payload = bytes(payload)
+        total_len = len(payload)
+        self.subscribe(res_id, req_id)
+
+        if total_len <= FRAME_LEN - 1:
+            return [self.send_frame(req_id, bytes([total_len]) + payload)]
+        if total_len <= self.tx_dl - 2:  # CAN FD escape SF
+            return [self.send_frame(req_id, bytes([0x00, total_len]) + payload)]
+
+        if total_len > self.max_pdu_len:
+            raise IsoTpError(f"PDU too long for {'CAN FD' if self.fd else 'classic'} ISO-TP ({total_len} bytes)")
+
+        if total_len <= MAX_FF_DL:
+            ff_pci = bytes([0x10 | (total_len >> 8), total_len & 0xFF])
+        else:
+            ff_pci = bytes([0x10, 0x00]) + total_len.to_bytes(4, "big")
+        first = self.tx_dl - len(ff_pci)
+        sent_frames = [self.send_frame(req_id, ff_pci + payload[:first])]
+        bs, gap_ns = self._wait_flow_control(res_id, "FlowControl(0x30) 미수신")
+
+        # CF는 미리 만들어 두고 블록 단위로 송신 (STmin=0이면 블록 전체를 한 번에)
+        cf_len = self.tx_dl - 1
+        cfs = [
+            bytes([0x20 | (sn & 0x0F)]) + payload[off:off + cf_len]
+            for sn, off in enumerate(range(first, total_len, cf_len), 1)
+        ]
+        idx = 0
+        while True:
+            block = cfs[idx:idx + bs] if bs else cfs[idx:]
+            if gap_ns:
+                sent_frames.extend(self._send_paced(req_id, block, gap_ns))
+            else:
+                sent_frames.extend(self._send_burst(req_id, block))
+            idx += len(block)
+            if idx >= len(cfs):
+                break
+            bs, gap_ns = self._wait_flow_control(res_id, "다음 블록 FC 미수신")
+
+        return sent_frames
+
+    def _send_burst(self, arb_id, frames):
+        """프레임 여러 개를 송신 락 한 번으로 연달아 보낸다 (STmin=0)."""
+        msgs = [self._make_frame(arb_id, f) for f in frames]
+        with self._tx_lock:
+            for msg in msgs:
+                msg.timestamp = time.time()
+                self.bus.send(msg)
+        for msg in msgs:
+            self._notify(msg)
+        return msgs
+
+    def _send_paced(self, arb_id, frames, gap_ns):
+        """직전 프레임 송신 시각 + STmin에 맞춰 프레임을 하나씩 보낸다 (sleep/spin 혼합 대기)."""
+        msgs = []
+        next_tx = 0
+        for frame in frames:
+            wait_until_ns(next_tx)
+            sent_at = time.perf_counter_ns()
+            msgs.append(self.send_frame(arb_id, frame))
+            next_tx = sent_at + gap_ns
+        return msgs
+
+    def _wait_flow_control(self, res_id, timeout_msg):
+        """
+        CTS가 올 때까지 FC를 기다린다 (WAIT는 N_Bs로 재대기, n_wft_max번을 넘으면 중단).
+        (BS, STmin ns)를 반환.
+        """
+        fc_queue = self._fc_queues[res_id]
+        waits = 0
+        while True:
+            try:
+                fc = fc_queue.get(timeout=self.n_bs)
+            except queue.Empty:
+                raise IsoTpError(timeout_msg) from None
+            fs = fc[0] & 0x0F
+            if fs == FS_WAIT:
+                waits += 1
+                if waits > self.n_wft_max:
+                    raise IsoTpError(f"FC WAIT received {waits} times (N_WFTmax={self.n_wft_max})")
+                continue
+            if fs != FS_CTS:
+                raise IsoTpError(f"FC FS!=CTS (FS=0x{fs:02X})")
+            return fc[1], stmin_to_ns(fc[2])
+
+    # ---------------- 수신 ----------------
+    def rx_time_left(self, res_id):
+        """res_id 멀티프레임 응답을 받는 중이면 N_Cr 만료까지 남은 시간(초), 아니면 0"""
+        with self._lock:
+            last = self._reassembler.last_rx(res_id)
+        return max(0.0, last + self.n_cr - time.monotonic()) if last is not None else 0.0
+
+    def recv_pdu(self, res_id, timeout=3.0):
+        """res_id로 완성된 PDU를 최대 timeout초 기다린다. 시간 초과 시 None."""
+        pdu_queue = self.subscribe(res_id)
+        try:
+            return pdu_queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _rx_loop(self):
+        while not self._stop.is_set():
+            try:
+                msg = self.bus.recv(timeout=0.1)
+            except can.CanError as e:
+                LOGGER.warning("CAN recv failed: %s", e)
+                continue
+            if msg is not None:
+                self._notify(msg)
+                self._on_frame(msg)
+
+    def _on_frame(self, msg):
+        arb_id = msg.arbitration_id
+        with self._lock:
+            pdu_queue = self._pdu_queues.get(arb_id)
+            fc_queue = self._fc_queues.get(arb_id)
+            fc_tx_id = self._fc_tx_ids.get(arb_id)
+        if pdu_queue is None:
+            return
+
+        with self._lock:
+            event, value = self._reassembler.feed(msg, time.monotonic())
+        if event == EV_PDU:
+            pdu_queue.put(value)
+        elif event == EV_FC:
+            fc_queue.put(value)
+        elif event == EV_FF:
+            self._rx_block_cnt[arb_id] = 0
+            self._send_flow_control(fc_tx_id)
+        elif event == EV_CF and self.rx_bs:
+            cnt = self._rx_block_cnt.get(arb_id, 0) + 1
+            if cnt >= self.rx_bs:
+                cnt = 0
+                self._send_flow_control(fc_tx_id)
+            self._rx_block_cnt[arb_id] = cnt
+
+    def _send_flow_control(self, tx_id):
+        """FC(CTS) 송신. 요청 ID를 모르는 응답(구독만 한 ID)에는 보내지 않는다."""
+        if tx_id is None:
+            return
+        try:
+            self.send_frame(tx_id, bytes([0x30 | FS_CTS, self.rx_bs, self.rx_stmin]))
+        except can.CanError as e:
+            LOGGER.warning("FlowControl send failed on 0x%X: %s", tx_id, e)
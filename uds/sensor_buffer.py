@@ -0,0 +1,59 @@
+"""
+센서 라이브 폴링용 고정 크기 링버퍼.
+
+DID마다 (값, 판정 문자, 타임스탬프)를 미리 할당한 NumPy 배열에 순환 기록한다.
+몇 분 이상 폴링해도 메모리 사용량이 늘지 않고, 플롯은 배열 뷰를 그대로 읽는다.
+"""
+import numpy as np
+
+
+class SensorRingBuffer:
+    """DID별 고정 크기 링버퍼 (값, 판정 문자, 타임스탬프)."""
+
+    def __init__(self, dids, capacity=6000):
+        self.dids = tuple(dids)
+        self.capacity = capacity
+        self._row = {did: i for i, did in enumerate(self.dids)}
+
+        shape = (len(self.dids), capacity)
+        self.values = np.zeros(shape, dtype=np.uint16)
+        self.status = np.zeros(shape, dtype=np.uint8)
+        self.timestamps = np.zeros(shape, dtype=np.float64)
+        self._head = np.zeros(len(self.dids), dtype=np.int64)  # 다음 기록 위치
+        self._count = np.zeros(len(self.dids), dtype=np.int64)
+
+    def append(self, did, value, status_char, timestamp):
+        row = self._row[did]
+        idx = self._head[row]
+        self.values[row, idx] = value
+        self.status[row, idx] = ord(status_char)
+        self.timestamps[row, idx] = timestamp
+        self._head[row] = (idx + 1) % self.capacity
+        if self._count[row] < self.capacity:
+            self._count[row] += 1
+
+    def count(self, did):
+        return int(self._count[self._row[did]])
+
+    def latest(self, did):
+        """가장 최근 샘플 (값, 판정 문자, 타임스탬프). 샘플이 없으면 None."""
+        row = self._row[did]
+        if not self._count[row]:
+            return None
+        idx = (self._head[row] - 1) % self.capacity
+        return int(self.values[row, idx]), chr(self.status[row, idx]), float(self.timestamps[row, idx])
+
+    def view(self, did):
+        """시간순으로 정렬된 (timestamps, values, status) 배열을 반환한다."""
+        row = self._row[did]
+        n = int(self._count[row])
+        head = int(self._head[row])
+        if n < self.capacity:
+            sl = slice(0, n)
+            return self.timestamps[row, sl], self.values[row, sl], self.status[row, sl]
+        order = np.r_[head:self.capacity, 0:head]
+        return self.timestamps[row, order], self.values[row, order], self.status[row, order]
+
+    def clear(self):
+        self._head[:] = 0
+        self._count[:] = 0
@@ -0,0 +1,43 @@
+"""
+uds/ 테스트 공용 fixture.
+
+모듈들이 uds/ 안에서 서로를 평범한 import로 참조하므로 uds/를 sys.path에 넣는다.
+버스는 python-can virtual 인터페이스를 쓰고, 테스트마다 채널 이름을 달리해 서로 간섭하지 않게 한다.
+"""
+import itertools
+import os
+import sys
+
+import can
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ecu_simulator import VirtualEcu  # noqa: E402
+from isotp_transport import IsoTpTransport  # noqa: E402
+from uds_client import UdsClient  # noqa: E402
+
+_channels = itertools.count()
+
+
+@pytest.fixture
+def channel():
+    """테스트 전용 virtual 버스 채널 이름"""
+    return f"pytest-{os.getpid()}-{next(_channels)}"
+
+
+@pytest.fixture
+def tester_tp(channel):
+    with IsoTpTransport(can.Bus(interface="virtual", channel=channel)) as tp:
+        yield tp
+
+
+@pytest.fixture
+def ecu(channel):
+    with VirtualEcu.open(channel) as sim:
+        yield sim
+
+
+@pytest.fixture
+def client(tester_tp, ecu):
+    return UdsClient(tester_tp, timeout=1.0)
@@ -0,0 +1,51 @@
+"""BusLoadMonitor 기록 / 구간 통계."""
+import threading
+
+import can
+
+from bus_monitor import BusLoadMonitor, frame_bits
+
+
+def frame(arb_id, ts, dlc=8):
+    return can.Message(arbitration_id=arb_id, data=bytes(dlc), is_extended_id=False, timestamp=ts)
+
+
+def test_stats_per_id():
+    mon = BusLoadMonitor(capacity=64)
+    for i in range(10):
+        mon(frame(0x100, 100.0 + i * 0.1))
+    mon(frame(0x200, 100.95, dlc=2))
+
+    stats = mon.stats(seconds=1.0, now=101.0)
+    assert stats["frames"] == 11
+    rows = {int(r["id"]): r for r in stats["ids"]}
+    assert rows[0x100]["count"] == 10
+    assert abs(rows[0x100]["period_ms"] - 100.0) < 1e-6
+    assert rows[0x200]["dlc"] == 2
+    bits = 10 * int(frame_bits(8, False)) + int(frame_bits(2, False))
+    assert abs(stats["utilization"] - bits / mon.bitrate * 100) < 1e-9
+
+
+def test_window_after_wrap_is_time_ordered():
+    mon = BusLoadMonitor(capacity=8)
+    for i in range(20):
+        mon(frame(0x100, float(i)))
+    ts = mon.window(5.0, now=19.0)[0]
+    assert ts.tolist() == [14.0, 15.0, 16.0, 17.0, 18.0, 19.0]
+
+
+def test_concurrent_writers_do_not_lose_frames():
+    mon = BusLoadMonitor(capacity=1 << 16)
+    n_threads, per_thread = 4, 5000
+    msg = frame(0x7E0, 1.0)
+
+    def writer():
+        for _ in range(per_thread):
+            mon(msg)
+
+    threads = [threading.Thread(target=writer) for _ in range(n_threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert mon.total == n_threads * per_thread
@@ -0,0 +1,68 @@
+"""DtcStateCache 비교 / 이력."""
+from dtc_state import NO_CHANGE, DtcEvent, DtcStateCache
+
+A, B, C = 0x010100, 0x010111, 0x010201
+
+
+def codes(entries):
+    return sorted(e.code for e in entries)
+
+
+def test_first_report_adds_everything():
+    cache = DtcStateCache()
+    diff = cache.update([(A, 0x09), (B, 0x08)], now=1.0)
+    assert codes(diff.added) == [A, B]
+    assert diff.changed == [] and diff.removed == []
+    assert list(cache.history) == [DtcEvent(1.0, A, None, 0x09), DtcEvent(1.0, B, None, 0x08)]
+
+
+def test_identical_report_is_no_change_but_refreshes_last_seen():
+    cache = DtcStateCache()
+    cache.update([(A, 0x09)], now=1.0)
+    assert cache.update([(A, 0x09)], now=2.0) is NO_CHANGE
+    assert cache.entries[A].last_seen == 2.0
+    assert cache.entries[A].first_seen == 1.0
+    assert len(cache.history) == 1
+
+
+def test_status_change_and_removal():
+    cache = DtcStateCache()
+    cache.update([(A, 0x09), (B, 0x08)], now=1.0)
+    diff = cache.update([(A, 0x08), (C, 0x01)], now=2.0)
+
+    assert codes(diff.added) == [C]
+    assert [(e.code, old) for e, old in diff.changed] == [(A, 0x09)]
+    assert codes(diff.removed) == [B]
+    assert cache.entries[A].status == 0x08
+    assert codes(cache.active()) == [A, C]
+    assert DtcEvent(2.0, B, 0x08, None) in cache.history
+
+
+def test_reappearing_dtc_keeps_first_seen():
+    cache = DtcStateCache()
+    cache.update([(A, 0x09)], now=1.0)
+    cache.update([], now=2.0)
+    diff = cache.update([(A, 0x08)], now=3.0)
+
+    assert codes(diff.added) == [A]
+    entry = cache.entries[A]
+    assert (entry.first_seen, entry.last_seen, entry.status, entry.active) == (1.0, 3.0, 0x08, True)
+
+
+def test_clear_deactivates_and_next_empty_report_is_no_change():
+    cache = DtcStateCache()
+    cache.update([(A, 0x09), (B, 0x08)], now=1.0)
+    diff = cache.clear(now=2.0)
+
+    assert codes(diff.removed) == [A, B]
+    assert cache.active() == []
+    assert cache.update([], now=3.0) is NO_CHANGE
+    assert codes(cache.update([(B, 0x08)], now=4.0).added) == [B]
+
+
+def test_history_is_bounded():
+    cache = DtcStateCache(history_size=3)
+    for i in range(5):
+        cache.update([(A, i)], now=float(i))
+    assert len(cache.history) == 3
+    assert cache.history[-1] == DtcEvent(4.0, A, 3, 4)
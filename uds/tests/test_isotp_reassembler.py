@@ -0,0 +1,130 @@
+"""IsoTpReassembler 단위 테스트 (프레임을 직접 넣고 시각은 인자로 준다)."""
+import logging
+
+import can
+
+from isotp_transport import EV_CF, EV_FC, EV_FF, EV_NONE, EV_PDU, IsoTpReassembler
+
+RES_ID = 0x7E8
+
+
+def frame(data, arb_id=RES_ID):
+    return can.Message(arbitration_id=arb_id, data=bytes(data), is_extended_id=False)
+
+
+def split_classic(payload):
+    """payload를 클래식 FF + CF 데이터로 나눈다 (SN은 1부터 0x0F 다음 0으로 순환)."""
+    frames = [bytes([0x10 | (len(payload) >> 8), len(payload) & 0xFF]) + payload[:6]]
+    for sn, off in enumerate(range(6, len(payload), 7), 1):
+        frames.append(bytes([0x20 | (sn & 0x0F)]) + payload[off:off + 7])
+    return frames
+
+
+def feed_all(asm, frames, now=0.0, step=0.001):
+    events = []
+    for i, data in enumerate(frames):
+        events.append(asm.feed(frame(data), now + i * step))
+    return events
+
+
+def test_single_frame():
+    asm = IsoTpReassembler()
+    event, pdu = asm.feed(frame(b"\x03\x62\x00\x01\x00\x00\x00\x00"), 0.0)
+    assert event == EV_PDU
+    assert pdu.data == b"\x62\x00\x01"
+    assert pdu.arbitration_id == RES_ID
+
+
+def test_sequence_number_wraps_after_0xf():
+    payload = bytes(i & 0xFF for i in range(200))  # FF + CF 28개 → SN 1..F, 0..C
+    frames = split_classic(payload)
+    assert [f[0] & 0x0F for f in frames[15:18]] == [0xF, 0x0, 0x1]
+
+    events = feed_all(IsoTpReassembler(), frames)
+    assert events[0] == (EV_FF, None)
+    assert all(e == (EV_CF, None) for e in events[1:-1])
+    event, pdu = events[-1]
+    assert event == EV_PDU
+    assert pdu.data == payload
+    assert len(pdu.frames) == len(frames)
+
+
+def test_sequence_mismatch_aborts(caplog):
+    asm = IsoTpReassembler()
+    frames = split_classic(bytes(30))
+    asm.feed(frame(frames[0]), 0.0)
+    asm.feed(frame(frames[1]), 0.001)
+    with caplog.at_level(logging.WARNING, logger="isotp_transport"):
+        assert asm.feed(frame(frames[3]), 0.002) == (EV_NONE, None)  # SN 3, 기대값 2
+    assert "expected SN=2, got=3" in caplog.text
+    assert asm.last_rx(RES_ID) is None
+    # 중단 뒤 남은 CF는 버려진다
+    assert asm.feed(frame(frames[2]), 0.003) == (EV_NONE, None)
+
+
+def test_n_cr_timeout_aborts_even_with_correct_sn(caplog):
+    asm = IsoTpReassembler(n_cr=0.5)
+    frames = split_classic(bytes(30))
+    asm.feed(frame(frames[0]), 10.0)
+    assert asm.feed(frame(frames[1]), 10.4) == (EV_CF, None)
+    assert asm.last_rx(RES_ID) == 10.4
+    with caplog.at_level(logging.WARNING, logger="isotp_transport"):
+        assert asm.feed(frame(frames[2]), 11.0) == (EV_NONE, None)
+    assert "N_Cr timeout" in caplog.text
+    assert "expected SN" not in caplog.text
+    assert asm.last_rx(RES_ID) is None
+
+
+def test_new_first_frame_restarts_reception():
+    asm = IsoTpReassembler()
+    first = split_classic(bytes(30))
+    second = split_classic(b"\xAA" * 20)
+    asm.feed(frame(first[0]), 0.0)
+    asm.feed(frame(first[1]), 0.001)
+    events = feed_all(asm, second, now=0.002)
+    assert events[-1][0] == EV_PDU
+    assert events[-1][1].data == b"\xAA" * 20
+
+
+def test_ids_are_reassembled_independently():
+    asm = IsoTpReassembler()
+    a = split_classic(b"\x01" * 10)
+    b = split_classic(b"\x02" * 10)
+    asm.feed(frame(a[0], 0x7E8), 0.0)
+    asm.feed(frame(b[0], 0x7E9), 0.0)
+    event_b, pdu_b = asm.feed(frame(b[1], 0x7E9), 0.001)
+    event_a, pdu_a = asm.feed(frame(a[1], 0x7E8), 0.001)
+    assert (event_a, pdu_a.data) == (EV_PDU, b"\x01" * 10)
+    assert (event_b, pdu_b.data) == (EV_PDU, b"\x02" * 10)
+
+
+def test_escape_first_frame():
+    total = 5000
+    payload = bytes(i & 0xFF for i in range(total))
+    ff = b"\x10\x00" + total.to_bytes(4, "big") + payload[:58]  # FD TX_DL 64
+    frames = [ff]
+    sn = 1
+    for off in range(58, total, 63):
+        frames.append(bytes([0x20 | (sn & 0x0F)]) + payload[off:off + 63])
+        sn += 1
+
+    events = feed_all(IsoTpReassembler(), frames)
+    assert events[0] == (EV_FF, None)
+    event, pdu = events[-1]
+    assert event == EV_PDU
+    assert pdu.data == payload
+
+
+def test_escape_single_frame():
+    data = b"\x00\x0A" + bytes(range(10)) + bytes(4)  # FD 16바이트 프레임
+    event, pdu = IsoTpReassembler().feed(frame(data), 0.0)
+    assert event == EV_PDU
+    assert pdu.data == bytes(range(10))
+
+
+def test_flow_control_is_passed_through():
+    assert IsoTpReassembler().feed(frame(b"\x30\x08\x14"), 0.0) == (EV_FC, b"\x30\x08\x14")
+
+
+def test_orphan_consecutive_frame_is_ignored():
+    assert IsoTpReassembler().feed(frame(b"\x21\x01\x02"), 0.0) == (EV_NONE, None)
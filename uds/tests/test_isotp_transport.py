@@ -0,0 +1,147 @@
+"""IsoTpTransport 송수신 (virtual 버스 위 테스터/상대 노드 두 개)."""
+import threading
+import time
+
+import can
+import pytest
+
+from isotp_transport import PCI_FC, IsoTpError, IsoTpTransport, stmin_to_ns
+
+REQ_ID, RES_ID = 0x7E0, 0x7E8
+
+
+@pytest.fixture
+def peer_tp(channel):
+    """요청 ID를 조립하고 응답 ID로 FC를 보내는 상대 노드 (ECU 방향)"""
+    with IsoTpTransport(can.Bus(interface="virtual", channel=channel)) as tp:
+        tp.subscribe(REQ_ID, RES_ID)
+        yield tp
+
+
+def _wait_for(predicate, timeout=1.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.005)
+
+
+def _fc_frames(frames):
+    return [f for f in frames if f.data[0] >> 4 == PCI_FC]
+
+
+def test_single_frame_round_trip(tester_tp, peer_tp):
+    sent = tester_tp.send_pdu(REQ_ID, RES_ID, b"\x22\x00\x01")
+    assert len(sent) == 1
+    assert bytes(sent[0].data) == b"\x03\x22\x00\x01\x00\x00\x00\x00"
+
+    pdu = peer_tp.recv_pdu(REQ_ID, timeout=1.0)
+    assert pdu.data == b"\x22\x00\x01"
+    assert len(pdu.frames) == 1
+
+
+@pytest.mark.parametrize("size", [8, 100, 4095])
+def test_multi_frame_pdu_is_reassembled(tester_tp, peer_tp, size):
+    payload = bytes(i & 0xFF for i in range(size))
+    sent = tester_tp.send_pdu(REQ_ID, RES_ID, payload)
+
+    pdu = peer_tp.recv_pdu(REQ_ID, timeout=2.0)
+    assert pdu.data == payload
+    assert len(pdu.frames) == len(sent) == 1 + -(-(size - 6) // 7)
+
+
+def test_receiver_sends_flow_control_per_block(tester_tp, peer_tp):
+    received = []
+    tester_tp.add_listener(lambda msg: msg.is_rx and received.append(msg))
+    peer_tp.set_rx_flow_control(2, 0)
+
+    tester_tp.send_pdu(REQ_ID, RES_ID, bytes(100))  # FF + CF 14개
+    assert peer_tp.recv_pdu(REQ_ID, timeout=1.0).data == bytes(100)
+
+    fcs = _fc_frames(received)
+    # FF 뒤 1회 + 마지막 블록을 뺀 2개 CF 블록마다 1회
+    assert len(fcs) == 7
+    assert all(bytes(fc.data[:3]) == b"\x30\x02\x00" for fc in fcs)
+
+
+def test_missing_flow_control_raises(channel):
+    with IsoTpTransport(can.Bus(interface="virtual", channel=channel), n_bs=0.1) as tp:
+        with pytest.raises(IsoTpError):
+            tp.send_pdu(REQ_ID, RES_ID, bytes(20))
+
+
+def test_responses_are_queued_per_id(tester_tp, peer_tp):
+    tester_tp.subscribe(RES_ID, REQ_ID)
+    tester_tp.subscribe(0x7E9, 0x7E1)
+    peer_tp.send_pdu(0x7E9, 0x7E1, b"\x62\x00\x02")
+    peer_tp.send_pdu(RES_ID, REQ_ID, b"\x62\x00\x01")
+
+    assert tester_tp.recv_pdu(RES_ID, timeout=1.0).data == b"\x62\x00\x01"
+    assert tester_tp.recv_pdu(0x7E9, timeout=1.0).data == b"\x62\x00\x02"
+    assert tester_tp.recv_pdu(RES_ID, timeout=0.05) is None
+
+
+def test_flush_drops_stale_responses(tester_tp, peer_tp):
+    pdu_queue = tester_tp.subscribe(RES_ID, REQ_ID)
+    peer_tp.send_pdu(RES_ID, REQ_ID, b"\x7F\x22\x11")
+    peer_tp.send_pdu(RES_ID, REQ_ID, b"\x7F\x22\x11")
+    _wait_for(lambda: pdu_queue.qsize() == 2)
+
+    tester_tp.flush(RES_ID)
+    assert tester_tp.recv_pdu(RES_ID, timeout=0.05) is None
+
+
+def test_can_fd_escape_first_frame(channel):
+    with IsoTpTransport(can.Bus(interface="virtual", channel=channel, fd=True), fd=True) as tester, \
+            IsoTpTransport(can.Bus(interface="virtual", channel=channel, fd=True), fd=True) as peer:
+        peer.subscribe(REQ_ID, RES_ID)
+        payload = bytes(i & 0xFF for i in range(5000))  # 4095바이트 초과 → escape FF
+        sent = tester.send_pdu(REQ_ID, RES_ID, payload)
+
+        assert bytes(sent[0].data[:6]) == b"\x10\x00" + (5000).to_bytes(4, "big")
+        assert all(len(msg.data) <= 64 and msg.is_fd for msg in sent)
+        assert peer.recv_pdu(REQ_ID, timeout=2.0).data == payload
+
+
+@pytest.mark.parametrize("stmin, ns", [
+    (0x00, 0), (0x14, 20_000_000), (0x7F, 127_000_000),
+    (0xF1, 100_000), (0xF9, 900_000),
+    (0x80, 127_000_000), (0xF0, 127_000_000), (0xFA, 127_000_000), (0xFF, 127_000_000),  # 예약값
+])
+def test_stmin_to_ns(stmin, ns):
+    assert stmin_to_ns(stmin) == ns
+
+
+def _answer_first_frame(channel, fc_frames):
+    """tester의 FF를 받으면 fc_frames를 차례로 응답 ID로 보내는 스레드 (원시 버스)"""
+    bus = can.Bus(interface="virtual", channel=channel)
+
+    def run():
+        deadline = time.monotonic() + 2.0
+        while time.monotonic() < deadline:
+            msg = bus.recv(timeout=0.05)
+            if msg is not None and msg.arbitration_id == REQ_ID and msg.data[0] >> 4 == 0x1:
+                for data in fc_frames:
+                    bus.send(can.Message(arbitration_id=RES_ID, data=data, is_extended_id=False))
+                    time.sleep(0.01)
+                return
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return bus, thread
+
+
+@pytest.mark.parametrize("waits, ok", [(2, True), (3, False)])
+def test_flow_control_wait_limit(channel, waits, ok):
+    fcs = [b"\x31\x00\x00"] * waits + [b"\x30\x00\x00"]
+    with IsoTpTransport(can.Bus(interface="virtual", channel=channel), n_bs=0.5, n_wft_max=2) as tp:
+        tp.subscribe(RES_ID, REQ_ID)
+        bus, thread = _answer_first_frame(channel, fcs)
+        try:
+            if ok:
+                assert len(tp.send_pdu(REQ_ID, RES_ID, bytes(20))) == 3
+            else:
+                with pytest.raises(IsoTpError, match="N_WFTmax=2"):
+                    tp.send_pdu(REQ_ID, RES_ID, bytes(20))
+        finally:
+            thread.join()
+            bus.shutdown()
@@ -0,0 +1,53 @@
+"""SensorRingBuffer 순환 기록."""
+import numpy as np
+
+from sensor_buffer import SensorRingBuffer
+
+DIDS = (0x0001, 0x0004)
+
+
+def test_empty_buffer():
+    buf = SensorRingBuffer(DIDS, capacity=4)
+    assert buf.count(0x0001) == 0
+    assert buf.latest(0x0001) is None
+    ts, values, status = buf.view(0x0001)
+    assert len(ts) == len(values) == len(status) == 0
+
+
+def test_partial_fill_keeps_insertion_order():
+    buf = SensorRingBuffer(DIDS, capacity=4)
+    buf.append(0x0001, 100, "P", 1.0)
+    buf.append(0x0001, 200, "F", 2.0)
+
+    ts, values, status = buf.view(0x0001)
+    assert ts.tolist() == [1.0, 2.0]
+    assert values.tolist() == [100, 200]
+    assert bytes(status).decode() == "PF"
+    assert buf.latest(0x0001) == (200, "F", 2.0)
+
+
+def test_wrap_around_returns_last_capacity_samples_in_time_order():
+    buf = SensorRingBuffer(DIDS, capacity=4)
+    for i in range(10):
+        buf.append(0x0001, i * 10, "P" if i % 2 else "F", float(i))
+
+    assert buf.count(0x0001) == 4
+    ts, values, _ = buf.view(0x0001)
+    assert ts.tolist() == [6.0, 7.0, 8.0, 9.0]
+    assert values.tolist() == [60, 70, 80, 90]
+    assert np.all(np.diff(ts) > 0)
+    assert buf.latest(0x0001) == (90, "P", 9.0)
+
+
+def test_dids_are_independent_and_clear_resets_all():
+    buf = SensorRingBuffer(DIDS, capacity=4)
+    buf.append(0x0001, 1, "P", 1.0)
+    buf.append(0x0004, 2, "F", 1.5)
+    buf.append(0x0004, 3, "F", 2.5)
+    assert (buf.count(0x0001), buf.count(0x0004)) == (1, 2)
+    assert buf.latest(0x0004) == (3, "F", 2.5)
+
+    buf.clear()
+    assert buf.count(0x0004) == 0 and buf.latest(0x0004) is None
+    buf.append(0x0004, 7, "P", 3.0)
+    assert buf.view(0x0004)[1].tolist() == [7]
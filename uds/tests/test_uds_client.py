@@ -0,0 +1,77 @@
+"""UdsClient 종단 간 동작 (virtual 버스 위 VirtualEcu 상대)."""
+import pytest
+
+from ecu_simulator import DEFAULT_ECU_INFO, DEFAULT_SENSOR_VALUES, VirtualEcu
+from uds_client import (
+    DID_ECU_INFO,
+    DID_SENSOR_CONFIG,
+    SENSOR_DIDS,
+    UdsClient,
+    UdsError,
+    UdsNegativeResponse,
+    decode_ecu_info,
+    decode_sensor,
+    encode_ecu_info,
+    encode_sensor_config,
+)
+
+
+def test_read_sensor_did(client):
+    assert decode_sensor(client.read_did(0x0001)) == (DEFAULT_SENSOR_VALUES[0x0001], "P")
+
+
+def test_read_multi_frame_ecu_info(client):
+    assert decode_ecu_info(client.read_did(DID_ECU_INFO)) == DEFAULT_ECU_INFO
+
+
+def test_read_dids_falls_back_to_pipelined_requests(client, ecu):
+    values = client.read_dids(SENSOR_DIDS)
+    assert list(values) == list(SENSOR_DIDS)
+    assert {did: decode_sensor(data)[0] for did, data in values.items()} == DEFAULT_SENSOR_VALUES
+    assert ecu.request_count == 1 + len(SENSOR_DIDS)  # 다중 DID 요청 1회 + 개별 요청
+
+
+def test_read_dids_uses_single_request_when_supported(channel, tester_tp):
+    with VirtualEcu.open(channel, multi_did=True) as sim:
+        values = UdsClient(tester_tp, timeout=1.0).read_dids(SENSOR_DIDS)
+        assert sim.request_count == 1
+    assert decode_sensor(values[0x0004]) == (DEFAULT_SENSOR_VALUES[0x0004], "P")
+
+
+def test_write_did_round_trip(client):
+    info = dict(DEFAULT_ECU_INFO, vin="KMHTEST0000000042")
+    client.write_did(DID_ECU_INFO, encode_ecu_info(info))
+    client.write_did(DID_SENSOR_CONFIG, encode_sensor_config(10, 500, 20, 3000))
+
+    assert decode_ecu_info(client.read_did(DID_ECU_INFO))["vin"] == "KMHTEST0000000042"
+    assert client.read_did(DID_SENSOR_CONFIG) == encode_sensor_config(10, 500, 20, 3000)
+
+
+def test_read_and_clear_dtc(client, ecu):
+    assert client.read_dtc() == []
+    ecu.set_sensor(0x0002, 9999)  # 초음파 상한 400 mm 초과 → Range Error
+    assert decode_sensor(client.read_did(0x0002))[1] == "F"
+    assert client.read_dtc() == [(0x010111, 0x01)]
+
+    client.clear_dtc()
+    assert client.read_dtc() == []
+
+
+def test_negative_response_raises(client, ecu):
+    ecu.set_sensor(0x0003, None)  # 센서 타임아웃 → NRC 0x11
+    with pytest.raises(UdsNegativeResponse) as info:
+        client.read_did(0x0003)
+    assert (info.value.sid, info.value.nrc) == (0x22, 0x11)
+
+
+def test_no_response_raises_uds_error(tester_tp):
+    client = UdsClient(tester_tp, timeout=0.1)
+    with pytest.raises(UdsError, match="No response"):
+        client.request(b"\x3E\x00")
+
+
+def test_response_pending_extends_wait(channel, tester_tp):
+    with VirtualEcu.open(channel, pending={0x14: 0.3}):
+        client = UdsClient(tester_tp, timeout=0.1)
+        client.clear_dtc()  # P2(0.1 s)보다 오래 걸리지만 NRC 0x78 뒤에는 P2*로 기다린다
+        assert client.pending_count == 1
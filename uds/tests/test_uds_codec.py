@@ -0,0 +1,83 @@
+"""DID 레이아웃 코덱과 DTC 레코드 파서."""
+import struct
+
+import pytest
+
+from uds_codec import (
+    DID_CODECS,
+    DID_ECU_INFO,
+    DID_SENSOR_CONFIG,
+    DidCodec,
+    DidLayout,
+    decode_did_records,
+    iter_dtc_records,
+    split_did_records,
+)
+
+ECU_INFO = {"vin": "KMHXX00XXXX000001", "hw": "HW-1.0", "sw": "SW-2.3", "sn": "SN0001", "supplier": "ACME"}
+
+
+def test_layout_sizes_match_firmware_structs():
+    assert DID_CODECS[DID_ECU_INFO].size == 100
+    assert DID_CODECS[DID_SENSOR_CONFIG].size == 8
+    assert all(DID_CODECS[did].size == 3 for did in (0x0001, 0x0002, 0x0003, 0x0004))
+
+
+def test_ecu_info_round_trip():
+    codec = DID_CODECS[DID_ECU_INFO]
+    raw = codec.encode(ECU_INFO)
+    assert len(raw) == 100
+    assert raw[18:20] == b"\x00\x00"  # VIN 뒤 패딩
+    assert codec.decode(raw) == ECU_INFO
+
+
+def test_ecu_info_encode_truncates_and_fills_missing_fields():
+    codec = DID_CODECS[DID_ECU_INFO]
+    decoded = codec.decode(codec.encode({"vin": "X" * 30}))
+    assert decoded["vin"] == "X" * 18
+    assert decoded["hw"] == decoded["supplier"] == ""
+
+
+def test_sensor_config_is_little_endian():
+    codec = DID_CODECS[DID_SENSOR_CONFIG]
+    raw = codec.encode({"ultra_min": 20, "ultra_max": 4000, "tof_min": 30, "tof_max": 1200})
+    assert raw == struct.pack("<4H", 20, 4000, 30, 1200)
+    assert codec.decode(raw)["ultra_max"] == 4000
+
+
+def test_sensor_decode_at_offset():
+    data = b"\xAA\xBB" + b"\x01\x2C" + b"P"
+    assert DID_CODECS[0x0001].decode(data, 2) == {"distance_mm": 300, "result": "P"}
+    assert DID_CODECS[0x0001].decode(b"\x00\x00\x01")["result"] == "?"
+
+
+def test_layout_field_count_is_checked():
+    with pytest.raises(ValueError):
+        DidCodec(DidLayout(0x1234, "Bad", ">HH", ("only_one",)))
+
+
+def test_split_and_decode_multiple_records():
+    config = DID_CODECS[DID_SENSOR_CONFIG].encode({"ultra_min": 1, "ultra_max": 2, "tof_min": 3, "tof_max": 4})
+    data = b"\x00\x01\x00\x64F" + b"\x00\x06" + config + b"\x00\x04\x01\x00P"
+
+    assert split_did_records(data) == [(0x0001, b"\x00\x64F"), (0x0006, config), (0x0004, b"\x01\x00P")]
+    decoded = decode_did_records(data)
+    assert [did for did, _ in decoded] == [0x0001, 0x0006, 0x0004]
+    assert decoded[0][1] == {"distance_mm": 100, "result": "F"}
+    assert decoded[1][1]["tof_max"] == 4
+
+
+@pytest.mark.parametrize("data", [
+    b"\x12\x34\x00\x00\x00",  # 모르는 DID
+    b"\x00\x01\x00\x64",      # 데이터 부족
+    b"\x00\x01\x00\x64P\x00",  # DID 헤더 잘림
+])
+def test_unparseable_records_return_none(data):
+    assert split_did_records(data) is None
+    assert decode_did_records(data) is None
+
+
+def test_iter_dtc_records_with_offset_and_trailing_bytes():
+    payload = b"\x59\x02\xFF" + b"\x01\x01\x10\x09" + b"\x01\x02\x01\x08" + b"\x00\x00"
+    assert list(iter_dtc_records(payload, 3)) == [(0x010110, 0x09), (0x010201, 0x08)]
+    assert list(iter_dtc_records(payload[:5], 3)) == []
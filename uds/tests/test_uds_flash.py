@@ -0,0 +1,51 @@
+"""uds_flash 다운로드 (mmap 이미지 → VirtualEcu)."""
+import zlib
+
+import pytest
+
+from ecu_simulator import FLASH_BASE, MAX_BLOCK_LEN
+from uds_client import UdsNegativeResponse
+from uds_flash import download, iter_blocks, open_image
+
+
+@pytest.fixture
+def image_file(tmp_path):
+    path = tmp_path / "app.bin"
+    path.write_bytes(bytes((i * 7) & 0xFF for i in range(20000)))
+    return path
+
+
+def test_iter_blocks_wraps_sequence_counter():
+    blocks = list(iter_blocks(memoryview(bytes(300)), 1))
+    assert [seq for seq, _, _ in blocks[253:258]] == [0xFE, 0xFF, 0x00, 0x01, 0x02]
+    assert blocks[-1][1] == 299
+
+
+def test_download_from_mmap_image(client, ecu, image_file):
+    progress = []
+    with open_image(image_file) as image:
+        result = download(client, image, FLASH_BASE, on_progress=lambda sent, total, _: progress.append(sent))
+
+    expected = image_file.read_bytes()
+    assert result.size == 20000
+    assert result.block_len == MAX_BLOCK_LEN
+    assert result.blocks == -(-20000 // (MAX_BLOCK_LEN - 2))
+    assert result.crc32 == zlib.crc32(expected)
+    assert int.from_bytes(result.exit_params[:4], "big") == result.crc32
+    assert ecu.flashed[FLASH_BASE] == expected
+    assert progress[-1] == 20000
+
+
+def test_download_respects_smaller_block_len(client, ecu, image_file):
+    image = image_file.read_bytes()
+    result = download(client, image, FLASH_BASE + 0x1000, max_block_len=0x102)
+    assert result.block_len == 0x102
+    assert result.blocks == -(-20000 // 0x100)
+    assert ecu.flashed[FLASH_BASE + 0x1000] == image
+
+
+def test_download_outside_flash_is_rejected(client, ecu):
+    with pytest.raises(UdsNegativeResponse) as info:
+        download(client, bytes(16), 0x1000)
+    assert info.value.nrc == 0x31
+    assert ecu.flashed == {}
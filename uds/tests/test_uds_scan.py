@@ -0,0 +1,33 @@
+"""uds_scan 동시 스캔 (virtual 버스 위 VirtualEcu)."""
+import can
+
+from isotp_transport import IsoTpTransport
+from uds_scan import ScanTarget, scan
+
+
+def test_send_failure_on_one_target_keeps_other_results(channel, tester_tp, ecu):
+    def broken_send(*_args, **_kwargs):
+        raise can.CanError("TX buffer full")
+
+    with IsoTpTransport(can.Bus(interface="virtual", channel=channel + "-dead")) as dead_tp:
+        dead_tp.send_pdu = broken_send
+        seen = []
+        results = scan(
+            {"good": tester_tp, "dead": dead_tp},
+            [ScanTarget("good", 0x7E0, 0x7E8), ScanTarget("dead", 0x7E1, 0x7E9)],
+            on_result=seen.append,
+        )
+
+    good, dead = results
+    assert good["ok"] and good["present"]
+    assert [s["ok"] for s in good["steps"]] == [True, True, True]
+    assert not dead["ok"] and not dead["present"]
+    assert all("TX buffer full" in s["error"] for s in dead["steps"])
+    assert len(seen) == 2
+
+
+def test_silent_target_stops_after_first_request(channel, tester_tp, ecu):
+    result, = scan({None: tester_tp}, [ScanTarget(None, 0x7E3, 0x7EB)], timeout=0.1)
+    assert not result["present"]
+    assert len(result["steps"]) == 1
+    assert result["steps"][0]["error"].startswith("No response")
@@ -0,0 +1,255 @@
+"""
+CAN 트레이스 기록/재생과 오프라인 UDS 디코딩.
+
+  record : 버스의 모든 프레임을 BLF/ASC로 저장 (can_dash.py/uds_cli.py는 TraceRecorder를
+           IsoTpTransport 리스너로 붙여 자신이 송수신한 프레임을 기록)
+  replay : 트레이스를 원래 시간 간격대로 버스에 다시 송출
+  decode : 대용량 트레이스를 한 번만 훑으며 UDS 트랜잭션을 조립해 CSV/JSON Lines로 출력
+
+사용 예:
+    python trace_tools.py record bench.blf --channel PCAN_USBBUS1 --duration 600
+    python trace_tools.py decode bench.blf --format csv -o bench.csv
+    python trace_tools.py decode field.asc --pair 7E0:7E8 --pair 7E1:7E9
+    python trace_tools.py replay bench.blf --bustype virtual --channel test
+"""
+import argparse
+import collections
+import csv
+import json
+import sys
+import threading
+import time
+
+import can
+
+from can_backend import add_bus_args, open_bus
+from isotp_transport import EV_PDU, IsoTpReassembler
+from uds_client import decode_did, decode_dtc_report
+from uds_codec import decode_did_records, dtc_description
+
+TRACE_EXTENSIONS = (".blf", ".asc")
+DEFAULT_PAIRS = ((0x7E0, 0x7E8),)
+CSV_FIELDS = ("timestamp", "req_id", "res_id", "sid", "request", "response", "latency_ms", "ok", "decoded")
+
+
+class TraceRecorder:
+    """
+    python-can 로그 writer(BLF/ASC)를 감싼 스레드 안전 프레임 기록기.
+    IsoTpTransport.add_listener(recorder)로 붙이면 TX/RX 프레임이 드라이버 타임스탬프와 함께 저장된다.
+    """
+
+    def __init__(self, path):
+        if not path.lower().endswith(TRACE_EXTENSIONS):
+            raise ValueError(f"Trace file must be one of {', '.join(TRACE_EXTENSIONS)}: {path}")
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+        self._writer = can.Logger(path)
+
+    def __call__(self, msg):
+        with self._lock:
+            if self._writer is not None:
+                self._writer.on_message_received(msg)
+                self.count += 1
+
+    def stop(self):
+        with self._lock:
+            if self._writer is not None:
+                self._writer.stop()
+                self._writer = None
+
+
+# ---------------- 오프라인 디코딩 ----------------
+def decode_response(request, response):
+    """요청/응답 PDU 쌍을 JSON으로 내보낼 수 있는 값으로 해석한다."""
+    if response[0] == 0x7F:
+        return {"nrc": f"0x{response[2]:02X}"} if len(response) >= 3 else {"raw": response.hex()}
+
+    sid = request[0]
+    try:
+        if sid == 0x22:
+            records = decode_did_records(response[1:])
+            if records is None and len(response) >= 3:
+                did = (response[1] << 8) | response[2]
+                records = [(did, decode_did(did, response[3:]))]
+            return {f"0x{did:04X}": values for did, values in records or []}
+        if sid == 0x19:
+            _, dtcs = decode_dtc_report(response)
+            return [
+                {"code": f"0x{code:06X}", "description": dtc_description(code), "status": f"0x{status:02X}"}
+                for code, status in dtcs
+            ]
+        if sid == 0x2E:
+            return {"written": f"0x{response[1]:02X}{response[2]:02X}"}
+        if sid == 0x14:
+            return {"cleared": True}
+    except (ValueError, IndexError) as e:
+        return {"error": str(e), "raw": response.hex()}
+    return {"raw": response.hex()}
+
+
+def _transaction(req, res_id, response_pdu):
+    ts, req_id, request = req
+    record = {
+        "timestamp": ts,
+        "req_id": f"0x{req_id:03X}",
+        "res_id": f"0x{res_id:03X}",
+        "sid": f"0x{request[0]:02X}",
+        "request": request.hex(),
+        "response": None,
+        "latency_ms": None,
+        "ok": False,
+        "decoded": None,
+    }
+    if response_pdu is not None:
+        response = response_pdu.data
+        record["response"] = response.hex()
+        record["latency_ms"] = round((response_pdu.frames[-1].timestamp - ts) * 1000, 3)
+        record["ok"] = response[0] == (request[0] + 0x40) & 0xFF
+        record["decoded"] = decode_response(request, response)
+    return record
+
+
+def iter_transactions(messages, pairs=DEFAULT_PAIRS, n_cr=1.0):
+    """
+    프레임 스트림을 한 번 훑으며 (요청, 응답) UDS 트랜잭션을 순서대로 생성한다.
+    파이프라인 요청을 위해 응답 ID별로 미응답 요청을 FIFO로 보관하고,
+    응답 SID와 맞지 않는 앞선 요청은 무응답으로 내보낸다.
+    """
+    req_to_res = dict(pairs)
+    res_ids = set(req_to_res.values())
+    reassembler = IsoTpReassembler(n_cr)
+    pending = collections.defaultdict(collections.deque)  # res_id -> (ts, req_id, request)
+
+    for msg in messages:
+        arb_id = msg.arbitration_id
+        if arb_id not in req_to_res and arb_id not in res_ids:
+            continue
+        event, pdu = reassembler.feed(msg, msg.timestamp)
+        if event != EV_PDU or not pdu.data:
+            continue
+
+        if arb_id in req_to_res:
+            pending[req_to_res[arb_id]].append((pdu.frames[0].timestamp, arb_id, pdu.data))
+            continue
+
+        data = pdu.data
+        if data[0] == 0x7F and len(data) >= 3 and data[2] == 0x78:
+            continue  # responsePending: 최종 응답을 계속 기다림
+        req_sid = data[1] if data[0] == 0x7F and len(data) >= 2 else (data[0] - 0x40) & 0xFF
+
+        queue = pending[arb_id]
+        while queue and queue[0][2][0] != req_sid:
+            yield _transaction(queue.popleft(), arb_id, None)
+        if queue:
+            yield _transaction(queue.popleft(), arb_id, pdu)
+
+    for res_id, queue in pending.items():
+        while queue:
+            yield _transaction(queue.popleft(), res_id, None)
+
+
+def write_transactions(transactions, out, fmt):
+    count = 0
+    if fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for record in transactions:
+            record["decoded"] = json.dumps(record["decoded"], ensure_ascii=False)
+            writer.writerow(record)
+            count += 1
+    else:
+        for record in transactions:
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+# ---------------- 재생 / 기록 ----------------
+def replay(path, bus, ids=None, tx_only=False):
+    """트레이스 프레임을 원래 시간 간격으로 bus에 송출하고 송출한 프레임 수를 반환한다."""
+    sent = 0
+    with can.LogReader(path) as reader:
+        for msg in can.MessageSync(reader, timestamps=True):
+            if ids and msg.arbitration_id not in ids:
+                continue
+            if tx_only and msg.is_rx:
+                continue
+            bus.send(msg)
+            sent += 1
+    return sent
+
+
+def record(path, bus, duration=None):
+    """버스의 모든 프레임을 duration초(None이면 Ctrl+C까지) 기록한다."""
+    recorder = TraceRecorder(path)
+    notifier = can.Notifier(bus, [recorder])
+    try:
+        if duration is None:
+            while True:
+                time.sleep(1.0)
+        else:
+            time.sleep(duration)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        notifier.stop()
+        recorder.stop()
+    return recorder.count
+
+
+def _pair(text):
+    req, res = text.split(":")
+    return int(req, 16), int(res, 16)
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="CAN trace recording, replay and offline UDS decoding.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_rec = sub.add_parser("record", help="Record all bus frames to BLF/ASC.")
+    p_rec.add_argument("path")
+    p_rec.add_argument("--duration", type=float, help="Seconds to record (default: until Ctrl+C).")
+    add_bus_args(p_rec)
+
+    p_play = sub.add_parser("replay", help="Replay a trace onto a bus with original timing.")
+    p_play.add_argument("path")
+    p_play.add_argument("--id", dest="ids", action="append", type=lambda x: int(x, 16),
+                        help="Only replay this CAN ID (hex, repeatable).")
+    p_play.add_argument("--tx-only", action="store_true", help="Only replay frames recorded as TX.")
+    add_bus_args(p_play)
+
+    p_dec = sub.add_parser("decode", help="Reassemble and decode UDS transactions from a trace.")
+    p_dec.add_argument("path")
+    p_dec.add_argument("--pair", dest="pairs", action="append", type=_pair,
+                       help="Request:response ID pair in hex, e.g. 7E0:7E8 (repeatable).")
+    p_dec.add_argument("--format", choices=("jsonl", "csv"), default="jsonl")
+    p_dec.add_argument("-o", "--output", help="Output file (default: stdout).")
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+
+    if args.command == "decode":
+        out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+        t0 = time.perf_counter()
+        with can.LogReader(args.path) as reader:
+            count = write_transactions(iter_transactions(reader, args.pairs or DEFAULT_PAIRS), out, args.format)
+        if args.output:
+            out.close()
+        print(f"[Trace] {count} transactions decoded in {time.perf_counter() - t0:.2f}s", file=sys.stderr)
+        return 0
+
+    with open_bus(args.bustype, args.channel, args.bitrate, fd=args.fd, data_bitrate=args.data_bitrate) as bus:
+        if args.command == "record":
+            count = record(args.path, bus, args.duration)
+            print(f"[Trace] {count} frames recorded to {args.path}", file=sys.stderr)
+        else:
+            count = replay(args.path, bus, set(args.ids or ()), args.tx_only)
+            print(f"[Trace] {count} frames replayed", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
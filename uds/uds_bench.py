@@ -0,0 +1,238 @@
+"""
+UDS 지연시간 / ISO-TP 처리량 벤치마크 (ecu_simulator.VirtualEcu 대상, 하드웨어 불필요).
+
+  latency    : 서비스별 요청→응답 지연 백분위수 (p50/p90/p99/max)
+  throughput : FlowControl(BS/STmin)과 페이로드 크기에 따른 ISO-TP 전송 속도
+               - write: 0x2E DID 0x0005 (GUI send_uds_tp_write 경로, 데이터 100 B ~ 4 KB)
+               - read : 0x22 DID 0x0005 (100 B ECU Info, GUI parse_uds_response 경로)
+  decode     : 응답 디코더 1회 호출 시간 (us)
+
+--json으로 결과를 저장하고 --baseline으로 이전 결과와 비교하면, 허용 범위(--tolerance)를
+넘게 느려진 항목이 있을 때 종료 코드 1을 반환한다.
+
+사용 예:
+    python uds_bench.py --iterations 500 --json bench.json
+    python uds_bench.py --baseline bench.json --tolerance 0.25
+    python uds_bench.py --sizes 100 4092 --bs 0 8 32 --stmin 0 1 0xF5
+    python uds_bench.py --fd --sizes 100 4092 16384 --skip latency
+"""
+import argparse
+import itertools
+import json
+import sys
+import time
+import timeit
+
+import can
+import numpy as np
+
+from ecu_simulator import VirtualEcu
+from isotp_transport import FRAME_LEN, IsoTpTransport, frame_count, stmin_to_ns
+from uds_client import (
+    DID_ECU_INFO,
+    ECU_INFO_LEN,
+    UdsClient,
+    decode_dtc_report,
+    decode_ecu_info,
+    encode_ecu_info,
+    split_did_records,
+)
+from uds_codec import decode_did_records
+
+PERCENTILES = (50, 90, 99)
+MAX_CLASSIC_PDU = 0xFFF  # 클래식 ISO-TP FF 길이 상한 (4095 B)
+MAX_WRITE_DATA = MAX_CLASSIC_PDU - 3  # SID + DID 2바이트 제외
+MAX_WRITE_DATA_FD = 0xFFFF  # CAN FD: escape FF로 4095 B 초과 전송 (벤치 상한)
+
+# 서비스별 지연 측정 요청: (이름, 요청 함수)
+LATENCY_SERVICES = (
+    ("0x22 sensor (SF)", lambda c: c.read_did(0x0001)),
+    ("0x22 ECU info (100 B)", lambda c: c.read_did(DID_ECU_INFO)),
+    ("0x22 4 sensors", lambda c: c.read_dids((0x0001, 0x0002, 0x0003, 0x0004))),
+    ("0x2E sensor config", lambda c: c.write_did(0x0006, bytes(8))),
+    ("0x2E ECU info (100 B)", lambda c: c.write_did(DID_ECU_INFO, encode_ecu_info({"vin": "BENCH"}))),
+    ("0x19 read DTC", lambda c: c.read_dtc()),
+    ("0x14 clear DTC", lambda c: c.clear_dtc()),
+)
+
+
+def percentile_stats(samples_ms):
+    arr = np.asarray(samples_ms, dtype=np.float64)
+    stats = {f"p{p}": round(float(v), 3) for p, v in zip(PERCENTILES, np.percentile(arr, PERCENTILES))}
+    stats["max"] = round(float(arr.max()), 3)
+    stats["n"] = int(arr.size)
+    return stats
+
+
+def bench_latency(client, iterations, warmup=10):
+    """서비스별로 iterations회 요청해 지연 백분위수(ms)를 구한다."""
+    results = {}
+    for name, call in LATENCY_SERVICES:
+        for _ in range(warmup):
+            call(client)
+        samples = np.empty(iterations, dtype=np.float64)
+        for i in range(iterations):
+            t0 = time.perf_counter()
+            call(client)
+            samples[i] = (time.perf_counter() - t0) * 1000
+        results[name] = percentile_stats(samples)
+    return results
+
+
+def bench_throughput(client, ecu, sizes, bs_values, stmin_values, repeats):
+    """
+    BS/STmin/크기 조합마다 전송 시간을 잰다.
+    write는 시뮬레이터가 보내는 FC, read는 테스터가 보내는 FC를 바꿔 가며 측정한다.
+    """
+    rows = []
+    tp = client.tp
+    saved_fc = (tp.rx_bs, tp.rx_stmin)
+    try:
+        for bs, stmin in itertools.product(bs_values, stmin_values):
+            ecu.tp.set_rx_flow_control(bs, stmin)
+            tp.set_rx_flow_control(bs, stmin)
+            for size in sizes:
+                data = bytes(size)  # 시뮬레이터는 앞 100바이트만 ECU Info로 저장
+                rows.append(_measure(
+                    "write", size, bs, stmin, repeats,
+                    lambda: client.write_did(DID_ECU_INFO, data), tp.tx_dl,
+                ))
+            rows.append(_measure(
+                "read", ECU_INFO_LEN, bs, stmin, repeats,
+                lambda: client.read_did(DID_ECU_INFO), ecu.tp.tx_dl,
+            ))
+    finally:
+        ecu.tp.set_rx_flow_control(0, 0)
+        tp.set_rx_flow_control(*saved_fc)
+    return rows
+
+
+def _measure(direction, size, bs, stmin, repeats, call, tx_dl=FRAME_LEN):
+    samples = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - t0)
+    best = min(samples)
+    frames = frame_count(size + 3, tx_dl)  # SID + DID 포함 PDU의 FF + CF 수
+    return {
+        "direction": direction,
+        "payload": size,
+        "bs": bs,
+        "stmin": f"0x{stmin:02X}",
+        "frames": frames,
+        "ideal_ms": round((frames - 2) * stmin_to_ns(stmin) / 1e6, 3) if frames > 1 else 0.0,
+        "best_ms": round(best * 1000, 3),
+        "median_ms": round(float(np.median(samples)) * 1000, 3),
+        "kib_per_s": round(size / best / 1024, 1),
+    }
+
+
+def bench_decode(number=20000):
+    """응답 디코더 1회 호출 시간(us)"""
+    ecu_info = bytes([0x62, 0x00, 0x05]) + encode_ecu_info({"vin": "MY_TC375_VIN_001", "hw": "HW"})
+    dtc_report = bytes([0x59, 0x02, 0xFF]) + bytes([0x01, 0x01, 0x00, 0x40]) * 8
+    sensors = bytes([0x62]) + b"".join(bytes([0, d, 0x01, 0x2C, ord("P")]) for d in range(1, 5))
+    cases = {
+        "decode_ecu_info": lambda: decode_ecu_info(ecu_info[3:]),
+        "decode_dtc_report (8 DTC)": lambda: decode_dtc_report(dtc_report),
+        "split_did_records (4 DID)": lambda: split_did_records(sensors[1:]),
+        "decode_did_records (4 DID)": lambda: decode_did_records(sensors[1:]),
+    }
+    return {name: round(timeit.timeit(fn, number=number) / number * 1e6, 3) for name, fn in cases.items()}
+
+
+def compare_baseline(result, baseline, tolerance):
+    """baseline 대비 p50 지연/최소 전송 시간/디코드 시간이 tolerance 비율 이상 늘어난 항목 목록"""
+    regressions = []
+
+    def check(name, now, before):
+        if before and now > before * (1 + tolerance):
+            regressions.append(f"{name}: {before} → {now} (+{(now / before - 1) * 100:.0f}%)")
+
+    for name, stats in result.get("latency", {}).items():
+        check(f"latency {name} p50 ms", stats["p50"], baseline.get("latency", {}).get(name, {}).get("p50"))
+    key = lambda r: (r["direction"], r["payload"], r["bs"], r["stmin"])
+    before_rows = {key(r): r for r in baseline.get("throughput", [])}
+    for row in result.get("throughput", []):
+        before = before_rows.get(key(row))
+        check(f"throughput {'/'.join(map(str, key(row)))} best ms", row["best_ms"], before and before["best_ms"])
+    for name, us in result.get("decode", {}).items():
+        check(f"decode {name} us", us, baseline.get("decode", {}).get(name))
+    return regressions
+
+
+def print_report(result):
+    print("== Latency (ms) ==")
+    print(f"{'service':<24}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}")
+    for name, s in result["latency"].items():
+        print(f"{name:<24}{s['p50']:>9.3f}{s['p90']:>9.3f}{s['p99']:>9.3f}{s['max']:>9.3f}")
+
+    print("\n== ISO-TP throughput ==")
+    print(f"{'dir':<6}{'bytes':>6}{'BS':>5}{'STmin':>7}{'frames':>8}{'ideal ms':>10}{'best ms':>10}{'KiB/s':>9}")
+    for r in result["throughput"]:
+        print(f"{r['direction']:<6}{r['payload']:>6}{r['bs']:>5}{r['stmin']:>7}{r['frames']:>8}"
+              f"{r['ideal_ms']:>10.2f}{r['best_ms']:>10.2f}{r['kib_per_s']:>9.1f}")
+
+    print("\n== Decode (us/call) ==")
+    for name, us in result["decode"].items():
+        print(f"{name:<28}{us:>9.3f}")
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="UDS latency / ISO-TP throughput benchmark against the ECU simulator.")
+    parser.add_argument("--channel", default="uds-bench", help="Virtual bus channel name.")
+    parser.add_argument("--iterations", type=int, default=200, help="Requests per service for latency.")
+    parser.add_argument("--repeats", type=int, default=3, help="Transfers per throughput combination.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[ECU_INFO_LEN, 1024, MAX_WRITE_DATA],
+                        help=f"Write data sizes in bytes ({ECU_INFO_LEN}..{MAX_WRITE_DATA} for classic ISO-TP, "
+                             f"up to {MAX_WRITE_DATA_FD} with --fd).")
+    parser.add_argument("--bs", type=int, nargs="+", default=[0, 8])
+    parser.add_argument("--stmin", type=lambda x: int(x, 0), nargs="+", default=[0, 1])
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated ECU response delay (s).")
+    parser.add_argument("--fd", action="store_true", help="Run tester and simulator over CAN FD ISO-TP.")
+    parser.add_argument("--skip", choices=("latency", "throughput", "decode"), action="append", default=[])
+    parser.add_argument("--json", help="Write results to this JSON file.")
+    parser.add_argument("--baseline", help="Compare against a previous --json result.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown vs baseline (0.2 = 20%%).")
+    return parser
+
+
+def main(argv=None):
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    max_write = MAX_WRITE_DATA_FD if args.fd else MAX_WRITE_DATA
+    bad = [s for s in args.sizes if not ECU_INFO_LEN <= s <= max_write]
+    if bad:
+        parser.error(f"--sizes must be between {ECU_INFO_LEN} and {max_write} bytes: {bad}")
+
+    result = {"latency": {}, "throughput": [], "decode": {}}
+    with VirtualEcu.open(args.channel, "virtual", fd=args.fd, latency=args.latency) as ecu, \
+            IsoTpTransport(can.Bus(interface="virtual", channel=args.channel), fd=args.fd) as tp:
+        client = UdsClient(tp, ecu.req_id, ecu.res_id, timeout=5.0)
+        if "latency" not in args.skip:
+            result["latency"] = bench_latency(client, args.iterations)
+        if "throughput" not in args.skip:
+            result["throughput"] = bench_throughput(client, ecu, args.sizes, args.bs, args.stmin, args.repeats)
+    if "decode" not in args.skip:
+        result["decode"] = bench_decode()
+
+    print_report(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare_baseline(result, json.load(f), args.tolerance)
+        if regressions:
+            print("\n❌ Regressions vs baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\n✅ No regressions vs baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""
+UDS 배치 CLI (PyQt5 불필요).
+
+배치 파일의 요청을 한 줄씩 실행하고 결과를 JSON Lines로 출력한다.
+EOL 테스트 스크립트에서 종료 코드(실패 시 1)와 함께 사용한다.
+
+배치 파일 형식 (# 이후는 주석):
+    read 0x0005
+    read 0x0001 0x0002 0x0003 0x0004
+    write 0x0006 0000900100008813
+    write_sensor_config 0 400 0 5000
+    read_dtc
+    clear_dtc
+    raw 22 00 01
+    sleep 0.5
+
+사용 예:
+    python uds_cli.py requests.txt --channel PCAN_USBBUS1 --bustype pcan
+    python uds_cli.py requests.txt --bustype vcan            # Linux 테스트 리그 (vcan0)
+    python uds_cli.py requests.txt --trace eol_run.blf   # 송수신 프레임을 BLF로 기록
+    echo "read_dtc" | python uds_cli.py -
+"""
+import argparse
+import json
+import sys
+import time
+
+import can
+
+from can_backend import add_bus_args, fd_options
+from isotp_transport import IsoTpError, IsoTpTransport
+from trace_tools import TraceRecorder
+from uds_client import (
+    P2_CLIENT,
+    P2_STAR_CLIENT,
+    UdsClient,
+    UdsError,
+    UdsNegativeResponse,
+    decode_did,
+    encode_sensor_config,
+    nrc_name,
+)
+from uds_codec import dtc_description, dtc_status_description
+
+
+def _int(text):
+    return int(text, 0)
+
+
+def run_command(client, command, args):
+    """명령 하나를 실행하고 JSON으로 내보낼 결과를 반환한다."""
+    if command == "read":
+        dids = [_int(a) for a in args]
+        if not dids:
+            raise ValueError("read needs at least one DID")
+        data = client.read_dids(dids) if len(dids) > 1 else {dids[0]: client.read_did(dids[0])}
+        return {f"0x{did:04X}": decode_did(did, value) for did, value in data.items()}
+
+    if command == "write":
+        if len(args) != 2:
+            raise ValueError("usage: write <did> <hex data>")
+        client.write_did(_int(args[0]), bytes.fromhex(args[1]))
+        return {"written": f"0x{_int(args[0]):04X}"}
+
+    if command == "write_sensor_config":
+        if len(args) != 4:
+            raise ValueError("usage: write_sensor_config <ultra_min> <ultra_max> <tof_min> <tof_max>")
+        client.write_did(0x0006, encode_sensor_config(*[_int(a) for a in args]))
+        return {"written": "0x0006"}
+
+    if command == "read_dtc":
+        dtcs = client.read_dtc(_int(args[0]) if args else 0xFF)
+        return [
+            {
+                "code": f"0x{code:06X}",
+                "description": dtc_description(code),
+                "status": f"0x{status:02X}",
+                "status_description": dtc_status_description(status),
+            }
+            for code, status in dtcs
+        ]
+
+    if command == "clear_dtc":
+        client.clear_dtc()
+        return {"cleared": True}
+
+    if command == "raw":
+        return {"response": client.request(bytes.fromhex("".join(args))).hex()}
+
+    if command == "sleep":
+        time.sleep(float(args[0]))
+        return {"slept": float(args[0])}
+
+    raise ValueError(f"Unknown command: {command}")
+
+
+def iter_requests(fp):
+    for line_no, line in enumerate(fp, 1):
+        line = line.split("#", 1)[0].strip()
+        if line:
+            yield line_no, line
+
+
+def run_request(client, line):
+    """배치 명령 한 줄을 실행해 {request, result|error, nrc, ok, elapsed_ms} dict를 반환한다."""
+    command, *cmd_args = line.split()
+    record = {"request": line}
+    t0 = time.perf_counter()
+    try:
+        record["result"] = run_command(client, command, cmd_args)
+        record["ok"] = True
+    except UdsNegativeResponse as e:
+        record.update(ok=False, error=str(e), nrc=f"0x{e.nrc:02X}", nrc_name=nrc_name(e.nrc))
+    except (UdsError, ValueError) as e:
+        record.update(ok=False, error=str(e))
+    except (IsoTpError, can.CanError) as e:
+        record.update(ok=False, error=f"Send failed: {e}")
+    record["elapsed_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+    return record
+
+
+def run_batch(client, fp, stop_on_error=False):
+    """배치 요청을 순서대로 실행해 JSON Lines로 출력하고 실패 건수를 반환한다."""
+    failed = 0
+    for line_no, line in iter_requests(fp):
+        record = {"line": line_no, **run_request(client, line)}
+        print(json.dumps(record, ensure_ascii=False), flush=True)
+
+        if not record["ok"]:
+            failed += 1
+            if stop_on_error:
+                break
+    return failed
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Run a batch of UDS requests and print JSON results.")
+    parser.add_argument("batch", help="Batch file path, or '-' for stdin.")
+    add_bus_args(parser)
+    parser.add_argument("--req-id", type=_int, default=0x7E0)
+    parser.add_argument("--res-id", type=_int, default=0x7E8)
+    parser.add_argument("--p2", "--timeout", dest="p2", type=float, default=P2_CLIENT,
+                        help="P2 timeout: request sent -> response start (s).")
+    parser.add_argument("--p2-star", type=float, default=P2_STAR_CLIENT,
+                        help="P2* timeout after a 0x78 responsePending (s).")
+    parser.add_argument("--rx-bs", type=_int, default=0, help="FlowControl block size sent to the ECU.")
+    parser.add_argument("--rx-stmin", type=_int, default=0, help="FlowControl STmin byte sent to the ECU.")
+    parser.add_argument("--stop-on-error", action="store_true", help="Stop at the first failed request.")
+    parser.add_argument("--trace", help="Record every TX/RX frame to a .blf/.asc trace file.")
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    fp = sys.stdin if args.batch == "-" else open(args.batch, "r", encoding="utf-8")
+
+    failed = 0
+    with fp, IsoTpTransport.open(args.channel, args.bustype, args.bitrate,
+                                 rx_bs=args.rx_bs, rx_stmin=args.rx_stmin, **fd_options(args)) as tp:
+        recorder = TraceRecorder(args.trace) if args.trace else None
+        if recorder:
+            tp.add_listener(recorder)
+        client = UdsClient(tp, args.req_id, args.res_id, timeout=args.p2, p2_star=args.p2_star)
+        try:
+            failed = run_batch(client, fp, args.stop_on_error)
+        finally:
+            if recorder:
+                tp.remove_listener(recorder)
+                recorder.stop()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
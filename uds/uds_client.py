@@ -0,0 +1,246 @@
+"""
+GUI 없이 사용할 수 있는 UDS 클라이언트와 응답 디코더.
+
+TC375 펌웨어(BSW/Driver/can.c)가 제공하는 서비스를 대상으로 한다.
+  - 0x22 ReadDataByIdentifier  (DID 0x0001~0x0006, uds_codec.DID_LAYOUTS)
+  - 0x2E WriteDataByIdentifier (DID 0x0005 ECU Info, 0x0006 센서 판정 조건)
+  - 0x19 ReadDTCInformation    (sub-function 0x02)
+  - 0x14 ClearDiagnosticInformation
+  - 0x34/0x36/0x37 RequestDownload / TransferData / RequestTransferExit
+    (TC375 펌웨어에는 아직 없음, ecu_simulator.py와 uds_flash.py에서 사용)
+
+can_dash.py(PyQt5 GUI)와 uds_cli.py(배치 CLI)가 같은 디코더를 공유한다.
+DID 레이아웃과 DTC 설명 테이블은 uds_codec.py에 있다.
+"""
+import time
+
+from isotp_transport import IsoTpError
+from uds_codec import (
+    DID_CODECS,
+    DID_ECU_INFO,
+    DID_SENSOR_CONFIG,
+    NRC_RESPONSE_PENDING,
+    SENSOR_DIDS,
+    iter_dtc_records,
+    nrc_name,
+    split_did_records,
+)
+
+ECU_INFO_LEN = DID_CODECS[DID_ECU_INFO].size
+
+# 테스터 쪽 응답 타이머 (ISO 14229-2)
+#   P2 : 요청 송신 완료 → 응답 시작. ECU P2server_max(50 ms)에 버스/드라이버/OS 지연 여유를 더함
+#   P2*: NRC 0x78(responsePending) 수신 → 다음 응답. ECU P2*server_max(5 s)
+P2_CLIENT = 1.0
+P2_STAR_CLIENT = 5.0
+
+
+class UdsError(Exception):
+    """응답 없음, 예상하지 못한 SID 등 UDS 요청 실패."""
+
+
+class UdsNegativeResponse(UdsError):
+    """ECU가 0x7F(Negative Response)로 응답한 경우."""
+
+    def __init__(self, sid, nrc):
+        super().__init__(f"Negative response SID=0x{sid:02X} NRC=0x{nrc:02X} ({nrc_name(nrc)})")
+        self.sid = sid
+        self.nrc = nrc
+
+
+# ---------------- 디코더 / 인코더 ----------------
+def decode_sensor(data):
+    """센서 DID 데이터: 거리(2B, Big-endian) + 판정 문자('P'/'F') → (mm, 문자)"""
+    values = DID_CODECS[SENSOR_DIDS[0]].decode(data)
+    return values["distance_mm"], values["result"]
+
+
+def decode_ecu_info(data):
+    """ECU Info(100바이트)를 {vin, hw, sw, sn, supplier} 문자열 dict로 변환"""
+    if len(data) < ECU_INFO_LEN:
+        raise ValueError(f"ECU Info payload too short ({len(data)} bytes), expected {ECU_INFO_LEN}.")
+    return DID_CODECS[DID_ECU_INFO].decode(data)
+
+
+def encode_ecu_info(info):
+    """{vin, hw, sw, sn, supplier} dict를 ECU Info 100바이트로 변환 (ASCII, 0 패딩)"""
+    return DID_CODECS[DID_ECU_INFO].encode(info)
+
+
+def encode_sensor_config(ultra_min, ultra_max, tof_min, tof_max):
+    """DID 0x0006: C 구조체 unsigned short 4개 (TC375는 Little Endian)"""
+    return DID_CODECS[DID_SENSOR_CONFIG].encode(
+        {"ultra_min": ultra_min, "ultra_max": ultra_max, "tof_min": tof_min, "tof_max": tof_max}
+    )
+
+
+def decode_dtc_report(payload):
+    """
+    0x59 0x02 응답 → (status availability mask, [(code, status), ...])
+    DTC가 없으면 펌웨어는 [0x59, 0x02, 0x00]만 보낸다.
+    """
+    if len(payload) < 2:
+        raise ValueError("DTC payload too short.")
+    if len(payload) <= 3:
+        return (payload[2] if len(payload) == 3 else 0), []
+    if len(payload) < 7:
+        raise ValueError("DTC payload format not recognized.")
+    return payload[2], list(iter_dtc_records(payload, 3))
+
+
+def decode_did(did, data):
+    """DID 데이터를 JSON으로 내보낼 수 있는 값으로 변환 (테이블에 없거나 길이가 안 맞으면 raw hex)"""
+    codec = DID_CODECS.get(did)
+    if codec is None or len(data) < codec.size:
+        return {"raw": bytes(data).hex()}
+    return codec.decode(data)
+
+
+def did_bytes(did):
+    return bytes([(did >> 8) & 0xFF, did & 0xFF])
+
+
+def is_response_pending(data):
+    return len(data) >= 3 and data[0] == 0x7F and data[2] == NRC_RESPONSE_PENDING
+
+
+def wait_response(tp, res_id, p2=P2_CLIENT, p2_star=P2_STAR_CLIENT, on_pending=None):
+    """
+    res_id로 오는 최종 응답 PDU 하나를 P2/P2* 타이머로 기다린다.
+      - 긍정/부정 응답이 완성되는 즉시 반환
+      - NRC 0x78(responsePending)이면 on_pending(pdu)을 호출하고 P2*로 다시 대기
+      - 타이머가 끝나도 멀티프레임 응답을 받는 중이면 N_Cr 안에 CF가 이어지는 동안 기다림
+    응답이 없으면 None.
+    """
+    deadline = time.monotonic() + p2
+    while True:
+        pdu = tp.recv_pdu(res_id, timeout=max(0.0, deadline - time.monotonic()))
+        if pdu is None:
+            left = tp.rx_time_left(res_id)
+            if not left:
+                return None
+            deadline = time.monotonic() + left
+            continue
+        if is_response_pending(pdu.data):
+            if on_pending:
+                on_pending(pdu)
+            deadline = time.monotonic() + p2_star
+            continue
+        return pdu
+
+
+# ---------------- 클라이언트 ----------------
+class UdsClient:
+    """
+    IsoTpTransport 위에서 동기식으로 UDS 요청을 보내는 클라이언트.
+    대상 ECU 하나(req_id/res_id)에 대한 요청은 순서대로 실행된다.
+    timeout은 응답마다 적용되는 P2, p2_star는 NRC 0x78 이후 대기 시간이다.
+    """
+
+    def __init__(self, tp, req_id=0x7E0, res_id=0x7E8, timeout=P2_CLIENT, p2_star=P2_STAR_CLIENT):
+        self.tp = tp
+        self.req_id = req_id
+        self.res_id = res_id
+        self.timeout = timeout
+        self.p2_star = p2_star
+        self.pending_count = 0  # 지금까지 받은 NRC 0x78 수
+        tp.subscribe(res_id, req_id)
+
+    def _on_pending(self, pdu):
+        self.pending_count += 1
+
+    def request(self, payload, timeout=None):
+        """요청 하나를 보내고 긍정 응답 페이로드(bytes)를 반환한다."""
+        return self.request_many([payload], timeout)[0]
+
+    def request_many(self, payloads, timeout=None):
+        """
+        요청을 대기 없이 연달아 보낸 뒤(파이프라인) 응답을 순서대로 모아 반환한다.
+        응답마다 P2(timeout), NRC 0x78 이후에는 P2*로 기다린다.
+        부정 응답은 UdsNegativeResponse, 응답 누락은 UdsError로 알린다.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        self.tp.flush(self.res_id)
+        try:
+            for payload in payloads:
+                self.tp.send_pdu(self.req_id, self.res_id, payload)
+        except IsoTpError as e:
+            raise UdsError(str(e)) from e
+
+        responses = []
+        for payload in payloads:
+            pdu = wait_response(self.tp, self.res_id, timeout, self.p2_star, self._on_pending)
+            if pdu is None:
+                raise UdsError(f"No response for SID 0x{payload[0]:02X}")
+            data = pdu.data
+            if data[:1] == b"\x7F" and len(data) >= 3:
+                raise UdsNegativeResponse(data[1], data[2])
+            if data[:1] != bytes([(payload[0] + 0x40) & 0xFF]):
+                raise UdsError(f"Unexpected SID=0x{data[0]:02X} (expected 0x{(payload[0] + 0x40) & 0xFF:02X})")
+            responses.append(data)
+        return responses
+
+    # ---------------- 0x22 ----------------
+    def read_did(self, did):
+        """DID 하나를 읽어 데이터 부분(bytes)을 반환한다."""
+        resp = self.request(b"\x22" + did_bytes(did))
+        if resp[1:3] != did_bytes(did):
+            raise UdsError(f"DID mismatch in response (0x{resp[1]:02X}{resp[2]:02X})")
+        return resp[3:]
+
+    def read_dids(self, dids):
+        """
+        여러 DID를 다중 DID 요청 한 번으로 읽는다. ECU가 목록 형태를 거부하면
+        개별 요청 파이프라인으로 다시 읽는다. {did: bytes}를 반환한다.
+        """
+        dids = list(dids)
+        if len(dids) > 1:
+            try:
+                resp = self.request(b"\x22" + b"".join(did_bytes(d) for d in dids))
+                records = split_did_records(resp[1:])
+                if records is not None and [d for d, _ in records] == dids:
+                    return dict(records)
+            except UdsError:
+                pass
+
+        resps = self.request_many([b"\x22" + did_bytes(d) for d in dids])
+        return {did: resp[3:] for did, resp in zip(dids, resps)}
+
+    # ---------------- 0x2E ----------------
+    def write_did(self, did, data):
+        resp = self.request(b"\x2E" + did_bytes(did) + bytes(data))
+        if resp[1:3] != did_bytes(did):
+            raise UdsError(f"Write ACK DID mismatch (0x{resp[1]:02X}{resp[2]:02X})")
+
+    # ---------------- 0x19 / 0x14 ----------------
+    def read_dtc(self, status_mask=0xFF):
+        """[(code, status), ...]를 반환한다."""
+        return decode_dtc_report(self.request(bytes([0x19, 0x02, status_mask])))[1]
+
+    def clear_dtc(self):
+        self.request(bytes([0x14, 0xFF]))
+
+    # ---------------- 0x34 / 0x36 / 0x37 ----------------
+    def request_download(self, address, size, data_format=0x00, addr_len=4, size_len=4):
+        """
+        RequestDownload. ECU가 허용한 maxNumberOfBlockLength(0x36 요청 전체 길이,
+        SID와 시퀀스 카운터 포함)를 반환한다.
+        """
+        resp = self.request(
+            bytes([0x34, data_format, (size_len << 4) | addr_len])
+            + address.to_bytes(addr_len, "big") + size.to_bytes(size_len, "big")
+        )
+        n = resp[1] >> 4 if len(resp) > 1 else 0
+        if not n or len(resp) < 2 + n:
+            raise UdsError(f"Invalid RequestDownload response: {resp.hex()}")
+        return int.from_bytes(resp[2:2 + n], "big")
+
+    def transfer_data(self, seq, data, timeout=None):
+        """TransferData 블록 하나 (data는 bytes/memoryview). 응답의 transferResponseParameterRecord를 반환"""
+        resp = self.request(bytes([0x36, seq]) + data, timeout)
+        if resp[1:2] != bytes([seq]):
+            raise UdsError(f"TransferData sequence mismatch (sent 0x{seq:02X}, got {resp[1:2].hex() or 'none'})")
+        return resp[2:]
+
+    def request_transfer_exit(self, params=b""):
+        return self.request(b"\x37" + bytes(params))[1:]
@@ -0,0 +1,216 @@
+"""
+DID 레이아웃 / DTC 설명 테이블과 미리 컴파일한 struct 디코더.
+
+DID_LAYOUTS의 각 항목은 모듈 로드 시 한 번 struct.Struct로 컴파일된다.
+DID를 추가하려면 테이블에 한 줄을 넣기만 하면 되고, 응답 분리(split_did_records),
+일괄 디코딩(decode_did_records), 인코딩(DidCodec.encode)이 모두 이 테이블을 따른다.
+
+포맷은 struct 모듈 표기를 그대로 쓴다.
+  H: uint16, s: NUL 종료 ASCII 문자열, c: 판정 문자 1바이트, x: 패딩
+"""
+import collections
+import re
+import struct
+
+DidLayout = collections.namedtuple("DidLayout", ["did", "name", "fmt", "fields"])
+
+SENSOR_DIDS = (0x0001, 0x0002, 0x0003, 0x0004)  # 초음파 1~3, ToF
+DID_ECU_INFO = 0x0005
+DID_SENSOR_CONFIG = 0x0006
+
+DID_LAYOUTS = (
+    # 센서: 거리(mm, Big-endian) + 판정 문자('P'/'F')
+    DidLayout(0x0001, "Ultrasonic 1 (Left)", ">Hc", ("distance_mm", "result")),
+    DidLayout(0x0002, "Ultrasonic 2 (Right)", ">Hc", ("distance_mm", "result")),
+    DidLayout(0x0003, "Ultrasonic 3 (Rear)", ">Hc", ("distance_mm", "result")),
+    DidLayout(0x0004, "ToF Sensor", ">Hc", ("distance_mm", "result")),
+    # C 구조체 info와 동일 (VIN 뒤 2바이트 패딩, 총 100바이트)
+    DidLayout(DID_ECU_INFO, "ECU Info", "<18s2x20s20s20s20s", ("vin", "hw", "sw", "sn", "supplier")),
+    # C 구조체 SensorThresholds_t: unsigned short 4개 (TC375는 Little Endian)
+    DidLayout(DID_SENSOR_CONFIG, "Sensor Config", "<4H", ("ultra_min", "ultra_max", "tof_min", "tof_max")),
+)
+
+# 펌웨어(can.c)의 DTC 생성 로직:
+# 0x010100 + (side_index * 0x10) + 0x0 (Timeout)
+# 0x010100 + (side_index * 0x10) + 0x1 (Range Error)
+# 0x010200 (ToF Timeout)
+# 0x010201 (ToF Range Error)
+DTC_DESCRIPTIONS = {
+    # 초음파 센서 1 (Left)
+    0x010100: "Ultrasonic 1 (Left) - Timeout/No Data",
+    0x010101: "Ultrasonic 1 (Left) - Out of Range",
+    # 초음파 센서 2 (Right)
+    0x010110: "Ultrasonic 2 (Right) - Timeout/No Data",
+    0x010111: "Ultrasonic 2 (Right) - Out of Range",
+    # 초음파 센서 3 (Rear)
+    0x010120: "Ultrasonic 3 (Rear) - Timeout/No Data",
+    0x010121: "Ultrasonic 3 (Rear) - Out of Range",
+    # ToF 센서
+    0x010200: "ToF Sensor - Timeout/No Data",
+    0x010201: "ToF Sensor - Out of Range",
+}
+
+DTC_STATUS_DESCRIPTIONS = {
+    0x00: "정상 (No Fault)",
+    0x01: "보류 (Pending)",
+    0x08: "이번 주기 실패",
+    0x10: "현재 실패 (Test Failed)",
+    0x40: "확정 (Confirmed)",
+}
+
+# ISO 14229-1 Negative Response Code
+NRC_NAMES = {
+    0x10: "generalReject",
+    0x11: "serviceNotSupported",
+    0x12: "subFunctionNotSupported",
+    0x13: "incorrectMessageLengthOrInvalidFormat",
+    0x14: "responseTooLong",
+    0x21: "busyRepeatRequest",
+    0x22: "conditionsNotCorrect",
+    0x24: "requestSequenceError",
+    0x25: "noResponseFromSubnetComponent",
+    0x26: "failurePreventsExecutionOfRequestedAction",
+    0x31: "requestOutOfRange",
+    0x33: "securityAccessDenied",
+    0x35: "invalidKey",
+    0x36: "exceedNumberOfAttempts",
+    0x37: "requiredTimeDelayNotExpired",
+    0x70: "uploadDownloadNotAccepted",
+    0x71: "transferDataSuspended",
+    0x72: "generalProgrammingFailure",
+    0x73: "wrongBlockSequenceCounter",
+    0x78: "requestCorrectlyReceived-ResponsePending",
+    0x7E: "subFunctionNotSupportedInActiveSession",
+    0x7F: "serviceNotSupportedInActiveSession",
+}
+NRC_RESPONSE_PENDING = 0x78
+
+# 0x59 0x02 응답의 DTC 레코드: DTC 상위 1바이트 + 하위 2바이트 + Status
+DTC_RECORD = struct.Struct(">BHB")
+
+_FMT_TOKEN = re.compile(r"(\d*)([a-zA-Z?])")
+
+
+def _ascii(value):
+    return value.split(b"\x00", 1)[0].decode("ascii", errors="ignore")
+
+
+def _char(value):
+    return chr(value[0]) if 32 <= value[0] <= 126 else "?"
+
+
+class DidCodec:
+    """DidLayout 하나를 컴파일한 디코더/인코더 (struct.Struct 캐시)."""
+
+    def __init__(self, layout):
+        self.did = layout.did
+        self.name = layout.name
+        self.fields = tuple(layout.fields)
+        self.struct = struct.Struct(layout.fmt)
+        self.size = self.struct.size
+
+        # 필드별 변환 함수 (s → 문자열, c → 문자, 숫자는 그대로)
+        kinds = []
+        for count, code in _FMT_TOKEN.findall(layout.fmt.lstrip("@=<>!")):
+            if code == "x":
+                continue
+            kinds.extend([code] if code in "sp" else [code] * int(count or 1))
+        if len(kinds) != len(self.fields):
+            raise ValueError(f"DID 0x{self.did:04X}: {len(self.fields)} fields for format {layout.fmt!r}")
+        self._decoders = tuple({"s": _ascii, "c": _char}.get(k) for k in kinds)
+        self._kinds = tuple(kinds)
+
+    def decode(self, data, offset=0):
+        """data[offset:offset+size]를 {필드: 값} dict로 변환 (복사 없이 unpack_from)"""
+        values = self.struct.unpack_from(data, offset)
+        return {
+            field: (conv(value) if conv else value)
+            for field, conv, value in zip(self.fields, self._decoders, values)
+        }
+
+    def encode(self, values):
+        """{필드: 값} dict를 바이트로 변환. 문자열은 ASCII로 잘라 NUL 패딩, 없는 필드는 0/빈 값."""
+        args = []
+        for field, kind in zip(self.fields, self._kinds):
+            value = values.get(field)
+            if kind not in "sc":
+                args.append(value or 0)
+                continue
+            if not isinstance(value, bytes):
+                value = (value or "").encode("ascii", errors="ignore")
+            args.append((value[:1] or b"\x00") if kind == "c" else value)
+        return self.struct.pack(*args)
+
+
+DID_CODECS = {}
+
+
+def register_did(layout):
+    """DID 레이아웃을 컴파일해 등록한다 (같은 DID는 덮어씀)."""
+    codec = DidCodec(layout)
+    DID_CODECS[layout.did] = codec
+    return codec
+
+
+for _layout in DID_LAYOUTS:
+    register_did(_layout)
+
+
+def did_codec(did):
+    return DID_CODECS.get(did)
+
+
+def did_name(did):
+    codec = DID_CODECS.get(did)
+    return codec.name if codec else f"DID 0x{did:04X}"
+
+
+def _walk_did_records(data):
+    """0x62 응답의 (DID, codec, 데이터 오프셋)을 차례로 생성. 모르는 DID나 길이 부족이면 ValueError"""
+    off, end = 0, len(data)
+    while off < end:
+        if off + 2 > end:
+            raise ValueError("Truncated DID header")
+        did = (data[off] << 8) | data[off + 1]
+        codec = DID_CODECS.get(did)
+        if codec is None:
+            raise ValueError(f"Unknown DID 0x{did:04X}")
+        if off + 2 + codec.size > end:
+            raise ValueError(f"DID 0x{did:04X} payload too short")
+        yield did, codec, off + 2
+        off += 2 + codec.size
+
+
+def split_did_records(data):
+    """0x62 응답의 (DID, 데이터 bytes) 반복 구간을 분리. 모르는 DID나 길이 부족이면 None"""
+    try:
+        return [(did, bytes(data[off:off + codec.size])) for did, codec, off in _walk_did_records(data)]
+    except ValueError:
+        return None
+
+
+def decode_did_records(data):
+    """0x62 응답(SID 제외)을 한 번 훑어 [(DID, {필드: 값}), ...]로 디코딩. 해석 불가면 None"""
+    try:
+        return [(did, codec.decode(data, off)) for did, codec, off in _walk_did_records(data)]
+    except ValueError:
+        return None
+
+
+def iter_dtc_records(data, offset=0):
+    """data[offset:]의 4바이트 DTC 레코드를 (code, status)로 생성 (남는 바이트는 무시)"""
+    count = (len(data) - offset) // DTC_RECORD.size
+    for hi, lo, status in DTC_RECORD.iter_unpack(memoryview(data)[offset:offset + count * DTC_RECORD.size]):
+        yield (hi << 16) | lo, status
+
+
+def nrc_name(nrc):
+    return NRC_NAMES.get(nrc, "unknown NRC")
+
+
+def dtc_description(code):
+    return DTC_DESCRIPTIONS.get(code, f"알 수 없는 코드 (0x{code:06X})")
+
+
+def dtc_status_description(status):
+    return DTC_STATUS_DESCRIPTIONS.get(status, f"알 수 없음 (0x{status:02X})")
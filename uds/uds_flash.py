@@ -0,0 +1,149 @@
+"""
+UDS 펌웨어 다운로드 (0x34 RequestDownload → 0x36 TransferData 반복 → 0x37 RequestTransferExit).
+
+이미지 파일은 mmap으로 열고 memoryview 슬라이스를 그대로 블록으로 보내므로
+파일 전체를 메모리로 읽지 않는다. 블록 크기는 ECU가 0x34 응답으로 알려 준
+maxNumberOfBlockLength(SID + 시퀀스 카운터 포함)를 넘지 않는 최대값을 쓴다.
+
+TC375 펌웨어(can.c)는 아직 다운로드 서비스를 제공하지 않으므로 ecu_simulator.py로 검증한다.
+시뮬레이터는 0x37 응답에 받은 데이터의 CRC32를 실어 보내며, --verify-crc로 비교할 수 있다.
+
+사용 예:
+    python uds_flash.py app.bin --simulate
+    python uds_flash.py app.bin --address 0x80000000 --bustype vcan --verify-crc
+    python uds_flash.py app.bin --channel PCAN_USBBUS1 --max-block-len 0x802
+    python uds_flash.py app.bin --simulate --fd
+"""
+import argparse
+import collections
+import contextlib
+import mmap
+import sys
+import time
+import zlib
+
+import can
+
+from can_backend import add_bus_args, fd_options
+from ecu_simulator import FLASH_BASE, VirtualEcu
+from isotp_transport import IsoTpTransport
+from uds_client import P2_CLIENT, P2_STAR_CLIENT, UdsClient, UdsError
+
+TRANSFER_HEADER_LEN = 2  # SID 0x36 + blockSequenceCounter
+
+DownloadResult = collections.namedtuple(
+    "DownloadResult", ["size", "blocks", "block_len", "elapsed", "crc32", "exit_params"])
+
+
+@contextlib.contextmanager
+def open_image(path):
+    """이미지 파일을 읽기 전용 mmap으로 열어 memoryview를 돌려준다 (with 블록을 벗어나면 해제)."""
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mm)
+    try:
+        yield view
+    finally:
+        view.release()
+        try:
+            mm.close()
+        except BufferError:
+            pass  # 예외 traceback이 아직 슬라이스를 잡고 있으면 GC가 해제할 때 닫힌다
+
+
+def iter_blocks(image, data_len):
+    """(시퀀스 카운터, 오프셋, memoryview 슬라이스)를 생성. 카운터는 1부터 시작해 0xFF 다음 0x00"""
+    for seq, off in enumerate(range(0, len(image), data_len), 1):
+        yield seq & 0xFF, off, image[off:off + data_len]
+
+
+def download(client, image, address, max_block_len=None, data_format=0x00, on_progress=None):
+    """
+    image(bytes/memoryview)를 address에 다운로드한다.
+    max_block_len을 주면 ECU가 허용한 값과 비교해 작은 쪽을 쓴다.
+    0x36 요청 전체가 ISO-TP PDU 하나에 들어가야 하므로 전송 계층의 PDU 상한
+    (클래식 4095바이트, CAN FD는 escape FF로 그 이상)도 넘지 않는다.
+    on_progress(sent_bytes, total_bytes, elapsed_s)는 블록마다 호출된다.
+    """
+    total = len(image)
+    ecu_block_len = client.request_download(address, total, data_format)
+    block_len = min(ecu_block_len, max_block_len or ecu_block_len, client.tp.max_pdu_len)
+    if block_len <= TRANSFER_HEADER_LEN:
+        raise UdsError(f"maxNumberOfBlockLength too small ({ecu_block_len})")
+
+    t0 = time.perf_counter()
+    blocks = 0
+    for seq, off, chunk in iter_blocks(image, block_len - TRANSFER_HEADER_LEN):
+        client.transfer_data(seq, chunk)
+        blocks += 1
+        if on_progress:
+            on_progress(off + len(chunk), total, time.perf_counter() - t0)
+    exit_params = client.request_transfer_exit()
+    elapsed = time.perf_counter() - t0
+    return DownloadResult(total, blocks, block_len, elapsed, zlib.crc32(image), exit_params)
+
+
+def print_progress(sent, total, elapsed):
+    rate = sent / elapsed / 1024 if elapsed > 0 else 0.0
+    end = "\n" if sent >= total else ""
+    print(f"\r⬇ {sent}/{total} bytes ({sent * 100 // total}%)  {rate:.1f} KiB/s", end=end, file=sys.stderr, flush=True)
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Download a binary image to an ECU with UDS 0x34/0x36/0x37.")
+    parser.add_argument("image", help="Binary image file.")
+    parser.add_argument("--address", type=lambda x: int(x, 0), default=FLASH_BASE,
+                        help=f"Target memory address (default 0x{FLASH_BASE:08X}).")
+    parser.add_argument("--max-block-len", type=lambda x: int(x, 0),
+                        help="Upper bound for TransferData request length (default: ECU maximum).")
+    parser.add_argument("--verify-crc", action="store_true",
+                        help="Compare the CRC32 returned in the 0x37 response with the image.")
+    parser.add_argument("--simulate", action="store_true",
+                        help="Download to an in-process ECU simulator on a virtual bus.")
+    add_bus_args(parser)
+    parser.add_argument("--req-id", type=lambda x: int(x, 0), default=0x7E0)
+    parser.add_argument("--res-id", type=lambda x: int(x, 0), default=0x7E8)
+    parser.add_argument("--p2", "--timeout", dest="p2", type=float, default=P2_CLIENT,
+                        help="P2 timeout: request sent -> response start (s).")
+    parser.add_argument("--p2-star", type=float, default=P2_STAR_CLIENT,
+                        help="P2* timeout after a 0x78 responsePending, e.g. while erasing flash (s).")
+    parser.add_argument("--rx-bs", type=lambda x: int(x, 0), default=0)
+    parser.add_argument("--rx-stmin", type=lambda x: int(x, 0), default=0)
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+
+    with contextlib.ExitStack() as stack:
+        if args.simulate:
+            stack.enter_context(VirtualEcu.open("uds-flash", "virtual", fd=args.fd,
+                                                req_id=args.req_id, res_id=args.res_id))
+            tp = stack.enter_context(IsoTpTransport(can.Bus(interface="virtual", channel="uds-flash"),
+                                                    rx_bs=args.rx_bs, rx_stmin=args.rx_stmin,
+                                                    fd=args.fd, brs=args.brs))
+        else:
+            tp = stack.enter_context(IsoTpTransport.open(args.channel, args.bustype, args.bitrate,
+                                                         rx_bs=args.rx_bs, rx_stmin=args.rx_stmin,
+                                                         **fd_options(args)))
+        client = UdsClient(tp, args.req_id, args.res_id, timeout=args.p2, p2_star=args.p2_star)
+        try:
+            image = stack.enter_context(open_image(args.image))
+            result = download(client, image, args.address, args.max_block_len, on_progress=print_progress)
+        except (OSError, ValueError, UdsError, can.CanError) as e:
+            print(f"❌ Download failed: {e}", file=sys.stderr)
+            return 1
+
+    print(f"✅ {result.size} bytes in {result.blocks} blocks of {result.block_len} B, "
+          f"{result.elapsed:.2f}s ({result.size / result.elapsed / 1024:.1f} KiB/s), CRC32 0x{result.crc32:08X}")
+    if args.verify_crc or args.simulate:
+        ecu_crc = int.from_bytes(result.exit_params[:4], "big") if len(result.exit_params) >= 4 else None
+        if ecu_crc != result.crc32:
+            print(f"❌ CRC mismatch: ECU reported {result.exit_params.hex() or 'nothing'}", file=sys.stderr)
+            return 1
+        print("✅ CRC32 verified by ECU")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""
+여러 ECU(요청/응답 ID 쌍)와 여러 CAN 채널을 동시에 진단하는 스캐너.
+
+ECU마다 코루틴 하나가 같은 요청 세트를 순서대로 실행하고, 서로 다른 ECU의 트랜잭션은
+asyncio 스케줄러 위에서 교차 실행된다. IsoTpTransport는 응답 ID별로 큐가 분리되어 있어
+각 요청의 응답 대기는 ECU 전용 작업 스레드에서 이루어진다.
+따라서 전체 스캔 시간은 각 ECU 시간의 합이 아니라 가장 느린 ECU 시간에 가깝다.
+
+요청은 uds_cli.py 배치 명령 형식을 그대로 사용한다.
+
+사용 예:
+    python uds_scan.py --channel PCAN_USBBUS1 --target 7E0:7E8 --target 7E1:7E9
+    python uds_scan.py --channel PCAN_USBBUS1 --channel PCAN_USBBUS2 --obd-range \\
+        --target 7E0:7E8@PCAN_USBBUS2 --request "read 0x0005" --request read_dtc
+"""
+import argparse
+import asyncio
+import collections
+import contextlib
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from can_backend import BACKENDS, DEFAULT_BACKEND, DEFAULT_BITRATE, add_fd_args, default_channel, fd_options
+from isotp_transport import IsoTpTransport
+from uds_cli import run_request
+from uds_client import P2_CLIENT, UdsClient
+
+# 기본 스캔 요청: ECU 정보, DTC, 센서 DID
+DEFAULT_SCAN_REQUESTS = (
+    "read 0x0005",
+    "read_dtc",
+    "read 0x0001 0x0002 0x0003 0x0004",
+)
+
+# OBD 물리 주소 범위 (요청 0x7E0~0x7E7 → 응답 0x7E8~0x7EF)
+OBD_PAIRS = tuple((0x7E0 + i, 0x7E8 + i) for i in range(8))
+
+ScanTarget = collections.namedtuple("ScanTarget", ["channel", "req_id", "res_id"])
+
+
+async def scan_ecu(client, requests, executor, limiter, stop_on_silence=True):
+    """
+    ECU 하나에 요청 세트를 순서대로 보낸다.
+    첫 요청에 응답이 없으면(ECU 없음) 나머지 요청은 건너뛴다.
+    """
+    loop = asyncio.get_running_loop()
+    t0 = time.perf_counter()
+    steps = []
+    for request in requests:
+        async with limiter:
+            step = await loop.run_in_executor(executor, run_request, client, request)
+        steps.append(step)
+        if stop_on_silence and len(steps) == 1 and not step["ok"] and "nrc" not in step \
+                and step["error"].startswith("No response"):
+            break
+    return {
+        "req_id": f"0x{client.req_id:03X}",
+        "res_id": f"0x{client.res_id:03X}",
+        "present": any(s["ok"] or "nrc" in s for s in steps),
+        "ok": all(s["ok"] for s in steps),
+        "elapsed_ms": round((time.perf_counter() - t0) * 1000, 2),
+        "steps": steps,
+    }
+
+
+async def scan_async(transports, targets, requests=DEFAULT_SCAN_REQUESTS, timeout=P2_CLIENT,
+                     max_concurrency=None, on_result=None):
+    """
+    transports: {channel: IsoTpTransport}, targets: [ScanTarget, ...]
+    모든 대상을 동시에 스캔하고, 끝나는 순서대로 on_result(result)를 호출한다.
+    대상 순서대로 정렬된 결과 리스트를 반환한다.
+    """
+    limit = max_concurrency or len(targets) or 1
+    limiter = asyncio.Semaphore(limit)
+    with ThreadPoolExecutor(max_workers=limit, thread_name_prefix="uds-scan") as executor:
+        async def run(target):
+            client = UdsClient(transports[target.channel], target.req_id, target.res_id, timeout=timeout)
+            result = await scan_ecu(client, requests, executor, limiter)
+            result["channel"] = target.channel
+            if on_result:
+                on_result(result)
+            return result
+
+        return await asyncio.gather(*(run(t) for t in targets))
+
+
+def scan(transports, targets, requests=DEFAULT_SCAN_REQUESTS, timeout=P2_CLIENT, max_concurrency=None, on_result=None):
+    """scan_async의 동기 버전 (GUI 작업 스레드/CLI용)."""
+    return asyncio.run(scan_async(transports, targets, requests, timeout, max_concurrency, on_result))
+
+
+def parse_target(text, default_channel):
+    """'7E0:7E8' 또는 '7E0:7E8@CHANNEL' → ScanTarget"""
+    pair, _, channel = text.partition("@")
+    req, res = pair.split(":")
+    return ScanTarget(channel or default_channel, int(req, 16), int(res, 16))
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Scan many ECUs concurrently and print JSON results per ECU.")
+    parser.add_argument("--channel", dest="channels", action="append",
+                        help="CAN channel to open (repeatable, default depends on --bustype).")
+    parser.add_argument("--bustype", default=DEFAULT_BACKEND,
+                        help=f"Bus backend: {', '.join(BACKENDS)} or any python-can interface.")
+    parser.add_argument("--bitrate", type=int, default=DEFAULT_BITRATE)
+    add_fd_args(parser)
+    parser.add_argument("--target", dest="targets", action="append", default=[],
+                        help="REQ:RES[@CHANNEL] in hex, e.g. 7E1:7E9 (repeatable).")
+    parser.add_argument("--obd-range", action="store_true",
+                        help="Scan 7E0:7E8 .. 7E7:7EF on every channel.")
+    parser.add_argument("--request", dest="requests", action="append",
+                        help="uds_cli batch command to run per ECU (repeatable).")
+    parser.add_argument("--timeout", type=float, default=P2_CLIENT,
+                        help="P2 timeout per request (s); 0x78 responsePending extends it to P2*.")
+    parser.add_argument("--max-concurrency", type=int, help="Max transactions in flight (default: all ECUs).")
+    parser.add_argument("--rx-bs", type=lambda x: int(x, 0), default=0)
+    parser.add_argument("--rx-stmin", type=lambda x: int(x, 0), default=0)
+    return parser
+
+
+def main(argv=None):
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    channels = args.channels or [default_channel(args.bustype)]
+
+    targets = [parse_target(t, channels[0]) for t in args.targets]
+    if args.obd_range:
+        targets += [ScanTarget(ch, req, res) for ch in channels for req, res in OBD_PAIRS]
+    targets = list(dict.fromkeys(targets))
+    if not targets:
+        targets = [ScanTarget(channels[0], 0x7E0, 0x7E8)]
+    unknown = {t.channel for t in targets} - set(channels)
+    if unknown:
+        parser.error(f"target channel not opened with --channel: {', '.join(sorted(unknown))}")
+
+    def print_result(result):
+        print(json.dumps(result, ensure_ascii=False), flush=True)
+
+    t0 = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        transports = {
+            ch: stack.enter_context(IsoTpTransport.open(ch, args.bustype, args.bitrate, rx_bs=args.rx_bs,
+                                                        rx_stmin=args.rx_stmin, **fd_options(args)))
+            for ch in channels
+        }
+        results = scan(transports, targets, args.requests or DEFAULT_SCAN_REQUESTS,
+                       args.timeout, args.max_concurrency, print_result)
+
+    present = [r for r in results if r["present"]]
+    summary = {
+        "summary": True,
+        "targets": len(results),
+        "present": len(present),
+        "failed": sum(1 for r in present if not r["ok"]),
+        "elapsed_ms": round((time.perf_counter() - t0) * 1000, 2),
+        "slowest_ecu_ms": max((r["elapsed_ms"] for r in results), default=0.0),
+    }
+    print(json.dumps(summary), flush=True)
+    return 1 if summary["failed"] or not present else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())